@@ -14,17 +14,28 @@ import pandas as pd
 import time
 import json
 import os
+import hmac
 
 from quant_b_module.portfolio_manager import PortfolioManager
 from quant_b_module.visualizer import Visualizer
+from quant_b_module.calendar_alignment import CALENDAR_POLICIES
+from quant_b_module.out_of_core import ChunkedPortfolioEngine
+from data_loader import DOWNLOADS, PriceStore
+from session_memory import SESSION_MEMORY, track_current_session
 
 try:
-    from quant_a_module.visualizer import display_quant_a
+    from quant_a_module.visualizer import display_quant_a, SESSION_KEYS as QUANT_A_SESSION_KEYS
+    from quant_a_module.forecasting import FORECAST_CACHE
     QUANT_A_AVAILABLE = True
 except ImportError:
     QUANT_A_AVAILABLE = False
+    QUANT_A_SESSION_KEYS = ()
 
 CONFIG_FILE = "portfolio_config.json"
+# Delay between two live ticks of the portfolio panel
+LIVE_REFRESH_SECONDS = 300
+# Long price panels kept on disk (PriceStore.download), streamed by the out-of-core engine
+PRICE_STORE = PriceStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_store"))
 
 def load_config():
     config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_FILE)
@@ -44,26 +55,163 @@ def save_config(config_data):
     except Exception as e:
         print(f"Error saving config: {e}")
 
-st.set_page_config(page_title="Quant Dashboard", layout="wide")
+@st.cache_resource(ttl=3600, show_spinner=False)
+def load_portfolio(tickers, years, calendar_policy):
+    """
+    One PortfolioManager per distinct selection, shared by every session: identical requests
+    from concurrent users are fetched once and reuse the same derived arrays.
+    Live ticks append the latest bars to it (swapped in under the manager lock, so other
+    sessions never calculate on a half-updated panel); a full reload happens every hour.
+    """
+    pm = PortfolioManager()
+    data = pm.fetch_data(list(tickers), period=f"{years}y", calendar=calendar_policy)
+    if data is None or data.empty:
+        # Raising keeps the failure out of the cache
+        raise ValueError(f"Could not fetch data for {tickers}")
+    SESSION_MEMORY.register_cache(f"Portfolio {', '.join(tickers[:3])}{'...' if len(tickers) > 3 else ''} "
+                                  f"({len(tickers)} assets, {years}y, {calendar_policy})", pm)
+    return pm
+
+def portfolio_live_panel(pm, weights, rebal_freq):
+    """
+    Performance chart and KPIs of the portfolio. In live mode it runs as a fragment every
+    LIVE_REFRESH_SECONDS: each tick extends the cached arrays with the latest bars and redraws
+    only this panel (the chart itself is sent again in full).
+    Returns the portfolio value (used by the rest of the page on full runs).
+    """
+    last_update = st.session_state.get("portfolio_last_update", 0)
+    if time.time() - last_update >= LIVE_REFRESH_SECONDS - 1:
+        st.session_state.portfolio_last_update = time.time()
+        # The first run of a session uses the freshly loaded data
+        if last_update:
+            pm.update_latest()
+
+    # Weight changes (sliders) only recombine the precomputed asset paths
+    portfolio, metrics = pm.preview_portfolio(weights, rebalance_freq=rebal_freq)
+    if portfolio is not None:
+        st.caption(f"Prices as of {portfolio.index[-1]:%Y-%m-%d}")
+        Visualizer.plot_performance(pm.get_normalized_prices().assign(Portfolio=portfolio))
+        
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Total Return", f"{metrics['Total Return']:.2%}")
+        m2.metric("Volatility (Ann.)", f"{metrics['Volatility (Ann.)']:.2f}")
+        m3.metric("Diversification Gain", f"{metrics['Diversification Effect']:.4f}")
+        m4.metric("Rebalancing", rebal_freq)
+    return portfolio
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def stream_stored_portfolio(panel, weights, rebal_freq, modified):
+    """
+    Simulates the portfolio over a whole PriceStore panel with the out-of-core engine: the
+    panel is read by blocks of dates sized by the memory budget and only the last value of
+    each month is kept for the chart. `modified` (file time) refreshes it when the panel grows.
+    """
+    engine = ChunkedPortfolioEngine(dict(weights), rebal_freq)
+    monthly = []
+    for values in engine.stream(engine.store_blocks(PRICE_STORE, panel)):
+        monthly.append(values.groupby(values.index.to_period("M")).tail(1))
+    if not monthly:
+        return None, None, 0
+    monthly = pd.concat(monthly)
+    # A month split across two blocks keeps its last value only
+    monthly = monthly.groupby(monthly.index.to_period("M")).tail(1)
+    return monthly, engine.get_portfolio_metrics(), engine.blocks_processed
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def scan_universe_pairs(tickers, years, calendar_policy, data_version, min_correlation):
+    """
+    Pairs of the asset class universe, scanned once per data version and prefilter for
+    every session (the manager scans a snapshot of its panel, outside its lock).
+    """
+    return load_portfolio(tickers, years, calendar_policy).get_pairs(min_correlation=min_correlation)
+
+def admin_token():
+    """
+    Server-side secret of the admin view: DASHBOARD_ADMIN_TOKEN environment variable, or
+    admin_token in .streamlit/secrets.toml. Without one, the admin view is disabled.
+    """
+    token = os.environ.get("DASHBOARD_ADMIN_TOKEN")
+    if token:
+        return token
+    try:
+        return st.secrets.get("admin_token")
+    except Exception:
+        # No secrets file
+        return None
+
+def display_admin():
+    """
+    Memory of the server: session_state held by every open session, shared caches,
+    budgets of the LRU eviction and tracemalloc sampling.
+    """
+    st.header("Admin: Memory")
+    summary = SESSION_MEMORY.summary()
 
-if 'last_refresh' not in st.session_state:
-    st.session_state.last_refresh = time.time()
+    a1, a2, a3, a4 = st.columns(4)
+    a1.metric("Sessions", summary["Sessions"])
+    a2.metric("Session State", f"{summary['Session State (MB)']:.1f} MB")
+    a3.metric("Evictions", summary["Evictions"])
+    a4.metric("Evicted", f"{summary['Evicted (MB)']:.1f} MB")
 
-if time.time() - st.session_state.last_refresh > 300:
-    st.session_state.last_refresh = time.time()
-    st.rerun()
+    b1, b2, b3 = st.columns(3)
+    SESSION_MEMORY.session_budget_mb = b1.number_input("Per-Session Budget (MB)", 1, 4096, SESSION_MEMORY.session_budget_mb)
+    SESSION_MEMORY.global_budget_mb = b2.number_input("Global Budget (MB)", 1, 65536, SESSION_MEMORY.global_budget_mb)
+    sampling = b3.toggle("tracemalloc Sampling", value=summary["Sampling"],
+                         help=f"Records the fastest-growing allocation sites every {SESSION_MEMORY.sample_every} runs (slows the server).")
+    if sampling and not summary["Sampling"]:
+        SESSION_MEMORY.start_sampling()
+    elif not sampling and summary["Sampling"]:
+        SESSION_MEMORY.stop_sampling()
+
+    st.subheader("Sessions")
+    st.dataframe(SESSION_MEMORY.session_report().style.format({"Size (MB)": "{:.2f}", "Idle (s)": "{:.0f}"}),
+                 use_container_width=True)
+    st.subheader("Session State Entries")
+    st.dataframe(SESSION_MEMORY.entry_report().style.format({"Size (MB)": "{:.3f}", "Idle (s)": "{:.0f}"}),
+                 use_container_width=True)
+    st.subheader("Shared Caches")
+    st.dataframe(SESSION_MEMORY.cache_report().to_frame().style.format("{:.2f}"), use_container_width=True)
+
+    if SESSION_MEMORY.samples:
+        latest = SESSION_MEMORY.samples[-1]
+        st.subheader("tracemalloc Sample")
+        st.caption(f"Traced: {latest['traced_mb']:.1f} MB (peak {latest['peak_mb']:.1f} MB) "
+                   f"at {time.strftime('%H:%M:%S', time.localtime(latest['time']))}")
+        if latest["top"]:
+            st.dataframe(pd.DataFrame(latest["top"]).style.format({"Growth (MB)": "{:.3f}", "Size (MB)": "{:.3f}"}),
+                         use_container_width=True)
+
+st.set_page_config(page_title="Quant Dashboard", layout="wide")
 
 st.title("Asset Management Dashboard")
-st.caption(f"Last updated: {time.strftime('%H:%M:%S')} (Auto-refreshes every 5 min)")
 
 st.sidebar.header("Navigation")
-module = st.sidebar.radio("Select Module:", ["Quant A (Single Asset)", "Quant B (Portfolio)"], index=1)
+modules = ["Quant A (Single Asset)", "Quant B (Portfolio)"]
+# The memory admin view (budgets, tracemalloc) is only listed with ?admin=<token> in the URL
+token = admin_token()
+if token and hmac.compare_digest(st.query_params.get("admin", ""), token):
+    modules.append("Admin (Memory)")
+module = st.sidebar.radio("Select Module:", modules, index=1)
+# Live mode: only the price-dependent panels re-run (fragments), instead of the whole page
+live_mode = st.sidebar.toggle("Live Mode", value=True, help="Refresh prices, KPIs and the main chart every 5 minutes.")
+
+if live_mode:
+    st.caption(f"Last updated: {time.strftime('%H:%M:%S')} (Live prices refresh every 5 min)")
+else:
+    st.caption(f"Last updated: {time.strftime('%H:%M:%S')}")
 
 saved_config = load_config()
+# Session state entries used by this run (never evicted by the memory manager)
+used_keys = set()
+
+SESSION_MEMORY.register_cache("Downloads", DOWNLOADS)
+if QUANT_A_AVAILABLE:
+    SESSION_MEMORY.register_cache("ARIMA Models", FORECAST_CACHE)
 
 if module == "Quant A (Single Asset)":
     if QUANT_A_AVAILABLE:
-        display_quant_a()
+        display_quant_a(live_mode=live_mode)
+        used_keys.update(QUANT_A_SESSION_KEYS)
     else:
         st.error("Quant A module not found.")
 
@@ -168,17 +316,37 @@ elif module == "Quant B (Portfolio)":
     )
 
     years = st.sidebar.slider("History (Years)", min_value=1, max_value=10, value=1)
+
+    calendar_policy = st.sidebar.selectbox(
+        "Calendar Alignment",
+        CALENDAR_POLICIES,
+        index=CALENDAR_POLICIES.index("Union"),
+        help="How assets trading on different calendars (crypto vs equities) are put on one timeline."
+    )
     
     if len(tickers) < 3:
         st.warning("Please select at least 3 assets.")
     else:
-        pm = PortfolioManager()
-        
         with st.spinner('Fetching real-time data...'):
-            data = pm.fetch_data(tickers, period=f"{years}y")
+            try:
+                pm = load_portfolio(tuple(tickers), years, calendar_policy)
+                data = pm.data
+            except ValueError:
+                data = None
         
         if data is not None and not data.empty:
             st.success(f"Data loaded for {len(tickers)} assets.")
+            report = pm.calendar_report
+            st.caption(
+                f"Calendar: {report['Policy']} | {report['Rows Before']} -> {report['Rows After']} rows "
+                f"({report['Shrink']:.0%} smaller) | annualized with {report['Periods per Year']} periods per year"
+            )
+            if report["Dropped Dates"]:
+                message = f"{report['Policy']}: {report['Dropped Dates']} dates of the download were removed."
+                if report["Latest Start"] is not None:
+                    message += (f" The panel starts on {report['First Date After']:%Y-%m-%d} instead of "
+                                f"{report['First Date Before']:%Y-%m-%d}, when {report['Latest Start']} starts trading.")
+                st.info(message)
             
             st.subheader("1. Strategic Allocation")
             col1, col2 = st.columns([1, 2])
@@ -207,6 +375,11 @@ elif module == "Quant B (Portfolio)":
                         for t, w in st.session_state.manual_weights.items():
                             st.session_state[f"slider_{t}"] = float(w)
 
+                    # Slider keys evicted while the sliders were hidden are restored from the weights
+                    for t, w in st.session_state.manual_weights.items():
+                        if f"slider_{t}" not in st.session_state:
+                            st.session_state[f"slider_{t}"] = float(w)
+
                     # Calculate total from the current slider states to handle relative normalization
                     current_raw_values = {t: st.session_state.get(f"slider_{t}", 1.0/len(tickers)) for t in tickers}
                     total_raw = sum(current_raw_values.values())
@@ -231,30 +404,155 @@ elif module == "Quant B (Portfolio)":
                     weights = {t: final_raw[t] / final_total if final_total > 0 else 1.0/len(tickers) for t in tickers}
                     st.session_state.manual_weights = weights
 
-                # Persistent saving
+                # Persistent saving (only when something changed)
                 current_config = {
                     "tickers": tickers,
                     "weights": weights,
                     "asset_class": selected_classes
                 }
-                save_config(current_config)
+                if current_config != saved_config:
+                    save_config(current_config)
             
             with col2:
-                sim_data = pm.simulate_portfolio(weights, rebalance_freq=rebal_freq)
-                
-                if sim_data is not None:
-                    Visualizer.plot_performance(sim_data)
-                    metrics = pm.get_portfolio_metrics(weights, sim_data['Portfolio'])
-                    
-                    m1, m2, m3, m4 = st.columns(4)
-                    m1.metric("Total Return", f"{metrics['Total Return']:.2%}")
-                    m2.metric("Volatility (Ann.)", f"{metrics['Volatility (Ann.)']:.2f}")
-                    m3.metric("Diversification Gain", f"{metrics['Diversification Effect']:.4f}")
-                    m4.metric("Rebalancing", rebal_freq)
+                panel = st.fragment(portfolio_live_panel, run_every=LIVE_REFRESH_SECONDS if live_mode else None)
+                portfolio = panel(pm, weights, rebal_freq)
 
             st.subheader("2. Correlation Analysis")
             corr_matrix = pm.get_correlation_matrix()
             Visualizer.plot_correlation_heatmap(corr_matrix)
+
+            st.subheader("3. Tail Risk (VaR / CVaR)")
+            if portfolio is not None:
+                rolling_risk, risk_summary = pm.get_portfolio_risk(portfolio)
+                if not risk_summary.empty:
+                    Visualizer.plot_var(portfolio.pct_change().dropna(), rolling_risk)
+                    st.dataframe(risk_summary.style.format({
+                        "Confidence": "{:.1%}", "VaR": "{:.2%}", "CVaR": "{:.2%}", "Expected": "{:.1f}",
+                        "Exception Rate": "{:.2%}", "Kupiec LR": "{:.2f}", "p-value": "{:.3f}"
+                    }), use_container_width=True)
+                    st.write("**Per-Asset Tail Risk (latest window)**")
+                    st.dataframe(pm.get_asset_risk_table().style.format("{:.2%}"), use_container_width=True)
+
+            st.subheader("4. Factor Analysis (PCA)")
+            n_factors = st.slider("Number of Factors", min_value=1, max_value=min(10, len(tickers)), value=min(3, len(tickers)))
+            factors = pm.get_factor_decomposition(n_factors=n_factors, weights=weights)
+            if factors is not None:
+                f1, f2 = st.columns(2)
+                with f1:
+                    Visualizer.plot_explained_variance(factors["Explained Variance"])
+                with f2:
+                    Visualizer.plot_factor_loadings(factors["Loadings"])
+
+                risk_split = factors["Risk Split"]
+                r1, r2, r3 = st.columns(3)
+                r1.metric("Factor Volatility", f"{risk_split['Factor Volatility']:.2%}")
+                r2.metric("Idiosyncratic Volatility", f"{risk_split['Idiosyncratic Volatility']:.2%}")
+                r3.metric("Factor Share of Risk", f"{risk_split['Factor Share']:.2%}")
+
+                st.write("**Asset Factor Exposures**")
+                st.dataframe(factors["Exposures"].style.format("{:.3f}"), use_container_width=True)
+
+            st.subheader("5. Portfolio Comparison")
+            schedules = st.multiselect(
+                "Rebalancing Schedules to Compare",
+                ["None", "Monthly", "Quarterly", "Yearly"],
+                default=["None", "Monthly", "Quarterly", "Yearly"]
+            )
+            if schedules:
+                # One weight vector per row: all variants are simulated in a single batch
+                variant_weights = {"Selected": weights, "Equal Weight": {t: 1.0 / len(tickers) for t in tickers}}
+                # Constant assets (zero volatility) get no inverse volatility weight instead of an infinite one
+                volatility = pm.get_asset_volatility()[tickers]
+                inverse_vol = (1 / volatility.where(volatility > 0)).fillna(0.0)
+                if inverse_vol.sum() > 0:
+                    variant_weights["Inverse Volatility"] = (inverse_vol / inverse_vol.sum()).to_dict()
+                weights_matrix = pd.DataFrame(list(variant_weights.values()), index=list(variant_weights))
+                variants = pm.simulate_portfolio(weights_matrix, rebalance_freq=schedules)
+                Visualizer.plot_portfolio_comparison(variants)
+                comparison = pm.get_batch_metrics(weights_matrix, variants)
+                st.dataframe(comparison.style.format({
+                    "Total Return": "{:.2%}", "CAGR": "{:.2%}", "Volatility (Ann.)": "{:.2%}",
+                    "Sharpe Ratio": "{:.2f}", "Max Drawdown": "{:.2%}", "Diversification Effect": "{:.4f}"
+                }), use_container_width=True)
+
+            st.subheader("6. Drift-Band Rebalancing")
+            d1, d2, d3 = st.columns(3)
+            band_widths = d1.multiselect("Band Widths", [0.01, 0.02, 0.05, 0.10, 0.20], default=[0.02, 0.05, 0.10],
+                                         format_func=lambda band: f"{band:.0%}")
+            cost_bps = d2.number_input("Trading Cost (bps)", 0.0, 100.0, 10.0, 1.0)
+            band_type = d3.radio("Band Type", ["Absolute (weight points)", "Relative (% of target)"])
+            if band_widths:
+                band_values, band_summary, rebalance_dates = pm.simulate_drift_bands(
+                    weights, sorted(band_widths), cost_bps=cost_bps, relative=band_type.startswith("Relative"))
+                Visualizer.plot_drift_bands(band_values, rebalance_dates, baseline=portfolio,
+                                            baseline_name=f"{rebal_freq} Rebalancing")
+                st.dataframe(band_summary.drop(columns="Band").style.format({
+                    "Turnover (Total)": "{:.2f}", "Turnover (Ann.)": "{:.2f}", "Total Cost": "{:.2%}",
+                    "Cost Drag (Ann.)": "{:.3%}", "Total Return": "{:.2%}", "Volatility (Ann.)": "{:.2%}"
+                }), use_container_width=True)
+                st.caption("Turnover is the sum of |weight - target| traded at each rebalance; "
+                           "cost drag is the annualized return lost to trading costs.")
+
+            st.subheader("7. Pairs Scanner (Cointegration)")
+            run_pair_scan = st.checkbox(f"Scan every pair of the selected asset classes ({len(available_tickers)} assets)")
+            if run_pair_scan:
+                min_correlation = st.slider("Minimum Return Correlation (prefilter)", 0.0, 0.95, 0.6, 0.05)
+                with st.spinner(f"Testing up to {len(available_tickers) * (len(available_tickers) - 1) // 2} pairs..."):
+                    try:
+                        universe = load_portfolio(tuple(available_tickers), years, calendar_policy)
+                        pairs = scan_universe_pairs(tuple(available_tickers), years, calendar_policy,
+                                                    universe.data_version, min_correlation)
+                    except ValueError:
+                        pairs = None
+
+                if pairs is None or pairs.empty:
+                    st.warning("No pair passes the correlation prefilter.")
+                else:
+                    st.caption("Engle-Granger test on log prices, ranked by p-value. "
+                               "The spread backtest uses the full-sample hedge ratio (in-sample).")
+                    st.dataframe(pairs.style.format({
+                        "Correlation": "{:.2f}", "Hedge Ratio": "{:.3f}", "Intercept": "{:.3f}", "ADF Stat": "{:.2f}",
+                        "p-value": "{:.4f}", "Half-Life (Days)": "{:.1f}", "Spread Vol": "{:.4f}",
+                        "Backtest Return": "{:.2%}", "Backtest Sharpe": "{:.2f}", "Backtest Max Drawdown": "{:.2%}"
+                    }), use_container_width=True)
+
+                    labels = [f"{y} / {x}" for y, x in zip(pairs["Asset Y"], pairs["Asset X"])]
+                    choice = st.selectbox("Pair to Backtest", range(len(pairs)), format_func=lambda i: labels[i])
+                    pair = pairs.iloc[choice]
+                    backtest = universe.get_pair_backtest(pair["Asset Y"], pair["Asset X"],
+                                                          pair["Hedge Ratio"], pair["Intercept"])
+                    Visualizer.plot_spread_backtest(backtest, labels[choice])
+
+            # Panels stored on disk holding every selected asset
+            stored_panels = [name for name in PRICE_STORE.panels() if set(tickers) <= set(PRICE_STORE.columns(name))]
+            if stored_panels:
+                st.subheader("8. Stored History (Out-of-Core)")
+                panel_name = st.selectbox("Stored Panel", stored_panels)
+                if st.checkbox(f"Simulate the selected weights over the whole '{panel_name}' panel"):
+                    with st.spinner("Streaming the stored panel..."):
+                        stored_values, stored_metrics, blocks = stream_stored_portfolio(
+                            panel_name, tuple(sorted(weights.items())), rebal_freq,
+                            os.path.getmtime(PRICE_STORE.path(panel_name)))
+                    if stored_values is None:
+                        st.warning("The stored panel is empty.")
+                    else:
+                        st.caption(f"{stored_values.index[0]:%Y-%m-%d} to {stored_values.index[-1]:%Y-%m-%d}, "
+                                   f"read in {blocks} blocks (month-end values shown)")
+                        Visualizer.plot_performance(stored_values.to_frame())
+                        s1, s2, s3, s4 = st.columns(4)
+                        s1.metric("Total Return", f"{stored_metrics['Total Return']:.2%}")
+                        s2.metric("CAGR", f"{stored_metrics['CAGR']:.2%}")
+                        s3.metric("Volatility (Ann.)", f"{stored_metrics['Volatility (Ann.)']:.2%}")
+                        s4.metric("Max Drawdown", f"{stored_metrics['Max Drawdown']:.2%}")
             
         else:
-            st.error("Could not fetch data.")
\ No newline at end of file
+            st.error("Could not fetch data.")
+
+elif module == "Admin (Memory)":
+    display_admin()
+
+if module == "Quant B (Portfolio)":
+    used_keys.update(["manual_weights", "portfolio_last_update"])
+    used_keys.update(f"slider_{t}" for t in tickers)
+# Measure this session and evict least recently used state beyond the budgets
+track_current_session(used_keys)
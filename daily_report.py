@@ -6,19 +6,29 @@ This script automates the generation of quantitative reports by combining:
 2. Portfolio Management (Quant B): Multi-asset simulation and risk attribution.
 
 The results are appended to a persistent log file for historical tracking.
+The end-of-run state (positions, last prices, prices and running summaries of the trailing
+year) is saved to 'daily_report_state.json' so that the next run only processes the new and
+expired bars. Metrics cover the trailing year (Base 100 one year ago), as a full recompute would.
 """
 
 import datetime
 import os
 import sys
 import json
+import numpy as np
 import pandas as pd
+import yfinance as yf
 
 # Ensure we can import modules from the parent directory
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from quant_b_module.portfolio_manager import PortfolioManager
-from quant_a_module.asset_analyzer import AssetAnalyzer
+from quant_b_module.portfolio_state import PortfolioState
+
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "daily_report_state.json")
+REBALANCE_FREQ = "Quarterly"
+# Reported period: the trailing year
+WINDOW_YEARS = 1
 
 def load_config():
     """
@@ -45,44 +55,118 @@ def load_config():
     print("Using default portfolio configuration.")
     return default_tickers, default_weights
 
-def calculate_max_drawdown(series):
-    """Calculates Max Drawdown for the portfolio series."""
-    if series.empty:
-        return 0.0
-    cum_ret = (1 + series.pct_change().fillna(0)).cumprod()
-    running_max = cum_ret.cummax()
-    drawdown = (cum_ret - running_max) / running_max
-    return drawdown.min()
+def load_state():
+    """
+    Loads the end-of-run state saved by the previous report ('daily_report_state.json').
+    Returns an empty dict if the file is missing or invalid (forces a full rebuild).
+    """
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading state file: {e}")
+    return {}
+
+def save_state(states):
+    try:
+        with open(STATE_FILE, "w") as f:
+            json.dump(states, f, indent=4)
+    except Exception as e:
+        print(f"Error saving state file: {e}")
+
+def download_closes(tickers, start):
+    """
+    Raw close prices since 'start' (no filling: the saved state carries the last known prices).
+    """
+    df = yf.download(tickers, start=start, auto_adjust=True, progress=False)['Close']
+    if isinstance(df, pd.Series):
+        df = df.to_frame(name=tickers[0])
+    return df
+
+def rebuild_state(tickers, weights, rebalance_freq, start=None):
+    """
+    Full rebuild: one year of history on the first run, or everything since the saved window start.
+    """
+    pm = PortfolioManager()
+    prices = pm.fetch_data(tickers, period=f"{WINDOW_YEARS}y", start=start)
+    if prices is None or prices.empty:
+        return None
+    return PortfolioState.build(prices, weights, rebalance_freq, window_years=WINDOW_YEARS)
+
+def update_state(saved, tickers, weights, rebalance_freq):
+    """
+    Brings a saved state up to date by processing only the new bars.
+    Falls back to a full rebuild when the configuration or the price history changed.
+    Returns (state, description of the path taken).
+    """
+    fingerprint = PortfolioState.config_fingerprint(weights, rebalance_freq, WINDOW_YEARS)
+    if not saved or saved.get("fingerprint") != fingerprint:
+        return rebuild_state(tickers, weights, rebalance_freq), "full rebuild (new configuration)"
+
+    state = PortfolioState.from_dict(saved)
+    # The whole window is downloaded again to detect restated prices (dividend adjustments)
+    new_prices = download_closes(tickers, start=state.window_start)
+    if not state.history_matches(new_prices):
+        return rebuild_state(tickers, weights, rebalance_freq, start=state.window_start), "full rebuild (history changed)"
+
+    n_new = state.update(new_prices)
+    return state, f"incremental ({n_new} new bars)"
 
-def generate_daily_report():
+def verify_state(state, tickers):
+    """
+    Rebuilds the state from scratch over the same window and checks both paths agree.
+    """
+    full = rebuild_state(tickers, state.weights, state.rebalance_freq, start=state.window_start)
+    if full is None:
+        print("Verification skipped: no data for the full rebuild.")
+        return False
+
+    incremental_metrics = state.get_metrics()
+    full_metrics = full.get_metrics()
+    mismatches = [k for k in full_metrics
+                  if not np.isclose(incremental_metrics[k], full_metrics[k], rtol=1e-9, atol=1e-12)]
+    if full.last_date != state.last_date:
+        mismatches.append("Last Date")
+
+    if mismatches:
+        print(f"Verification FAILED for {list(state.weights)}: {mismatches}")
+        return False
+    print(f"Verification OK for {list(state.weights)}: incremental and full rebuild are identical.")
+    return True
+
+def generate_daily_report(verify=False):
     print("--- Starting Daily Report Job ---")
     
-    # 1. Load Configuration for Portfolio (Quant B)
+    # 1. Load Configuration for Portfolio (Quant B) and the previous end-of-run state
     tickers, weights = load_config()
+    saved_states = load_state()
+    new_states = dict(saved_states)
     
     # 2. Define Asset for Single Analysis (Quant A) - Defaulting to Bitcoin
     single_asset_ticker = "BTC-USD"
 
     # --- PART 1: QUANT A (Single Asset Focus) ---
     print(f"[Quant A] Analyzing asset: {single_asset_ticker}...")
-    analyzer = AssetAnalyzer(single_asset_ticker)
     
     quant_a_report = ""
     try:
-        # Fetch data for 1 year
-        df_asset = analyzer.get_data(period="1y")
-        
-        # Run a simple 'Buy and Hold' strategy to extract metrics
-        df_res_a = analyzer.run_strategy("Buy and Hold")
-        metrics_a = analyzer.get_metrics(df_res_a)
-        
-        last_price = df_asset['Close'].iloc[-1]
+        # Buy and Hold of a single asset = portfolio of one asset without rebalancing
+        state_a, mode_a = update_state(saved_states.get("benchmark"), [single_asset_ticker],
+                                       {single_asset_ticker: 1.0}, "None")
+        print(f"[Quant A] State update: {mode_a}")
+        if verify:
+            verify_state(state_a, [single_asset_ticker])
+
+        metrics_a = state_a.get_metrics()
+        new_states["benchmark"] = state_a.to_dict()
+        last_price = state_a.last_prices[single_asset_ticker]
         
         quant_a_report = (
             f"--- QUANT A: Single Asset Focus ({single_asset_ticker}) ---\n"
             f"Last Close Price     : ${last_price:,.2f}\n"
             f"Total Return (1y)    : {metrics_a.get('Total Return', 0):.2%}\n"
-            f"Volatility (Ann.)    : {metrics_a.get('Volatility', 0):.2f}\n"
+            f"Volatility (Ann.)    : {metrics_a.get('Volatility (Ann.)', 0):.2f}\n"
             f"Max Drawdown         : {metrics_a.get('Max Drawdown', 0):.2%}\n"
             f"Sharpe Ratio         : {metrics_a.get('Sharpe Ratio', 0):.2f}\n"
         )
@@ -92,37 +176,28 @@ def generate_daily_report():
 
     # --- PART 2: QUANT B (Portfolio Management) ---
     print(f"[Quant B] Analyzing Portfolio with {len(tickers)} assets...")
-    pm = PortfolioManager()
     
     quant_b_report = ""
     try:
-        # Fetch data (ensure we have enough history for volatility)
-        pm.fetch_data(tickers, period="1y")
-        
-        # Simulate portfolio using the weights from config
-        sim_data = pm.simulate_portfolio(weights, rebalance_freq="Quarterly")
+        # Quarterly-rebalanced portfolio, carried over from the previous run when possible
+        state_b, mode_b = update_state(saved_states.get("portfolio"), tickers, weights, REBALANCE_FREQ)
+        print(f"[Quant B] State update: {mode_b}")
         
-        if sim_data is not None and not sim_data.empty:
-            # Calculate Metrics
-            current_val = sim_data['Portfolio'].iloc[-1]
-            
-            if len(sim_data) >= 2:
-                prev_val = sim_data['Portfolio'].iloc[-2]
-                daily_perf = (current_val - prev_val) / prev_val
-            else:
-                daily_perf = 0.0
-            
-            metrics_b = pm.get_portfolio_metrics(weights, sim_data['Portfolio'])
-            port_max_dd = calculate_max_drawdown(sim_data['Portfolio'])
+        if state_b is not None:
+            if verify:
+                verify_state(state_b, tickers)
+
+            metrics_b = state_b.get_metrics()
+            new_states["portfolio"] = state_b.to_dict()
             
             quant_b_report = (
                 f"--- QUANT B: Portfolio Strategy ---\n"
                 f"Assets Managed       : {len(tickers)}\n"
-                f"Portfolio Value      : {current_val:.2f} (Base 100)\n"
-                f"24h Performance      : {daily_perf:+.2%}\n"
+                f"Portfolio Value      : {metrics_b['Portfolio Value']:.2f} (Base 100 on {state_b.window_start:%Y-%m-%d})\n"
+                f"24h Performance      : {metrics_b['Daily Return']:+.2%}\n"
                 f"Annualized Volatility: {metrics_b['Volatility (Ann.)']:.2%}\n"
                 f"Diversification Gain : {metrics_b['Diversification Effect']:.4f}\n"
-                f"Max Drawdown         : {port_max_dd:.2%}\n"
+                f"Max Drawdown         : {metrics_b['Max Drawdown']:.2%}\n"
             )
         else:
             quant_b_report = "--- QUANT B: No data available for portfolio simulation ---\n"
@@ -131,6 +206,8 @@ def generate_daily_report():
         quant_b_report = f"--- QUANT B: Error calculating portfolio metrics ---\nError: {str(e)}\n"
         print(f"Error in Quant B: {e}")
 
+    save_state(new_states)
+
     # --- WRITE REPORT TO LOG FILE ---
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     final_report = (
@@ -154,4 +231,5 @@ def generate_daily_report():
     print("--- Job Finished ---")
 
 if __name__ == "__main__":
-    generate_daily_report()
\ No newline at end of file
+    # --verify: also rebuild from scratch and check the incremental state gives identical results
+    generate_daily_report(verify="--verify" in sys.argv)
\ No newline at end of file
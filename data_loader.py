@@ -1,5 +1,216 @@
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+
 import yfinance as yf
 import pandas as pd
 import streamlit as st
 
+# Approximate number of (dates x tickers) float arrays alive while one block is processed
+# (parsed block, filled prices, returns, growth, centered returns...)
+BLOCK_WORKING_COPIES = 10
+
+
+def block_rows_for_budget(n_columns, memory_budget_mb, fixed_bytes=0):
+    """
+    Number of rows per block so that the block arrays plus the fixed state stay within the budget.
+    """
+    budget = memory_budget_mb * 1024 ** 2 - fixed_bytes
+    row_bytes = max(n_columns, 1) * 8 * BLOCK_WORKING_COPIES
+    if budget < row_bytes:
+        raise ValueError(f"Memory budget of {memory_budget_mb} MB is too small for {n_columns} assets")
+    return int(budget // row_bytes)
+
+
+class RequestCoalescer:
+    """
+    Shares identical requests between sessions (the Streamlit server runs every session
+    in a thread of the same process). The first caller computes; concurrent callers with
+    the same key wait for its result instead of starting the same download again.
+    Completed results are reused for ttl seconds. Shared results must not be modified in place.
+    """
+    def __init__(self, ttl=60, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._results = {}
+        self.stats = {"requests": 0, "computed": 0, "coalesced": 0, "cached": 0}
+
+    def run(self, key, compute):
+        with self._lock:
+            self.stats["requests"] += 1
+            entry = self._results.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.stats["cached"] += 1
+                return entry[1]
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self.stats["computed"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            try:
+                return future.result()
+            except CancelledError:
+                # The owner was interrupted before finishing: the request is made again
+                return self.run(key, compute)
+
+        try:
+            value = compute()
+        except BaseException as e:
+            # Failures are not cached: every waiter gets the error, the next call retries.
+            # Interrupts (KeyboardInterrupt, Streamlit stop / rerun) are not errors of the
+            # request: the waiters are released to make it themselves
+            with self._lock:
+                del self._in_flight[key]
+            if isinstance(e, Exception):
+                future.set_exception(e)
+            else:
+                future.cancel()
+            raise
+
+        with self._lock:
+            self._results[key] = (time.monotonic(), value)
+            del self._in_flight[key]
+            self._evict()
+        future.set_result(value)
+        return value
+
+    def _evict(self):
+        """
+        Drops expired results, then the oldest ones above max_entries.
+        """
+        now = time.monotonic()
+        for key in [k for k, (stamp, _) in self._results.items() if now - stamp >= self.ttl]:
+            del self._results[key]
+        while len(self._results) > self.max_entries:
+            del self._results[next(iter(self._results))]
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+def download_key(tickers, **kwargs):
+    """
+    Hashable key of a yfinance download (tickers and keyword arguments).
+    """
+    if not isinstance(tickers, str):
+        tickers = tuple(tickers)
+    return ("download", tickers, tuple(sorted((k, str(v)) for k, v in kwargs.items())))
+
+
+# Downloads shared by every session of the process
+DOWNLOADS = RequestCoalescer(ttl=60)
+
+
+class PriceStore:
+    """
+    Local store of close price panels (dates x tickers), one CSV file per panel.
+    Panels are written by date window and read back by blocks of rows, so a long
+    history never has to be loaded at once.
+    """
+    def __init__(self, root="price_store"):
+        self.root = root
+
+    def path(self, name):
+        return os.path.join(self.root, f"{name}.csv")
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def panels(self):
+        """
+        Names of the stored panels.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(file[:-4] for file in os.listdir(self.root) if file.endswith(".csv"))
+
+    def columns(self, name):
+        """
+        Tickers stored in a panel (reads the header only).
+        """
+        return list(pd.read_csv(self.path(name), index_col=0, nrows=0).columns)
+
+    def last_date(self, name):
+        """
+        Last stored date (reads the file by blocks), or None for an empty / missing panel.
+        """
+        if not self.exists(name):
+            return None
+        last = None
+        for block in pd.read_csv(self.path(name), index_col=0, usecols=[0], parse_dates=True, chunksize=100_000):
+            if len(block.index) > 0:
+                last = block.index[-1]
+        return last
+
+    def write(self, name, prices):
+        """
+        Writes (or replaces) a panel.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        prices.sort_index().to_csv(self.path(name), index_label="Date")
+
+    def append(self, name, prices):
+        """
+        Appends the rows after the last stored date (columns aligned on the stored header).
+        """
+        if not self.exists(name):
+            self.write(name, prices)
+            return len(prices)
+
+        last = self.last_date(name)
+        new_rows = prices.sort_index()
+        if last is not None:
+            new_rows = new_rows[new_rows.index > last]
+        new_rows = new_rows.reindex(columns=self.columns(name))
+        new_rows.to_csv(self.path(name), mode="a", header=False)
+        return len(new_rows)
+
+    def download(self, name, tickers, start, end=None, interval="1d", window_days=365):
+        """
+        Downloads close prices window by window and appends them to the panel,
+        so memory only depends on the window length.
+        """
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+        last = self.last_date(name)
+        if last is not None:
+            start = max(start, last)
+
+        rows = 0
+        while start < end:
+            stop = min(start + pd.Timedelta(days=window_days), end)
+            try:
+                df = yf.download(tickers, start=start, end=stop, interval=interval,
+                                 progress=False, auto_adjust=True)['Close']
+            except Exception as e:
+                print(f"Error fetching data from {start.date()} to {stop.date()}: {e}")
+                df = pd.DataFrame()
+
+            # Handle single ticker case
+            if isinstance(df, pd.Series):
+                df = df.to_frame(name=tickers[0])
+            if not df.empty:
+                rows += self.append(name, df.reindex(columns=tickers))
+            start = stop
+        return rows
 
+    def iter_blocks(self, name, block_rows, tickers=None):
+        """
+        Yields the panel by consecutive blocks of at most block_rows dates.
+        """
+        usecols = None
+        if tickers is not None:
+            usecols = ["Date"] + list(tickers)
+        for block in pd.read_csv(self.path(name), index_col="Date", usecols=usecols,
+                                 parse_dates=True, chunksize=block_rows):
+            yield block
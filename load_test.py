@@ -0,0 +1,234 @@
+"""
+DASHBOARD LOAD TEST
+-------------------
+Drives N simulated users through app.py (Quant B page, then Quant A via display_quant_a)
+with Streamlit's AppTest. AppTest is not thread-safe, so sessions run concurrently in
+spawned worker processes (one after another within a process, sharing its caches).
+Market data comes from an offline source (synthetic prices, or a local PriceStore panel),
+with an optional artificial latency to mimic the network.
+
+Reports p50/p95 rerun latency, throughput, CPU time and peak memory, and how many
+downloads were actually made versus requested (request coalescing). Sessions that fail
+are counted as errors, and the exit status is non-zero when reruns are missing.
+
+Usage: python load_test.py --sessions 20 --distinct 4 --latency 0.2 --processes 4
+"""
+
+import argparse
+import json
+import os
+import resource
+import multiprocessing
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from streamlit.testing.v1 import AppTest
+
+# Ensure we can import modules from the parent directory
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_loader import DOWNLOADS, PriceStore
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "portfolio_config.json")
+PERIOD_DAYS = {"1mo": 22, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260, "max": 2520}
+
+
+class OfflineSource:
+    """
+    Replacement for yf.download returning deterministic prices without network access.
+    """
+    def __init__(self, latency=0.0, store=None, panel=None):
+        self.latency = latency
+        self.store = store
+        self.panel = panel
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _closes(self, tickers, n_days, start):
+        """Close prices from the store panel if available, synthetic random walks otherwise."""
+        if self.store is not None:
+            closes = pd.concat(self.store.iter_blocks(self.panel, 100_000))
+            closes = closes.reindex(columns=tickers)
+            if start is not None:
+                return closes[closes.index >= pd.Timestamp(start)]
+            return closes.iloc[-n_days:]
+
+        end = pd.Timestamp.today().normalize()
+        index = pd.bdate_range(start=start, end=end) if start is not None else pd.bdate_range(end=end, periods=n_days)
+        closes = {}
+        for ticker in tickers:
+            # Stable seed per ticker: every session sees the same history
+            rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+            path = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, PERIOD_DAYS["max"] + 1)))
+            closes[ticker] = path[-len(index):]
+        return pd.DataFrame(closes, index=index)
+
+    def download(self, tickers, period="1y", start=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+
+        if isinstance(tickers, str):
+            tickers = tickers.split()
+        closes = self._closes(list(tickers), PERIOD_DAYS.get(period, 252), start)
+        fields = {"Close": closes, "High": closes * 1.01, "Low": closes * 0.99, "Open": closes,
+                  "Volume": closes * 0 + 1e6}
+        return pd.concat(fields, axis=1)
+
+
+# Steps of one simulated session (one timed rerun each)
+SESSION_STEPS = ["Quant B (open)", "Quant A (open)", "Quant A (market)", "Quant A (asset)",
+                 "Quant A (strategy)", "Quant B (back)"]
+# Quant A market whose assets the sessions pick from
+MARKET = "CAC 40 (France)"
+
+
+def widget(widgets, label):
+    """
+    Widget of a list (e.g. at.sidebar.selectbox) by label: positions change with the page.
+    """
+    return next(w for w in widgets if w.label == label)
+
+
+def run_session(at, session_id, distinct, latencies, errors):
+    """
+    One simulated user: opens the dashboard, switches to Quant A, picks a market, an asset
+    and a strategy, then goes back to Quant B. Each rerun is timed.
+    """
+    def timed(action, label):
+        started = time.perf_counter()
+        action()
+        latencies.append((label, time.perf_counter() - started))
+        if at.exception:
+            errors.append((session_id, label, at.exception[0].value))
+
+    timed(at.run, "Quant B (open)")
+    timed(lambda: at.sidebar.radio[0].set_value("Quant A (Single Asset)").run(), "Quant A (open)")
+    timed(lambda: widget(at.sidebar.selectbox, "Market").set_value(MARKET).run(), "Quant A (market)")
+
+    # Sessions share one of `distinct` assets: identical requests should be coalesced
+    ticker = widget(at.sidebar.selectbox, "Select Asset").options[session_id % distinct]
+    timed(lambda: widget(at.sidebar.selectbox, "Select Asset").set_value(ticker).run(), "Quant A (asset)")
+    if f"Performance: {ticker} vs Strategy" not in [h.value for h in at.subheader]:
+        errors.append((session_id, "Quant A (asset)", f"{ticker} was not rendered"))
+    timed(lambda: widget(at.sidebar.radio, "Strategy").set_value("Momentum").run(), "Quant A (strategy)")
+    timed(lambda: at.sidebar.radio[0].set_value("Quant B (Portfolio)").run(), "Quant B (back)")
+
+
+def run_worker(session_ids, distinct, latency, store, panel):
+    """
+    Runs sessions one after another in a spawned process: AppTest is not thread-safe, so
+    concurrency comes from the processes. Sessions of a process share its caches.
+    A session that raises is counted as an error (its remaining reruns are missing).
+    """
+    source = OfflineSource(latency=latency, store=store, panel=panel)
+    yf.download = source.download
+
+    latencies, errors = [], []
+    cpu_start = time.process_time()
+    for session_id in session_ids:
+        try:
+            run_session(AppTest.from_file(APP_FILE, default_timeout=300), session_id, distinct, latencies, errors)
+        except Exception as e:
+            errors.append((session_id, "crash", repr(e)))
+
+    return {
+        "latencies": latencies,
+        "errors": errors,
+        "cpu": time.process_time() - cpu_start,
+        # ru_maxrss is in kilobytes on Linux
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "downloads": source.calls,
+        "coalescing": dict(DOWNLOADS.stats),
+    }
+
+
+def run_load_test(sessions=10, distinct=2, latency=0.1, store=None, panel=None, processes=None):
+    processes = min(processes or os.cpu_count() or 1, sessions)
+
+    # The app saves the portfolio configuration on every Quant B rerun: restore it afterwards
+    saved_config = open(CONFIG_FILE).read() if os.path.exists(CONFIG_FILE) else None
+
+    context = multiprocessing.get_context("spawn")
+    wall_start = time.perf_counter()
+    try:
+        with context.Pool(processes) as pool:
+            results = pool.starmap(run_worker, [(list(range(sessions))[worker::processes], distinct, latency,
+                                                 store, panel) for worker in range(processes)])
+    finally:
+        if saved_config is not None:
+            with open(CONFIG_FILE, "w") as f:
+                f.write(saved_config)
+    wall = time.perf_counter() - wall_start
+
+    latencies = [entry for result in results for entry in result["latencies"]]
+    errors = [entry for result in results for entry in result["errors"]]
+    cpu = sum(result["cpu"] for result in results)
+    coalescing = {}
+    for result in results:
+        for key, value in result["coalescing"].items():
+            coalescing[key] = coalescing.get(key, 0) + value
+
+    values = np.array([duration for _, duration in latencies])
+    by_step = pd.DataFrame(latencies, columns=["Step", "Latency"]).groupby("Step", sort=False)["Latency"]
+    percentile = lambda q: float(np.percentile(values, q)) if len(values) else float("nan")
+
+    return {
+        "Sessions": sessions,
+        "Processes": processes,
+        "Distinct Assets": distinct,
+        "Reruns Expected": sessions * len(SESSION_STEPS),
+        "Reruns Completed": len(values),
+        "Errors": len(errors),
+        "p50 Latency (s)": percentile(50),
+        "p95 Latency (s)": percentile(95),
+        "Max Latency (s)": percentile(100),
+        "Throughput (reruns/s)": len(values) / wall,
+        "Wall Time (s)": wall,
+        "CPU Time (s)": cpu,
+        "CPU Utilization": cpu / wall,
+        "Peak RSS per Process (MB)": max(result["rss_mb"] for result in results),
+        "Downloads Made": sum(result["downloads"] for result in results),
+        "Downloads Requested": coalescing.get("requests", 0),
+        "Coalescing": coalescing,
+        "p95 by Step (s)": by_step.quantile(0.95).round(3).to_dict(),
+        "Error Details": [f"session {s} / {step}: {message}" for s, step, message in errors[:5]]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-user load test of the dashboard (offline data).")
+    parser.add_argument("--sessions", type=int, default=10, help="Number of simulated users")
+    parser.add_argument("--distinct", type=int, default=2, help="Number of distinct Quant A assets among users")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated download latency (seconds)")
+    parser.add_argument("--store", default=None, help="PriceStore directory to read prices from")
+    parser.add_argument("--panel", default="prices", help="PriceStore panel name")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    store = PriceStore(args.store) if args.store else None
+    results = run_load_test(args.sessions, args.distinct, args.latency, store, args.panel, args.processes)
+
+    print("========================================")
+    print(f" LOAD TEST: {args.sessions} sessions")
+    print("========================================")
+    for key, value in results.items():
+        if isinstance(value, float):
+            print(f"{key:<28} {value:.3f}")
+        else:
+            print(f"{key:<28} {value}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+    # A truncated sample would make the numbers above misleading
+    if results["Errors"] or results["Reruns Completed"] != results["Reruns Expected"]:
+        sys.exit(1)
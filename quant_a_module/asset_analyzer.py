@@ -3,21 +3,45 @@ import pandas as pd
 import numpy as np 
 import streamlit as st
 
+from data_loader import DOWNLOADS, download_key
+from quant_a_module.strategies import get_strategy, execute_signals, compute_rsi
+from quant_a_module.forecasting import FORECAST_CACHE
+from quant_a_module.significance import bootstrap_significance
+from risk_engine import RiskEngine
+from streaming_metrics import StreamingMetrics
+
 class AssetAnalyzer():
     def __init__ (self, ticker):
         self.ticker = ticker 
         self.data = None
+        # Live mode: streaming metrics updated bar by bar (see start_live / refresh_live)
+        self.live_df = None
+        self.live_metrics = None
+        self._live_key = None
+        self._live_checkpoint = None
 
-    def get_data(self, period="1y"): 
+    def _download(self, period="1y", start=None):
         """
-        Fetch historical data (Close Price and Returns) using yfinance.
+        Downloads daily OHLCV bars with auto_adjust to handle dividends/splits.
+        start: optional first date (overrides period).
         """
-        # Download data with auto_adjust to handle dividends/splits
-        df = yf.download(self.ticker, period=period, interval="1d", progress=False, auto_adjust=True)
+        if start is not None:
+            kwargs = dict(start=start, interval="1d", progress=False, auto_adjust=True)
+        else:
+            kwargs = dict(period=period, interval="1d", progress=False, auto_adjust=True)
+        # Identical downloads from concurrent sessions are made once (shared result, hence the copy)
+        df = DOWNLOADS.run(download_key(self.ticker, **kwargs), lambda: yf.download(self.ticker, **kwargs)).copy()
         
         # Handle MultiIndex columns (common in new yfinance versions)
         if isinstance(df.columns, pd.MultiIndex):
             df.columns = df.columns.get_level_values(0)
+        return df
+
+    def get_data(self, period="1y"): 
+        """
+        Fetch historical data (Close Price and Returns) using yfinance.
+        """
+        df = self._download(period)
 
         # Calculate daily returns
         df['Returns'] = df['Close'].pct_change()
@@ -32,75 +56,43 @@ class AssetAnalyzer():
         """
         Helper method to calculate the Relative Strength Index (RSI).
         """
-        # Calculate price differences
-        delta = self.data['Close'].diff()
-        
-        # Separate gains and losses
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        
-        # Calculate rolling averages (Simple Moving Average approach)
-        avg_gain = gain.rolling(window=window).mean()
-        avg_loss = loss.rolling(window=window).mean()
-        
-        # Calculate RS and RSI
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        close = self.data['Close'].to_numpy(dtype=float).reshape(-1, 1)
+        rsi = compute_rsi(close, window)
+        return pd.Series(rsi[:, 0], index=self.data.index)
 
-    def run_strategy(self, strategy_name, short_window=20, long_window=50, rsi_window=14, rsi_buy=30, rsi_sell=70):
+    def run_strategy(self, strategy_name, short_window=20, long_window=50, rsi_window=14, rsi_buy=30, rsi_sell=70, **params):
         """
-        Run the selected backtesting strategy.
+        Run the selected backtesting strategy (see quant_a_module.strategies for the registry).
         Returns the DataFrame with signals and cumulative performance.
         """
         if self.data is None or self.data.empty:
             return None 
         
-        # Create a copy to avoid modifying the original data
-        df = self.data.copy()
+        params.update(short_window=short_window, long_window=long_window,
+                      rsi_window=rsi_window, rsi_buy=rsi_buy, rsi_sell=rsi_sell)
 
-        # --- Strategy 1: Buy and Hold ---
-        if strategy_name == "Buy and Hold":
-            df['Strategy_Returns'] = df['Returns']
-
-        # --- Strategy 2: Momentum (SMA Crossover) ---
-        elif strategy_name == "Momentum":
-            # Calculate Moving Averages
-            df['SMA_Short'] = df['Close'].rolling(window=short_window).mean()
-            df['SMA_Long'] = df['Close'].rolling(window=long_window).mean()
+        # Create a copy to avoid modifying the original data
+        return self._apply_strategy(get_strategy(strategy_name), self.data.copy(), params)
 
-            # Signal: 1 if Short > Long, else 0
-            df['Signal'] = np.where(df['SMA_Short'] > df['SMA_Long'], 1, 0)
-            
-            # Shift signal by 1 day to simulate next-day execution
-            df['Strategy_Returns'] = df['Signal'].shift(1) * df['Returns']
+    @staticmethod
+    def _apply_strategy(strategy, df, params, initial_signal=None):
+        """
+        Adds the indicators, 'Signal', 'Strategy_Returns' and 'Cumulative_Strategy' columns to df.
+        initial_signal: position held before the first row (stateful strategies).
+        """
+        # Run the vectorized kernel on a single-column price array
+        close = df['Close'].to_numpy(dtype=float).reshape(-1, 1)
+        signal, indicators = strategy.signals(close, initial_signal=initial_signal, **params)
+        for column, values in indicators.items():
+            df[column] = values[:, 0]
 
-        # --- Strategy 3: RSI (Mean Reversion) ---
-        elif strategy_name == "RSI Strategy":
-            # Compute the indicator
-            df['RSI'] = self._compute_rsi(window=rsi_window)
-            
-            # Initialize signal column with NaN
-            df['Signal'] = np.nan
-            
-            # Enter position (Buy) when asset is oversold
-            df.loc[df['RSI'] < rsi_buy, 'Signal'] = 1
-            
-            # Exit position (Sell) when asset is overbought
-            df.loc[df['RSI'] > rsi_sell, 'Signal'] = 0
-            
-            # Fill NaN values with the previous valid signal (Hold logic)
-            df['Signal'] = df['Signal'].ffill()
-            
-            # Fill initial NaNs with 0 (Not invested at start)
-            df['Signal'] = df['Signal'].fillna(0)
-            
-            # Calculate returns (shifted by 1 day)
-            df['Strategy_Returns'] = df['Signal'].shift(1) * df['Returns']
-            
-        # Calculate Cumulative Value (Base 100)
-        df['Cumulative_Strategy'] = (1 + df['Strategy_Returns'].fillna(0)).cumprod() * 100
+        # Shared next-day execution and cumulative value (Base 100)
+        returns = df['Returns'].to_numpy(dtype=float).reshape(-1, 1)
+        strategy_returns, cumulative = execute_signals(signal, returns)
+        if signal is not None:
+            df['Signal'] = signal[:, 0]
+        df['Strategy_Returns'] = strategy_returns[:, 0]
+        df['Cumulative_Strategy'] = cumulative[:, 0]
         
         return df
     
@@ -155,6 +147,114 @@ class AssetAnalyzer():
             "Win Rate": win_rate
         }
 
+    def start_live(self, strategy_name, **params):
+        """
+        Runs the strategy on the loaded data and seeds the streaming metrics.
+        Returns the same dictionary as get_metrics.
+        """
+        df = self.run_strategy(strategy_name, **params)
+        if df is None:
+            return None
+
+        self._live_key = (strategy_name, tuple(sorted(params.items())))
+        self.live_metrics = StreamingMetrics()
+        self._advance_live(df['Strategy_Returns'])
+        self.live_df = df
+        return self.live_metrics.get_metrics()
+
+    def _advance_live(self, strategy_returns):
+        """
+        Feeds new strategy returns to the streaming metrics.
+        The checkpoint is taken before the newest bar, which may still be forming.
+        """
+        self.live_metrics.update_many(strategy_returns.iloc[:-1])
+        self._live_checkpoint = self.live_metrics.snapshot()
+        self.live_metrics.update_many(strategy_returns.iloc[-1:])
+
+    def refresh_live(self, strategy_name, fetch=True, **params):
+        """
+        Pulls only the bars since the last known date and updates the metrics in O(new bars).
+        The last known bar is re-applied from the checkpoint since its close may have changed.
+        The strategy only runs on the new bars, after the `lookback` settled bars its indicator
+        windows need, starting from the position held on the last settled bar.
+        fetch=False only reruns the strategy if its parameters changed (no download).
+        """
+        key = (strategy_name, tuple(sorted(params.items())))
+        if self.live_metrics is None or self._live_key != key or len(self.data) < 3:
+            return self.start_live(strategy_name, **params)
+        if not fetch:
+            return self.live_metrics.get_metrics()
+
+        last_date = self.data.index[-1]
+        latest = self._download(start=last_date)
+        latest = latest[latest.index >= last_date]
+        if latest.empty:
+            return self.live_metrics.get_metrics()
+
+        # Replace the last known bar and append the new ones
+        base = self.data[self.data.index < last_date]
+        closes = pd.concat([base['Close'].iloc[-1:], latest['Close']])
+        latest = latest.copy()
+        latest['Returns'] = closes.pct_change().iloc[1:].values
+        self.data = pd.concat([base, latest[base.columns]])
+
+        # Signals are causal: only the rows from last_date onward are new
+        strategy = get_strategy(strategy_name)
+        settled = self.live_df[self.live_df.index < last_date]
+        first = max(len(settled) - strategy.lookback(**params), 0)
+        initial = settled['Signal'].iloc[-1] if 'Signal' in settled.columns else None
+        new = self._apply_strategy(strategy, self.data.iloc[first:].copy(), params, initial_signal=initial)
+        new = new[new.index >= last_date]
+        # The cumulative value continues from the last settled bar
+        new['Cumulative_Strategy'] = (settled['Cumulative_Strategy'].iloc[-1]
+                                      * (1 + new['Strategy_Returns'].fillna(0)).cumprod())
+
+        self.live_metrics = StreamingMetrics.from_snapshot(self._live_checkpoint)
+        self._advance_live(new['Strategy_Returns'])
+        self.live_df = pd.concat([settled, new])
+        return self.live_metrics.get_metrics()
+
+    def get_risk_metrics(self, df, window=250, levels=(0.95, 0.99)):
+        """
+        Tail risk of the strategy: rolling Historical, Parametric and EWMA VaR/CVaR,
+        plus a backtest of VaR exceptions. Returns (rolling DataFrame, summary DataFrame).
+        """
+        if df is None or 'Strategy_Returns' not in df.columns:
+            return None, None
+
+        returns = df['Strategy_Returns'].fillna(0)
+        engine = RiskEngine(window=window, levels=levels)
+        rolling = engine.rolling_risk(returns)
+        return rolling, engine.summary(returns, rolling)
+
+    def get_significance(self, df, n_trials=1, trial_sharpes=None, n_resamples=2000, level=0.95):
+        """
+        Bootstrap confidence intervals of the Sharpe ratio, CAGR and max drawdown, and the
+        deflated Sharpe ratio given the number of parameter sets tried (see significance.py).
+        Returns (intervals DataFrame, summary dict).
+        """
+        if df is None or 'Strategy_Returns' not in df.columns:
+            return None, {}
+
+        returns = df['Strategy_Returns'].fillna(0)
+        return bootstrap_significance(returns.to_numpy(dtype=float), df.index, n_resamples=n_resamples,
+                                      level=level, n_trials=n_trials, trial_sharpes=trial_sharpes)
+
+    def get_forecast(self, steps=5, order=(1, 1, 1), level=0.95):
+        """
+        ARIMA forecast of the close price for the next steps, with its confidence band.
+        The fitted model is cached per ticker: new bars only update its state (see forecasting.py).
+        Returns a DataFrame with 'Forecast', 'Lower' and 'Upper' columns indexed by future dates.
+        """
+        if self.data is None or len(self.data) < 30:
+            return None
+
+        try:
+            return FORECAST_CACHE.forecast(self.ticker, self.data['Close'], steps=steps, order=order, level=level)
+        except Exception as e:
+            print(f"Error forecasting {self.ticker}: {e}")
+            return None
+
 # ----------------------------------- Test of AssetAnalyzer Class ---------------------------------------
 
 # Test = AssetAnalyzer('GOOG')
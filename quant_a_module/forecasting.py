@@ -0,0 +1,182 @@
+"""
+ARIMA FORECASTING
+-----------------
+Price forecasts from an ARIMA model on log prices (bands are the model's confidence
+interval mapped back to prices).
+
+Fitted models are cached per (ticker, order). The cached model covers the settled bars
+(every bar but the last one, which may still be forming): when new bars arrive, the model
+state is extended with them using the fitted parameters, instead of refitting from scratch.
+A model is only refitted when the settled history no longer matches (restated prices).
+"""
+
+import multiprocessing
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from multiprocessing import TimeoutError
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+
+def _fit(log_prices, order):
+    """
+    Maximum likelihood fit of an ARIMA model (estimation warnings are expected on noisy prices).
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return ARIMA(log_prices, order=order).fit()
+
+
+def _extend(results, log_prices):
+    """
+    New observations filtered with the fitted parameters (no re-estimation).
+    """
+    if len(log_prices) == 0:
+        return results
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return results.extend(log_prices)
+
+
+def _predict(results, steps, level):
+    """
+    Forecast and confidence band, in prices.
+    """
+    forecast = results.get_forecast(steps)
+    bands = np.asarray(forecast.conf_int(alpha=1 - level))
+    return np.exp(np.asarray(forecast.predicted_mean)), np.exp(bands[:, 0]), np.exp(bands[:, 1])
+
+
+def future_dates(index, steps):
+    """
+    Dates of the next steps: every day for assets trading on weekends (crypto), business days otherwise.
+    """
+    freq = "D" if (index.dayofweek >= 5).any() else "B"
+    return pd.date_range(index[-1], periods=steps + 1, freq=freq)[1:]
+
+
+def forecast_frame(index, steps, forecast, lower, upper):
+    return pd.DataFrame({"Forecast": forecast, "Lower": lower, "Upper": upper},
+                        index=future_dates(index, steps))
+
+
+class ForecastCache:
+    """
+    Fitted ARIMA models shared by every analyzer of the process (least recently used first out).
+    Each entry holds the model over the settled bars and the last settled date and price.
+    """
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"fits": 0, "extends": 0, "hits": 0}
+
+    def settled_model(self, ticker, close, order):
+        """
+        Model of every bar of close but the last one.
+        """
+        settled = close.iloc[:-1]
+        key = (ticker, tuple(order))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None and entry["last_date"] in settled.index \
+                and np.isclose(settled[entry["last_date"]], entry["last_price"]):
+            new_bars = settled[settled.index > entry["last_date"]]
+            if new_bars.empty:
+                with self._lock:
+                    self.stats["hits"] += 1
+                return entry["results"]
+            # New settled bars: update the filter state only
+            results = _extend(entry["results"], np.log(new_bars.to_numpy(dtype=float)))
+            outcome = "extends"
+        else:
+            results = _fit(np.log(settled.to_numpy(dtype=float)), order)
+            outcome = "fits"
+
+        with self._lock:
+            self.stats[outcome] += 1
+            self._entries[key] = {"results": results, "last_date": settled.index[-1],
+                                  "last_price": float(settled.iloc[-1])}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return results
+
+    def forecast(self, ticker, close, steps=5, order=(1, 1, 1), level=0.95):
+        """
+        Forecast of the next steps from the cached model, the last bar being applied on top.
+        """
+        close = close.dropna()
+        results = self.settled_model(ticker, close, order)
+        results = _extend(results, np.log(close.to_numpy(dtype=float)[-1:]))
+        return forecast_frame(close.index, steps, *_predict(results, steps, level))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Models shared by every analyzer (and every session) of the process
+FORECAST_CACHE = ForecastCache()
+
+
+def _fit_forecast(close_values, order, steps, level):
+    """
+    Worker task: fits one series and returns (forecast, lower, upper) arrays.
+    """
+    results = _fit(np.log(close_values), order)
+    return _predict(results, steps, level)
+
+
+def forecast_universe(prices, steps=5, order=(1, 1, 1), level=0.95, max_workers=4, timeout=60, min_obs=60):
+    """
+    Fits one ARIMA model per column of a (dates x tickers) close panel in a process pool.
+    timeout is the time budget of the whole universe, counted from the submission of the
+    models: the ones not finished by then are reported as 'timeout', and the pool is
+    terminated at the end, stopping any model still running.
+    Workers are spawned (not forked): the dashboard process runs many threads, and a fork
+    could copy a lock held by one of them and deadlock.
+    Returns one row per ticker with the forecast at the horizon, its band and the expected return.
+    """
+    rows = {}
+    tasks = {}
+    with multiprocessing.get_context("spawn").Pool(processes=max_workers) as pool:
+        for ticker in prices.columns:
+            close = prices[ticker].dropna()
+            if len(close) < min_obs:
+                rows[ticker] = {"Status": "not enough data"}
+                continue
+            tasks[ticker] = (close, pool.apply_async(_fit_forecast, (close.to_numpy(dtype=float), order, steps, level)))
+        deadline = time.monotonic() + timeout
+
+        for ticker, (close, task) in tasks.items():
+            try:
+                forecast, lower, upper = task.get(timeout=max(deadline - time.monotonic(), 0))
+            except TimeoutError:
+                rows[ticker] = {"Status": "timeout"}
+                continue
+            except Exception as e:
+                rows[ticker] = {"Status": f"error: {e}"}
+                continue
+
+            last_price = float(close.iloc[-1])
+            rows[ticker] = {
+                "Last Price": last_price,
+                "Forecast": forecast[-1],
+                "Lower": lower[-1],
+                "Upper": upper[-1],
+                "Expected Return": forecast[-1] / last_price - 1,
+                "Status": "ok"
+            }
+        # Leaving the block terminates the workers (including timed-out ones)
+
+    table = pd.DataFrame.from_dict(rows, orient="index").reindex(prices.columns)
+    table.index.name = "Ticker"
+    return table.reindex(columns=["Last Price", "Forecast", "Lower", "Upper", "Expected Return", "Status"])
@@ -0,0 +1,128 @@
+import yfinance as yf
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from data_loader import DOWNLOADS, download_key
+from quant_a_module.strategies import run_strategy_batch
+
+
+def compute_panel_metrics(strategy_returns):
+    """
+    Same KPIs as AssetAnalyzer.get_metrics, computed for every column of a
+    (dates x tickers) strategy return panel at once.
+    Each column starts at its first available return (NaN before that).
+    """
+    values = strategy_returns.to_numpy(dtype=float)
+    dates = strategy_returns.index
+    started = np.maximum.accumulate(~np.isnan(values), axis=0)
+    has_data = started.any(axis=0)
+
+    # 1. Prepare data (missing strategy returns count as flat days, like fillna(0))
+    returns = np.where(started, np.nan_to_num(values, nan=0.0), np.nan)
+
+    # 2. Total Return & CAGR
+    first_row = np.argmax(started, axis=0)
+    days = np.array([(dates[-1] - dates[i]).days for i in first_row])
+    years = np.maximum(days / 365.25, 0.01)
+
+    growth = np.cumprod(np.where(started, 1 + returns, 1.0), axis=0)
+    total_return = growth[-1] - 1
+    cagr = (1 + total_return) ** (1 / years) - 1
+
+    # 3. Volatility (only over each ticker's own history)
+    n_obs = started.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(returns, axis=0) / n_obs
+        variance = np.nansum((returns - mean) ** 2, axis=0) / (n_obs - 1)
+    volatility = np.sqrt(variance) * np.sqrt(252)
+
+    # 4. Sharpe Ratio (Risk Free Rate assumed 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(volatility > 0, cagr / volatility, 0.0)
+
+    # 5. Max Drawdown (running max starts at the first observation, as in get_metrics)
+    running_max = np.maximum.accumulate(np.where(started, growth, -np.inf), axis=0)
+    with np.errstate(invalid="ignore"):
+        drawdown = np.where(started, (growth - running_max) / running_max, 0.0)
+    max_dd = drawdown.min(axis=0)
+
+    # 6. Win Rate (Percentage of positive days among active days)
+    filled = np.nan_to_num(returns, nan=0.0)
+    positive_days = (filled > 0).sum(axis=0)
+    total_days = (filled != 0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_rate = np.where(total_days > 0, positive_days / total_days, 0.0)
+
+    metrics = pd.DataFrame({
+        "Total Return": total_return,
+        "CAGR": cagr,
+        "Volatility": volatility,
+        "Sharpe Ratio": sharpe,
+        "Max Drawdown": max_dd,
+        "Win Rate": win_rate,
+        "Days": n_obs
+    }, index=strategy_returns.columns)
+    return metrics[has_data]
+
+
+class UniverseScreener:
+    """
+    Runs the metrics and one strategy over a whole universe of tickers.
+    Prices are handled as a single (dates x tickers) panel instead of one AssetAnalyzer per ticker.
+    """
+    def __init__(self, tickers, max_workers=8, chunk_size=100):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.failed = []
+
+    def _download_chunk(self, chunk, period):
+        """
+        Downloads the close prices of one chunk of tickers.
+        """
+        try:
+            kwargs = dict(period=period, interval="1d", progress=False, auto_adjust=True)
+            df = DOWNLOADS.run(download_key(chunk, **kwargs), lambda: yf.download(chunk, **kwargs))['Close'].copy()
+        except Exception as e:
+            print(f"Error fetching data for {chunk}: {e}")
+            return pd.DataFrame(columns=chunk)
+
+        # Handle single ticker case
+        if isinstance(df, pd.Series):
+            df = df.to_frame(name=chunk[0])
+        return df
+
+    def get_prices(self, period="1y"):
+        """
+        Fetches the close price panel, downloading chunks of tickers in parallel.
+        """
+        chunks = [self.tickers[i:i + self.chunk_size] for i in range(0, len(self.tickers), self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+            frames = list(pool.map(lambda chunk: self._download_chunk(chunk, period), chunks))
+
+        prices = pd.concat(frames, axis=1).sort_index()
+        prices = prices.loc[:, ~prices.columns.duplicated()]
+        return prices
+
+    def run(self, strategy_name, period="1y", prices=None, **params):
+        """
+        Screens the universe: runs the strategy on every ticker and ranks them by Sharpe Ratio.
+        prices: optional (dates x tickers) close panel already available locally.
+        """
+        if prices is None:
+            prices = self.get_prices(period=period)
+
+        # Tickers without any price are reported as failed
+        prices = prices.dropna(axis=1, how="all")
+        self.failed = [t for t in self.tickers if t not in prices.columns]
+
+        # Fill gaps within each ticker's own history only (leading NaNs are kept)
+        prices = prices.ffill()
+
+        strategy_returns, _ = run_strategy_batch(strategy_name, prices, **params)
+        ranking = compute_panel_metrics(strategy_returns)
+        ranking.insert(0, "Last Price", prices.iloc[-1])
+        ranking.index.name = "Ticker"
+
+        return ranking.sort_values("Sharpe Ratio", ascending=False)
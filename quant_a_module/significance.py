@@ -0,0 +1,146 @@
+"""
+BOOTSTRAP SIGNIFICANCE
+----------------------
+Is a backtest better than luck?
+1. Stationary bootstrap (Politis & Romano): the strategy returns are resampled by blocks of
+   random (geometric) length, which keeps the short-term dependence of the returns.
+   All resamples are drawn and evaluated at once as (resamples x days) arrays.
+2. Confidence intervals of the Sharpe ratio, CAGR and max drawdown (percentile method),
+   with the same definitions as AssetAnalyzer.get_metrics.
+3. Deflated Sharpe ratio (Bailey & Lopez de Prado): probability that the true Sharpe ratio
+   is positive, after correcting for the number of parameter sets tried, the length of the
+   track record and the skewness / kurtosis of the returns.
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+EULER_GAMMA = 0.5772156649015329
+METRICS = ["Sharpe Ratio", "CAGR", "Max Drawdown"]
+
+
+def stationary_bootstrap_indices(n_obs, n_resamples, mean_block=10, rng=None):
+    """
+    Index matrix (n_resamples x n_obs) of stationary bootstrap resamples.
+    Each day starts a new block with probability 1 / mean_block (always on the first day);
+    inside a block the indices are consecutive, wrapping around the end of the sample.
+    """
+    rng = np.random.default_rng(rng)
+    new_block = rng.random((n_resamples, n_obs), dtype=np.float32) < 1.0 / mean_block
+    new_block[:, 0] = True
+
+    # Block number of every cell, then one random start per block, stored as the offset
+    # (start - first day of the block) so that index = offset + day
+    block_id = np.cumsum(new_block, axis=None, dtype=np.int32).reshape(new_block.shape) - 1
+    offsets = rng.integers(0, n_obs, size=int(block_id[-1, -1]) + 1) - np.nonzero(new_block)[1]
+    return (offsets[block_id] + np.arange(n_obs)) % n_obs
+
+
+def batch_metrics(returns, years, periods_per_year=252):
+    """
+    CAGR, volatility, Sharpe ratio and max drawdown of each row of a (paths x days) return matrix.
+    """
+    growth = np.cumprod(1 + returns, axis=1)
+    cagr = growth[:, -1] ** (1 / years) - 1
+    volatility = returns.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(volatility > 0, cagr / volatility, 0.0)
+    running_max = np.maximum.accumulate(growth, axis=1)
+    max_drawdown = (growth / running_max - 1).min(axis=1)
+    return {"Sharpe Ratio": sharpe, "CAGR": cagr, "Volatility": volatility, "Max Drawdown": max_drawdown}
+
+
+def deflated_sharpe_ratio(returns, n_trials=1, trial_sharpes=None):
+    """
+    Deflated Sharpe ratio of per-period returns (a probability between 0 and 1).
+    The benchmark is the expected maximum Sharpe ratio of n_trials unskilled strategies.
+    Its dispersion is the variance of the Sharpe ratios of the trials when at least two are
+    given (trial_sharpes, per period), the variance of the Sharpe estimator otherwise.
+    Returns (dsr, observed Sharpe, benchmark Sharpe), Sharpe ratios per period (not annualized).
+    """
+    returns = np.asarray(returns, dtype=float)
+    n_obs = len(returns)
+    std = returns.std(ddof=1)
+    if n_obs < 3 or std == 0:
+        return float("nan"), 0.0, 0.0
+
+    sharpe = returns.mean() / std
+    centered = (returns - returns.mean()) / returns.std()
+    skew = np.mean(centered ** 3)
+    kurtosis = np.mean(centered ** 4)
+    # Non-normal returns widen the estimation error of the Sharpe ratio
+    estimator_var = max(1 - skew * sharpe + (kurtosis - 1) / 4 * sharpe ** 2, 1e-12)
+
+    n_trials = max(int(n_trials), 1)
+    if n_trials == 1:
+        benchmark = 0.0
+    else:
+        if trial_sharpes is not None and len(trial_sharpes) > 1:
+            trials_var = float(np.var(trial_sharpes, ddof=1))
+        else:
+            trials_var = estimator_var / (n_obs - 1)
+        normal = NormalDist()
+        expected_max = ((1 - EULER_GAMMA) * normal.inv_cdf(1 - 1 / n_trials)
+                        + EULER_GAMMA * normal.inv_cdf(1 - 1 / (n_trials * math.e)))
+        benchmark = math.sqrt(trials_var) * expected_max
+
+    z = (sharpe - benchmark) * math.sqrt(n_obs - 1) / math.sqrt(estimator_var)
+    return NormalDist().cdf(z), float(sharpe), float(benchmark)
+
+
+def bootstrap_significance(returns, dates, n_resamples=2000, mean_block=10, level=0.95,
+                           n_trials=1, trial_sharpes=None, seed=0, batch_size=500):
+    """
+    Bootstrap confidence intervals of the Sharpe ratio, CAGR and max drawdown of a strategy,
+    and its deflated Sharpe ratio. The resamples are evaluated in batches of batch_size rows
+    to bound memory on long histories. A fixed seed keeps the intervals stable between reruns.
+    dates: dates of the returns (only the first and last ones are used, for annualization).
+    Returns (intervals DataFrame indexed by metric, summary dict).
+    """
+    returns = np.nan_to_num(np.asarray(returns, dtype=float))
+    n_obs = len(returns)
+    if n_obs < 3:
+        return None, {}
+
+    days = (dates[-1] - dates[0]).days
+    years = max(days / 365.25, 0.01)
+    observed = {k: float(v[0]) for k, v in batch_metrics(returns[None, :], years).items()}
+
+    rng = np.random.default_rng(seed)
+    samples = {metric: [] for metric in METRICS}
+    for start in range(0, n_resamples, batch_size):
+        size = min(batch_size, n_resamples - start)
+        indices = stationary_bootstrap_indices(n_obs, size, mean_block, rng)
+        batch = batch_metrics(returns[indices], years)
+        for metric in METRICS:
+            samples[metric].append(batch[metric])
+
+    alpha = (1 - level) / 2
+    rows = {}
+    for metric in METRICS:
+        values = np.concatenate(samples[metric])
+        rows[metric] = {
+            "Observed": observed[metric],
+            "Lower": float(np.quantile(values, alpha)),
+            "Upper": float(np.quantile(values, 1 - alpha)),
+            "Bootstrap Std": float(values.std(ddof=1))
+        }
+    intervals = pd.DataFrame.from_dict(rows, orient="index")
+    intervals.index.name = "Metric"
+
+    sharpes = np.concatenate(samples["Sharpe Ratio"])
+    dsr, sharpe, benchmark = deflated_sharpe_ratio(returns, n_trials, trial_sharpes)
+    summary = {
+        "Resamples": n_resamples,
+        "Confidence": level,
+        # Share of resamples where the strategy lost money on a risk-adjusted basis
+        "P(Sharpe <= 0)": float(np.mean(sharpes <= 0)),
+        "Trials": max(int(n_trials), 1),
+        "Sharpe (per period)": sharpe,
+        "Benchmark Sharpe (per period)": benchmark,
+        "Deflated Sharpe Ratio": dsr
+    }
+    return intervals, summary
@@ -0,0 +1,291 @@
+"""
+STRATEGY REGISTRY
+-----------------
+Every backtesting strategy is declared once here with:
+1. Its parameters (default value, bounds and label used by the sidebar).
+2. A vectorized signal kernel working on a NumPy price array of shape (dates, tickers).
+
+The same kernels are used by AssetAnalyzer.run_strategy (one ticker, one column)
+and by batch / universe evaluation (one column per ticker), so a new strategy
+only needs to be registered here to be available everywhere.
+"""
+
+import warnings
+import numpy as np
+import pandas as pd
+
+STRATEGIES = {}
+
+
+class StrategyParam:
+    """
+    Declares one tunable parameter of a strategy.
+    """
+    def __init__(self, name, default, min_value, max_value, label):
+        self.name = name
+        self.default = default
+        self.min_value = min_value
+        self.max_value = max_value
+        self.label = label
+
+
+class Strategy:
+    """
+    A registered strategy: its parameters and its signal kernel.
+    The kernel returns (signal, indicators). A signal of None means 'always invested'.
+    A stateful kernel holds its position between entry and exit events: run on the latest
+    bars only, it starts from the position held before them (initial_signal).
+    """
+    def __init__(self, name, params, kernel, stateful=False):
+        self.name = name
+        self.params = params
+        self.kernel = kernel
+        self.stateful = stateful
+
+    def resolve_params(self, **overrides):
+        """
+        Returns the declared parameters, using overrides when provided.
+        Unknown keys are ignored so callers can pass every sidebar value.
+        """
+        resolved = {}
+        for param in self.params:
+            resolved[param.name] = overrides.get(param.name, param.default)
+        return resolved
+
+    def lookback(self, **overrides):
+        """
+        Number of previous bars the kernel needs to compute the signal of a new bar
+        (the longest window parameter, plus one for the day-over-day change).
+        """
+        windows = [value for name, value in self.resolve_params(**overrides).items() if name.endswith("_window")]
+        return int(max(windows, default=0)) + 1
+
+    def signals(self, close, initial_signal=None, **overrides):
+        """
+        Runs the kernel on a (dates, tickers) price array.
+        initial_signal: position held before the first row (stateful kernels; flat by default).
+        """
+        close = np.asarray(close, dtype=float)
+        params = self.resolve_params(**overrides)
+        if self.stateful and initial_signal is not None:
+            params["initial_signal"] = initial_signal
+        return self.kernel(close, **params)
+
+
+def register_strategy(name, params=None, stateful=False):
+    """
+    Decorator adding a signal kernel to the registry.
+    """
+    def decorator(kernel):
+        STRATEGIES[name] = Strategy(name, params or [], kernel, stateful)
+        return kernel
+    return decorator
+
+
+def get_strategy(name):
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}'. Available: {list(STRATEGIES.keys())}")
+    return STRATEGIES[name]
+
+
+# ----------------------------------- Array Helpers ---------------------------------------
+
+def shift(values, periods=1):
+    """
+    Shifts a 2D array down along the date axis, padding with NaN.
+    """
+    out = np.full(values.shape, np.nan)
+    if periods < len(values):
+        out[periods:] = values[:len(values) - periods]
+    return out
+
+
+def ffill(values):
+    """
+    Forward fills NaN values along the date axis (column by column).
+    """
+    mask = np.isnan(values)
+    idx = np.where(~mask, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    # Leading NaNs point to row 0, which is NaN itself, so they stay NaN
+    return values[idx, np.arange(values.shape[1])]
+
+
+def rolling_mean(values, window):
+    """
+    Rolling mean along the date axis using cumulative sums (O(n) per column).
+    Matches pandas rolling(window).mean(): NaN until the window is full,
+    NaN whenever the window contains a NaN.
+    """
+    n = len(values)
+    out = np.full(values.shape, np.nan)
+    if window > n:
+        return out
+    nan_mask = np.isnan(values)
+    csum = np.cumsum(np.where(nan_mask, 0.0, values), axis=0)
+    cnan = np.cumsum(nan_mask, axis=0)
+    csum = np.vstack([np.zeros((1, values.shape[1])), csum])
+    cnan = np.vstack([np.zeros((1, values.shape[1])), cnan])
+    sums = csum[window:] - csum[:-window]
+    nans = cnan[window:] - cnan[:-window]
+    out[window - 1:] = np.where(nans > 0, np.nan, sums / window)
+    return out
+
+
+def rolling_std(values, window):
+    """
+    Rolling sample standard deviation (ddof=1) along the date axis.
+    """
+    # Centering each column keeps the sum-of-squares formula numerically stable
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        centered = values - np.nanmean(values, axis=0)
+    mean = rolling_mean(centered, window)
+    mean_sq = rolling_mean(centered ** 2, window)
+    var = (mean_sq - mean ** 2) * window / (window - 1)
+    return np.sqrt(np.clip(var, 0, None))
+
+
+def rolling_extreme(values, window, func):
+    """
+    Rolling max/min along the date axis (NaN until the window is full).
+    """
+    out = np.full(values.shape, np.nan)
+    if window > len(values):
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+    out[window - 1:] = func(windows, axis=-1)
+    return out
+
+
+def hold_signal(enter, exit_, initial=0.0):
+    """
+    Converts entry/exit conditions into a 0/1 position:
+    1 after an entry, 0 after an exit, previous state otherwise (initial before the first event).
+    """
+    signal = np.full(enter.shape, np.nan)
+    signal[enter] = 1
+    signal[exit_] = 0
+    signal = ffill(signal)
+    return np.where(np.isnan(signal), initial, signal)
+
+
+# ----------------------------------- Signal Kernels ---------------------------------------
+
+@register_strategy("Buy and Hold")
+def buy_and_hold_kernel(close):
+    return None, {}
+
+
+@register_strategy("Momentum", [
+    StrategyParam("short_window", 20, 5, 200, "Short Window (Days)"),
+    StrategyParam("long_window", 50, 10, 365, "Long Window (Days)"),
+])
+def momentum_kernel(close, short_window, long_window):
+    # Signal: 1 if Short SMA > Long SMA, else 0
+    sma_short = rolling_mean(close, short_window)
+    sma_long = rolling_mean(close, long_window)
+    with np.errstate(invalid="ignore"):
+        signal = np.where(sma_short > sma_long, 1.0, 0.0)
+    return signal, {"SMA_Short": sma_short, "SMA_Long": sma_long}
+
+
+def compute_rsi(close, window):
+    """
+    Relative Strength Index with simple moving averages of gains and losses.
+    """
+    delta = np.vstack([np.full((1, close.shape[1]), np.nan), np.diff(close, axis=0)])
+    # A missing price (before a ticker's history starts) keeps the window incomplete
+    with np.errstate(invalid="ignore"):
+        gain = np.where(np.isnan(close), np.nan, np.where(delta > 0, delta, 0.0))
+        loss = np.where(np.isnan(close), np.nan, np.where(delta < 0, -delta, 0.0))
+    avg_gain = rolling_mean(gain, window)
+    avg_loss = rolling_mean(loss, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+
+@register_strategy("RSI Strategy", [
+    StrategyParam("rsi_window", 14, 5, 50, "RSI Window"),
+    StrategyParam("rsi_buy", 30, 10, 40, "Buy (Oversold)"),
+    StrategyParam("rsi_sell", 70, 60, 90, "Sell (Overbought)"),
+], stateful=True)
+def rsi_kernel(close, rsi_window, rsi_buy, rsi_sell, initial_signal=0.0):
+    # Enter when oversold, exit when overbought, hold in between
+    rsi = compute_rsi(close, rsi_window)
+    with np.errstate(invalid="ignore"):
+        signal = hold_signal(rsi < rsi_buy, rsi > rsi_sell, initial_signal)
+    return signal, {"RSI": rsi}
+
+
+@register_strategy("Bollinger Bands", [
+    StrategyParam("bb_window", 20, 5, 200, "Bands Window (Days)"),
+    StrategyParam("bb_std", 2.0, 0.5, 4.0, "Band Width (Std Dev)"),
+], stateful=True)
+def bollinger_kernel(close, bb_window, bb_std, initial_signal=0.0):
+    # Mean reversion: buy below the lower band, exit once back above the middle band
+    middle = rolling_mean(close, bb_window)
+    width = rolling_std(close, bb_window) * bb_std
+    upper = middle + width
+    lower = middle - width
+    with np.errstate(invalid="ignore"):
+        signal = hold_signal(close < lower, close > middle, initial_signal)
+    return signal, {"BB_Middle": middle, "BB_Upper": upper, "BB_Lower": lower}
+
+
+@register_strategy("Breakout", [
+    StrategyParam("breakout_window", 20, 5, 250, "Entry Channel (Days)"),
+    StrategyParam("exit_window", 10, 2, 250, "Exit Channel (Days)"),
+], stateful=True)
+def breakout_kernel(close, breakout_window, exit_window, initial_signal=0.0):
+    # Donchian channels built on previous closes (today's close is not in its own channel)
+    prev_close = shift(close, 1)
+    channel_high = rolling_extreme(prev_close, breakout_window, np.max)
+    channel_low = rolling_extreme(prev_close, exit_window, np.min)
+    with np.errstate(invalid="ignore"):
+        signal = hold_signal(close > channel_high, close < channel_low, initial_signal)
+    return signal, {"Channel_High": channel_high, "Channel_Low": channel_low}
+
+
+# ----------------------------------- Execution ---------------------------------------
+
+def execute_signals(signal, returns):
+    """
+    Shared next-day execution step.
+    Yesterday's signal is applied to today's return; a None signal means fully invested.
+    Returns (strategy_returns, cumulative base 100).
+    """
+    returns = np.asarray(returns, dtype=float)
+    if signal is None:
+        strategy_returns = returns.copy()
+    else:
+        strategy_returns = shift(signal, 1) * returns
+    cumulative = np.cumprod(1 + np.nan_to_num(strategy_returns, nan=0.0), axis=0) * 100
+    return strategy_returns, cumulative
+
+
+def run_strategy_batch(strategy_name, close, **params):
+    """
+    Runs one strategy over a (dates x tickers) close price panel in one pass.
+    The first available price of each ticker is only used as the base of its
+    first return, exactly like the single-asset path in AssetAnalyzer.
+    Returns (strategy_returns, cumulative) as DataFrames shaped like close.
+    """
+    strategy = get_strategy(strategy_name)
+    prices = close.to_numpy(dtype=float)
+    returns = np.full(prices.shape, np.nan)
+    returns[1:] = prices[1:] / prices[:-1] - 1
+    # Align each column with the single-asset data: no price without a return
+    prices = np.where(np.isnan(returns), np.nan, prices)
+
+    signal, _ = strategy.signals(prices, **params)
+    strategy_returns, cumulative = execute_signals(signal, returns)
+    # Before a ticker's history starts there is nothing to report
+    started = np.maximum.accumulate(~np.isnan(returns), axis=0)
+    strategy_returns = np.where(started, strategy_returns, np.nan)
+    cumulative = np.where(started, cumulative, np.nan)
+
+    return (pd.DataFrame(strategy_returns, index=close.index, columns=close.columns),
+            pd.DataFrame(cumulative, index=close.index, columns=close.columns))
@@ -0,0 +1,76 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the analyzer and the forecasting engine behind get_forecast
+from quant_a_module.asset_analyzer import AssetAnalyzer
+from quant_a_module.forecasting import ForecastCache, forecast_universe, _fit, _extend
+
+class TestForecasting(unittest.TestCase):
+
+    def setUp(self):
+        """We build 300 business days of prices; the analyzer first sees 290 of them."""
+        rng = np.random.default_rng(4)
+        dates = pd.bdate_range(start="2023-01-02", periods=300)
+        self.close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300))), index=dates)
+        self.cache = ForecastCache()
+
+    def test_forecast_shape(self):
+        analyzer = AssetAnalyzer("TEST")
+        analyzer.data = pd.DataFrame({'Close': self.close})
+        forecast = analyzer.get_forecast(steps=5)
+        self.assertEqual(list(forecast.columns), ['Forecast', 'Lower', 'Upper'])
+        self.assertEqual(len(forecast), 5)
+        self.assertTrue((forecast.index > self.close.index[-1]).all())
+        self.assertTrue((forecast.index.dayofweek < 5).all())
+        self.assertTrue(((forecast['Lower'] < forecast['Forecast']) & (forecast['Forecast'] < forecast['Upper'])).all())
+
+    def test_new_bars_extend_cached_model(self):
+        """New bars update the model state; only restated history triggers a refit."""
+        first = self.cache.forecast("TEST", self.close.iloc[:290])
+        self.assertEqual(self.cache.stats, {"fits": 1, "extends": 0, "hits": 0})
+
+        # A new still-forming bar changes: the settled model is reused as is
+        moving = self.close.iloc[:290].copy()
+        moving.iloc[-1] *= 1.01
+        self.cache.forecast("TEST", moving)
+        self.assertEqual(self.cache.stats["hits"], 1)
+
+        extended = self.cache.forecast("TEST", self.close)
+        self.assertEqual(self.cache.stats, {"fits": 1, "extends": 1, "hits": 1})
+        # Same result as filtering the whole history with the first fitted parameters
+        results = _extend(_fit(np.log(self.close.iloc[:289].to_numpy()), (1, 1, 1)), np.log(self.close.iloc[289:].to_numpy()))
+        expected = np.exp(np.asarray(results.get_forecast(5).predicted_mean))
+        np.testing.assert_allclose(extended['Forecast'].to_numpy(), expected)
+        self.assertFalse(first.index.equals(extended.index))
+
+        restated = self.close * 1.05
+        self.cache.forecast("TEST", restated)
+        self.assertEqual(self.cache.stats["fits"], 2)
+
+    def test_universe_in_process_pool(self):
+        prices = pd.DataFrame({'A': self.close, 'B': self.close[::-1].to_numpy(), 'C': self.close})
+        prices.iloc[:260, 2] = np.nan
+        table = forecast_universe(prices, steps=3, max_workers=2)
+        self.assertEqual(list(table.index), ['A', 'B', 'C'])
+        self.assertEqual(list(table['Status']), ['ok', 'ok', 'not enough data'])
+        # Each worker fits the whole series of its ticker
+        results = _fit(np.log(self.close.to_numpy()), (1, 1, 1))
+        self.assertAlmostEqual(table.loc['A', 'Forecast'], np.exp(np.asarray(results.get_forecast(3).predicted_mean))[-1])
+        self.assertAlmostEqual(table.loc['A', 'Expected Return'], table.loc['A', 'Forecast'] / self.close.iloc[-1] - 1)
+
+    def test_universe_time_budget(self):
+        """Models not finished within the budget of the universe are reported as timeouts."""
+        prices = pd.DataFrame({'A': self.close, 'B': self.close * 2})
+        table = forecast_universe(prices, steps=3, max_workers=1, timeout=0)
+        self.assertEqual(list(table['Status']), ['timeout', 'timeout'])
+        self.assertTrue(table['Forecast'].isna().all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the screener and the analyzer to compare them
+from quant_a_module.asset_analyzer import AssetAnalyzer
+from quant_a_module.screener import UniverseScreener
+
+class TestScreener(unittest.TestCase):
+
+    def setUp(self):
+        """We build a local price panel of 20 tickers; T3 starts late and T5 has no data."""
+        rng = np.random.default_rng(11)
+        dates = pd.bdate_range(start="2019-01-01", periods=600)
+        tickers = [f"T{i}" for i in range(20)]
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (600, 20)), axis=0))
+        self.prices = pd.DataFrame(prices, index=dates, columns=tickers)
+        self.prices.iloc[:250, 3] = np.nan
+        self.prices.iloc[:, 5] = np.nan
+        self.screener = UniverseScreener(tickers)
+
+    def _single_metrics(self, ticker, strategy):
+        """Reference: one AssetAnalyzer on the ticker's own history."""
+        analyzer = AssetAnalyzer(ticker)
+        df = pd.DataFrame({'Close': self.prices[ticker].dropna()})
+        df['Returns'] = df['Close'].pct_change()
+        analyzer.data = df.dropna()
+        return analyzer.get_metrics(analyzer.run_strategy(strategy))
+
+    def test_panel_matches_single_asset_metrics(self):
+        """The panel screen must give exactly the metrics of get_metrics for each ticker."""
+        for strategy in ["Buy and Hold", "Momentum", "RSI Strategy"]:
+            ranking = self.screener.run(strategy, prices=self.prices)
+            for ticker in ["T0", "T3"]:
+                expected = self._single_metrics(ticker, strategy)
+                for key, value in expected.items():
+                    self.assertAlmostEqual(ranking.loc[ticker, key], value, places=10)
+
+    def test_ranking_is_sorted_and_reports_failures(self):
+        """The table is sorted by Sharpe Ratio and tickers without data are listed as failed."""
+        ranking = self.screener.run("Momentum", prices=self.prices)
+        self.assertTrue(ranking['Sharpe Ratio'].is_monotonic_decreasing)
+        self.assertNotIn('T5', ranking.index)
+        self.assertEqual(self.screener.failed, ['T5'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the analyzer and the bootstrap behind get_significance
+from quant_a_module.asset_analyzer import AssetAnalyzer
+from quant_a_module.significance import stationary_bootstrap_indices, deflated_sharpe_ratio
+
+class TestSignificance(unittest.TestCase):
+
+    def setUp(self):
+        """We build 750 business days of strategy returns, out of the market 40% of the time."""
+        rng = np.random.default_rng(9)
+        dates = pd.bdate_range(start="2022-01-03", periods=750)
+        returns = rng.normal(0.0005, 0.012, 750)
+        returns[rng.random(750) < 0.4] = 0
+        self.df = pd.DataFrame({'Strategy_Returns': returns}, index=dates)
+
+    def test_stationary_bootstrap_blocks(self):
+        """Indices stay in range, run consecutively inside blocks of the requested mean length."""
+        indices = stationary_bootstrap_indices(5000, 20, mean_block=10, rng=1)
+        self.assertEqual(indices.shape, (20, 5000))
+        self.assertTrue(((indices >= 0) & (indices < 5000)).all())
+        breaks = np.diff(indices, axis=1) % 5000 != 1
+        mean_block = indices.size / (breaks.sum() + len(indices))
+        self.assertAlmostEqual(mean_block, 10, delta=0.5)
+
+    def test_intervals_match_metrics(self):
+        """Observed values are those of get_metrics and lie inside their bootstrap intervals."""
+        analyzer = AssetAnalyzer("TEST")
+        metrics = analyzer.get_metrics(self.df)
+        intervals, summary = analyzer.get_significance(self.df, n_resamples=1000)
+
+        for metric in ["Sharpe Ratio", "CAGR", "Max Drawdown"]:
+            self.assertAlmostEqual(intervals.loc[metric, "Observed"], metrics[metric], places=10)
+            self.assertLess(intervals.loc[metric, "Lower"], metrics[metric])
+            self.assertGreater(intervals.loc[metric, "Upper"], metrics[metric])
+        self.assertEqual(summary["Resamples"], 1000)
+        # Same seed: same intervals on the next rerun
+        again, _ = analyzer.get_significance(self.df, n_resamples=1000)
+        pd.testing.assert_frame_equal(intervals, again)
+
+    def test_deflated_sharpe_penalizes_trials(self):
+        """The more parameter sets tried, the higher the bar for the same track record."""
+        returns = self.df['Strategy_Returns'].to_numpy()
+        single, sharpe, benchmark = deflated_sharpe_ratio(returns, n_trials=1)
+        self.assertEqual(benchmark, 0.0)
+        self.assertGreater(sharpe, 0)
+
+        dsr_10, _, _ = deflated_sharpe_ratio(returns, n_trials=10)
+        dsr_100, _, benchmark_100 = deflated_sharpe_ratio(returns, n_trials=100)
+        self.assertGreater(single, dsr_10)
+        self.assertGreater(dsr_10, dsr_100)
+        self.assertGreater(benchmark_100, 0)
+        # Dispersed trials raise the bar more than tightly clustered ones
+        wide, _, _ = deflated_sharpe_ratio(returns, 10, trial_sharpes=np.linspace(-0.1, 0.1, 10))
+        tight, _, _ = deflated_sharpe_ratio(returns, 10, trial_sharpes=np.linspace(0.01, 0.02, 10))
+        self.assertLess(wide, tight)
+
+if __name__ == '__main__':
+    unittest.main()
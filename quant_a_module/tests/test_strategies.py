@@ -0,0 +1,69 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the registry and the analyzer to test them together
+from quant_a_module.asset_analyzer import AssetAnalyzer
+from quant_a_module.strategies import STRATEGIES, run_strategy_batch
+
+class TestStrategies(unittest.TestCase):
+
+    def setUp(self):
+        """We create a random walk price series and load it into an AssetAnalyzer (no download)."""
+        rng = np.random.default_rng(42)
+        dates = pd.bdate_range(start="2020-01-01", periods=400)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+        df = pd.DataFrame({'Close': close}, index=dates)
+        df['Returns'] = df['Close'].pct_change()
+        self.prices = df['Close']
+        self.analyzer = AssetAnalyzer('FAKE')
+        self.analyzer.data = df.dropna()
+
+    def test_momentum_matches_pandas(self):
+        """The vectorized kernel must reproduce the pandas SMA crossover."""
+        df = self.analyzer.run_strategy("Momentum", short_window=10, long_window=30)
+        sma_short = df['Close'].rolling(10).mean()
+        sma_long = df['Close'].rolling(30).mean()
+        expected = np.where(sma_short > sma_long, 1, 0)
+        np.testing.assert_array_equal(df['Signal'].values, expected)
+        # Next-day execution: yesterday's signal times today's return
+        expected_returns = (df['Signal'].shift(1) * df['Returns']).values
+        np.testing.assert_allclose(df['Strategy_Returns'].values, expected_returns, equal_nan=True)
+
+    def test_buy_and_hold_tracks_asset(self):
+        """Buy and Hold has no signal and follows the asset from the first return."""
+        df = self.analyzer.run_strategy("Buy and Hold")
+        self.assertNotIn('Signal', df.columns)
+        expected = (1 + df['Returns']).cumprod() * 100
+        np.testing.assert_allclose(df['Cumulative_Strategy'].values, expected.values)
+
+    def test_every_strategy_runs(self):
+        """Every registered strategy runs with its default parameters."""
+        for name in STRATEGIES:
+            df = self.analyzer.run_strategy(name)
+            self.assertIn('Cumulative_Strategy', df.columns, name)
+            self.assertFalse(df['Cumulative_Strategy'].isna().any(), name)
+
+    def test_batch_matches_single_run(self):
+        """A panel run gives the same curve as running each ticker on its own history."""
+        # Ticker B only starts trading after 100 days
+        late = self.prices.copy()
+        late.iloc[:100] = np.nan
+        panel = pd.DataFrame({'A': self.prices, 'B': late})
+        for name in STRATEGIES:
+            _, cumulative = run_strategy_batch(name, panel)
+            single = AssetAnalyzer('B')
+            single.data = pd.DataFrame({'Close': late.dropna()})
+            single.data['Returns'] = single.data['Close'].pct_change()
+            single.data = single.data.dropna()
+            df = single.run_strategy(name)
+            np.testing.assert_allclose(cumulative['B'].dropna().values, df['Cumulative_Strategy'].values)
+
+if __name__ == '__main__':
+    unittest.main()
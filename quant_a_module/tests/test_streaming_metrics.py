@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import Mock, patch
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the streaming engine and the analyzer to compare them
+from quant_a_module.asset_analyzer import AssetAnalyzer
+from streaming_metrics import StreamingMetrics
+from quant_a_module.strategies import get_strategy
+
+class TestStreamingMetrics(unittest.TestCase):
+
+    def setUp(self):
+        """We build 400 days of OHLC bars; the last 5 are only 'published' later."""
+        rng = np.random.default_rng(5)
+        dates = pd.bdate_range(start="2022-01-03", periods=400)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, 400)))
+        self.bars = pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                                  'Close': close, 'Volume': 1e6}, index=dates)
+
+    def _analyzer(self, bars):
+        analyzer = AssetAnalyzer("TEST")
+        df = bars.copy()
+        df['Returns'] = df['Close'].pct_change()
+        analyzer.data = df.dropna()
+        return analyzer
+
+    def test_matches_batch_metrics(self):
+        """Streaming metrics must match get_metrics on the same strategy returns."""
+        analyzer = self._analyzer(self.bars)
+        df = analyzer.run_strategy("Momentum")
+        expected = analyzer.get_metrics(df)
+        streamed = StreamingMetrics().update_many(df['Strategy_Returns']).get_metrics()
+        for key, value in expected.items():
+            self.assertAlmostEqual(streamed[key], value, places=10, msg=key)
+
+    def test_snapshot_resume(self):
+        """Resuming from a snapshot gives the same result as one uninterrupted stream."""
+        returns = self.bars['Close'].pct_change().dropna()
+        full = StreamingMetrics().update_many(returns)
+        half = StreamingMetrics().update_many(returns.iloc[:200])
+        resumed = StreamingMetrics.from_snapshot(half.snapshot()).update_many(returns.iloc[200:])
+        self.assertEqual(resumed.get_metrics(), full.get_metrics())
+
+    def test_refresh_live_matches_full_recompute(self):
+        """Only the new bars are downloaded, and the last known bar is restated."""
+        analyzer = self._analyzer(self.bars.iloc[:395])
+        analyzer.start_live("RSI Strategy", rsi_window=10)
+
+        latest = self.bars.copy()
+        latest.iloc[394, latest.columns.get_loc('Close')] *= 1.01  # the last known bar moved
+        with patch("quant_a_module.asset_analyzer.yf.download") as download:
+            download.side_effect = lambda *args, start=None, **kwargs: latest[latest.index >= start]
+            metrics = analyzer.refresh_live("RSI Strategy", rsi_window=10)
+
+        reference = self._analyzer(latest)
+        expected = reference.get_metrics(reference.run_strategy("RSI Strategy", rsi_window=10))
+        self.assertEqual(len(analyzer.live_df), len(latest) - 1)
+        for key, value in expected.items():
+            self.assertAlmostEqual(metrics[key], value, places=10, msg=key)
+
+    def test_refresh_live_runs_kernel_on_new_bars_only(self):
+        """The kernel only sees the indicator lookback and the new bars, and carries the position."""
+        latest = self.bars.copy()
+        latest.iloc[394, latest.columns.get_loc('Close')] *= 1.01
+        for name in ["Momentum", "RSI Strategy", "Bollinger Bands", "Breakout"]:
+            with self.subTest(strategy=name):
+                analyzer = self._analyzer(self.bars.iloc[:395])
+                analyzer.start_live(name)
+
+                strategy = get_strategy(name)
+                with patch("quant_a_module.asset_analyzer.yf.download") as download, \
+                        patch.object(strategy, "kernel", Mock(wraps=strategy.kernel)) as kernel:
+                    download.side_effect = lambda *args, start=None, **kwargs: latest[latest.index >= start]
+                    metrics = analyzer.refresh_live(name)
+
+                # 393 settled bars are never passed again to the kernel
+                sizes = [len(call.args[0]) for call in kernel.call_args_list]
+                self.assertEqual(sizes, [strategy.lookback() + 6])
+
+                reference = self._analyzer(latest)
+                df = reference.run_strategy(name)
+                expected = reference.get_metrics(df)
+                for key, value in expected.items():
+                    self.assertAlmostEqual(metrics[key], value, places=10, msg=key)
+                for column in ['Signal', 'Strategy_Returns', 'Cumulative_Strategy']:
+                    np.testing.assert_allclose(analyzer.live_df[column].to_numpy(), df[column].to_numpy(),
+                                               rtol=1e-10, err_msg=column)
+
+if __name__ == '__main__':
+    unittest.main()
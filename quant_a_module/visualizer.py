@@ -1,96 +1,285 @@
+import time
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
 from quant_a_module.asset_analyzer import AssetAnalyzer
+from quant_a_module.strategies import STRATEGIES
+from quant_a_module.screener import UniverseScreener
+from quant_a_module.forecasting import forecast_universe
+from quant_a_module.significance import bootstrap_significance
 
-def display_quant_a():
+# Delay between two live ticks (download of the latest bars and redraw of the live panel)
+LIVE_REFRESH_SECONDS = 300
+# Session state entries of the page (kept by the memory manager while the page is displayed)
+SESSION_KEYS = ("quant_a_live", "quant_a_trials")
+
+# --- DATA DEFINITIONS (Shared Universes) ---
+ASSET_UNIVERSES = {
+    "Manual Input": {
+        "tickers": [] 
+    },
+    "CAC 40 (France)": {
+        "tickers": [
+            "MC.PA", "TTE.PA", "SAN.PA", "AIR.PA", "OR.PA", "RMS.PA", "KER.PA", "AI.PA", 
+            "BNP.PA", "GLE.PA", "ACA.PA", "CS.PA", "STLA.PA", "RNO.PA", "ML.PA", "ORA.PA",
+            "CAP.PA", "DSY.PA", "STMPA.PA", "ENGI.PA", "EL.PA", "LR.PA", "SU.PA", "VIE.PA", "DG.PA"
+        ]
+    },
+    "S&P 500 (USA)": {
+        "tickers": [
+            "MMM", "AOS", "ABT", "ABBV", "ACN", "ADBE", "AMD", "AES", "AFL", "A", 
+            "APD", "ABNB", "AKAM", "ALB", "ARE", "ALGN", "ALLE", "LNT", "ALL", "GOOGL", 
+            "GOOG", "MO", "AMZN", "AMCR", "AEE", "AEP", "AXP", "AIG", "AMT", "AWK", 
+            "AMP", "AME", "AMGN", "APH", "ADI", "AON", "APA", "APO", "AAPL", "AMAT", 
+            "APP", "APTV", "ACGL", "ADM", "ANET", "AJG", "AIZ", "T", "ATO", "ADSK", 
+            "ADP", "AZO", "AVB", "AVY", "AXON", "BKR", "BALL", "BAC", "BAX", "BDX", 
+            "BRK.B", "BBY", "TECH", "BIIB", "BLK", "BX", "XYZ", "BK", "BA", "BKNG", 
+            "BSX", "BMY", "AVGO", "BR", "BRO", "BF.B", "BLDR", "BG", "BXP", "CHRW", 
+            "CDNS", "CPT", "CPB", "COF", "CAH", "CCL", "CARR", "CAT", "CBOE", "CBRE", 
+            "CDW", "COR", "CNC", "CNP", "CF", "CRL", "SCHW", "CHTR", "CVX", "CMG", 
+            "CB", "CHD", "CI", "CINF", "CTAS", "CSCO", "C", "CFG", "CLX", "CME", 
+            "CMS", "KO", "CTSH", "COIN", "CL", "CMCSA", "CAG", "COP", "ED", "STZ", 
+            "CEG", "COO", "CPRT", "GLW", "CPAY", "CTVA", "CSGP", "COST", "CTRA", "CRWD", 
+            "CCI", "CSX", "CMI", "CVS", "DHR", "DRI", "DDOG", "DVA", "DAY", "DECK", 
+            "DE", "DELL", "DAL", "DVN", "DXCM", "FANG", "DLR", "DG", "DLTR", "D", 
+            "DPZ", "DASH", "DOV", "DOW", "DHI", "DTE", "DUK", "DD", "ETN", "EBAY", 
+            "ECL", "EIX", "EW", "EA", "ELV", "EME", "EMR", "ETR", "EOG", "EPAM", 
+            "EQT", "EFX", "EQIX", "EQR", "ERIE", "ESS", "EL", "EG", "EVRG", "ES", 
+            "EXC", "EXE", "EXPE", "EXPD", "EXR", "XOM", "FFIV", "FDS", "FICO", "FAST", 
+            "FRT", "FDX", "FIS", "FITB", "FSLR", "FE", "FISV", "F", "FTNT", "FTV", 
+            "FOXA", "FOX", "BEN", "FCX", "GRMN", "IT", "GE", "GEHC", "GEV", "GEN", 
+            "GNRC", "GD", "GIS", "GM", "GPC", "GILD", "GPN", "GL", "GDDY", "GS", 
+            "HAL", "HIG", "HAS", "HCA", "DOC", "HSIC", "HSY", "HPE", "HLT", "HOLX", 
+            "HD", "HON", "HRL", "HST", "HWM", "HPQ", "HUBB", "HUM", "HBAN", "HII", 
+            "IBM", "IEX", "IDXX", "ITW", "INCY", "IR", "PODD", "INTC", "IBKR", "ICE", 
+            "IFF", "IP", "INTU", "ISRG", "IVZ", "INVH", "IQV", "IRM", "JBHT", "JBL", 
+            "JKHY", "J", "JNJ", "JCI", "JPM", "K", "KVUE", "KDP", "KEY", "KEYS", 
+            "KMB", "KIM", "KMI", "KKR", "KLAC", "KHC", "KR", "LHX", "LH", "LRCX", 
+            "LW", "LVS", "LDOS", "LEN", "LII", "LLY", "LIN", "LYV", "LKQ", "LMT", 
+            "L", "LOW", "LULU", "LYB", "MTB", "MPC", "MAR", "MMC", "MLM", "MAS", 
+            "MA", "MTCH", "MKC", "MCD", "MCK", "MDT", "MRK", "META", "MET", "MTD", 
+            "MGM", "MCHP", "MU", "MSFT", "MAA", "MRNA", "MHK", "MOH", "TAP", "MDLZ", 
+            "MPWR", "MNST", "MCO", "MS", "MOS", "MSI", "MSCI", "NDAQ", "NTAP", "NFLX", 
+            "NEM", "NWSA", "NWS", "NEE", "NKE", "NI", "NDSN", "NSC", "NTRS", "NOC", 
+            "NCLH", "NRG", "NUE", "NVDA", "NVR", "NXPI", "ORLY", "OXY", "ODFL", "OMC", 
+            "ON", "OKE", "ORCL", "OTIS", "PCAR", "PKG", "PLTR", "PANW", "PSKY", "PH", 
+            "PAYX", "PAYC", "PYPL", "PNR", "PEP", "PFE", "PCG", "PM", "PSX", "PNW", 
+            "PNC", "POOL", "PPG", "PPL", "PFG", "PG", "PGR", "PLD", "PRU", "PEG", 
+            "PTC", "PSA", "PHM", "PWR", "QCOM", "DGX", "Q", "RL", "RJF", "RTX", 
+            "O", "REG", "REGN", "RF", "RSG", "RMD", "RVTY", "HOOD", "ROK", "ROL", 
+            "ROP", "ROST", "RCL", "SPGI", "CRM", "SNDK", "SBAC", "SLB", "STX", "SRE", 
+            "NOW", "SHW", "SPG", "SWKS", "SJM", "SW", "SNA", "SOLS", "SOLV", "SO", 
+            "LUV", "SWK", "SBUX", "STT", "STLD", "STE", "SYK", "SMCI", "SYF", "SNPS", 
+            "SYY", "TMUS", "TROW", "TTWO", "TPR", "TRGP", "TGT", "TEL", "TDY", "TER", 
+            "TSLA", "TXN", "TPL", "TXT", "TMO", "TJX", "TKO", "TTD", "TSCO", "TT", 
+            "TDG", "TRV", "TRMB", "TFC", "TYL", "TSN", "USB", "UBER", "UDR", "ULTA", 
+            "UNP", "UAL", "UPS", "URI", "UNH", "UHS", "VLO", "VTR", "VLTO", "VRSN", 
+            "VRSK", "VZ", "VRTX", "VTRS", "VICI", "V", "VST", "VMC", "WRB", "GWW", 
+            "WAB", "WMT", "DIS", "WBD", "WM", "WAT", "WEC", "WFC", "WELL", "WST", 
+            "WDC", "WY", "WSM", "WMB", "WTW", "WDAY", "WYNN", "XEL", "XYL", "YUM", 
+            "ZBRA", "ZBH", "ZTS"
+        ]
+    },
+    "DAX 40 (Germany)": {
+        "tickers": [
+            "SAP.DE", "SIE.DE", "ALV.DE", "DTE.DE", "AIR.DE", "BMW.DE", "VOW3.DE", "BAS.DE",
+            "IFX.DE", "DHL.DE", "MBG.DE", "MUV2.DE", "ADS.DE", "DB1.DE", "EOAN.DE"
+        ]
+    },
+    "Crypto Top 10": {
+        "tickers": [
+            "BTC-USD", "ETH-USD", "BNB-USD", "SOL-USD", "XRP-USD", "ADA-USD", "DOGE-USD",
+            "AVAX-USD", "TRX-USD", "DOT-USD", "MATIC-USD", "LTC-USD", "LINK-USD"
+        ]
+    }
+}
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def screen_universe(market, strategy, period, params):
+    """
+    Ranks every ticker of a universe with the selected strategy (cached for one hour).
+    """
+    screener = UniverseScreener(ASSET_UNIVERSES[market]["tickers"])
+    ranking = screener.run(strategy, period=period, **params)
+    return ranking, screener.failed
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def forecast_market(market, period, steps):
+    """
+    ARIMA forecast of every ticker of a universe, fitted in a process pool (cached for one hour).
+    """
+    prices = UniverseScreener(ASSET_UNIVERSES[market]["tickers"]).get_prices(period=period)
+    return forecast_universe(prices, steps=steps)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def backtest_significance(returns, dates, n_trials, trial_sharpes):
+    """
+    Bootstrap intervals and deflated Sharpe ratio of a backtest (cached: the widgets
+    of the page rerun the script without changing the strategy returns).
+    """
+    return bootstrap_significance(returns, dates, n_trials=n_trials, trial_sharpes=trial_sharpes)
+
+
+def record_trial(ticker, period, strategy, params, returns):
+    """
+    Remembers the per-period Sharpe ratio of every parameter set tried on the same asset,
+    period and strategy in this session (the trials of the deflated Sharpe ratio).
+    Returns the Sharpe ratios of all the trials.
+    """
+    trials = st.session_state.setdefault("quant_a_trials", {})
+    tried = trials.setdefault((ticker, period, strategy), {})
+    std = returns.std()
+    tried[tuple(sorted(params.items()))] = float(returns.mean() / std) if std > 0 else 0.0
+    return tuple(tried.values())
+
+
+def live_panel(strategy, params, show_forecast, forecast_steps):
+    """
+    Price-dependent part of the page. In live mode it runs as a fragment every
+    LIVE_REFRESH_SECONDS: each tick pulls only the latest bars (refresh_live) and redraws
+    the KPIs and the chart, without re-running the rest of the script.
+    """
+    live = st.session_state["quant_a_live"]
+    analyzer = live["analyzer"]
+    ticker = live["ticker"]
+
+    # Pull new bars at most once per refresh interval (the first run comes from a full rerun)
+    if time.time() - live["refreshed"] >= LIVE_REFRESH_SECONDS - 1:
+        live["refreshed"] = time.time()
+        analyzer.refresh_live(strategy, **params)
+    df = analyzer.live_df
+    metrics = analyzer.live_metrics.get_metrics()
+    st.caption(f"Prices as of {df.index[-1]:%Y-%m-%d} (checked at {time.strftime('%H:%M:%S', time.localtime(live['refreshed']))})")
+
+    # A. KPIs (5 Metrics Dashboard)
+    m1, m2, m3, m4, m5 = st.columns(5)
+    m1.metric("Total Return", f"{metrics.get('Total Return', 0):.2%}")
+    m2.metric("CAGR", f"{metrics.get('CAGR', 0):.2%}")
+    m3.metric("Sharpe Ratio", f"{metrics.get('Sharpe Ratio', 0):.2f}")
+    m4.metric("Max Drawdown", f"{metrics.get('Max Drawdown', 0):.2%}")
+    m5.metric("Win Rate", f"{metrics.get('Win Rate', 0):.2%}")
+    
+    st.markdown("---")
+
+    # --- LAST PRICE DISPLAY ---
+    try:
+        # Using .values[-1] and float() to prevent TypeError with Series formatting
+        last_close = float(df['Close'].values[-1])
+        prev_close = float(df['Close'].values[-2])
+        delta_price = last_close - prev_close
+        delta_pct = (delta_price / prev_close) * 100
+
+        col_price, _ = st.columns([1, 3])
+        with col_price:
+            st.metric(
+                label=f"Last Price ({ticker})",
+                value=f"${last_close:,.2f}",
+                delta=f"{delta_price:+.2f} ({delta_pct:+.2f}%)"
+            )
+    except Exception:
+        st.warning("Could not calculate last price variation.")
+
+    # B. ADVANCED INTERACTIVE CHART
+    st.subheader(f"Performance: {ticker} vs Strategy")
+    
+    fig = go.Figure()
+
+    # 1. Asset Price (Grey Line)
+    fig.add_trace(go.Scatter(
+        x=df.index, y=df['Close'], 
+        name='Asset Price',
+        line=dict(color='rgba(0,0,0,0.5)', width=1),
+        yaxis='y1'
+    ))
+
+    # 2. Strategy Curve (Blue Line)
+    fig.add_trace(go.Scatter(
+        x=df.index, y=df['Cumulative_Strategy'], 
+        name='Strategy (Base 100)',
+        line=dict(color='#2980b9', width=2),
+        fill='tozeroy', 
+        fillcolor='rgba(41, 128, 185, 0.1)', 
+        yaxis='y2'
+    ))
+    
+    # 3. BUY / SELL MARKERS 
+    if 'Signal' in df.columns:
+        trades = df['Signal'].diff()
+        buys = df[trades == 1]
+        sells = df[trades == -1]
+        
+        if not buys.empty:
+            fig.add_trace(go.Scatter(
+                x=buys.index, y=buys['Close'],
+                mode='markers', name='Buy Signal',
+                marker=dict(symbol='triangle-up', color='#2ecc71', size=12, line=dict(color='black', width=1)),
+                yaxis='y1'
+            ))
+        
+        if not sells.empty:
+            fig.add_trace(go.Scatter(
+                x=sells.index, y=sells['Close'],
+                mode='markers', name='Sell Signal',
+                marker=dict(symbol='triangle-down', color='#e74c3c', size=12, line=dict(color='black', width=1)),
+                yaxis='y1'
+            ))
+
+    # 4. ARIMA Forecast with its 95% confidence band
+    if show_forecast:
+        forecast = analyzer.get_forecast(steps=forecast_steps)
+        if forecast is not None:
+            fig.add_trace(go.Scatter(
+                x=forecast.index, y=forecast['Upper'],
+                line=dict(width=0), showlegend=False, hoverinfo='skip',
+                yaxis='y1'
+            ))
+            fig.add_trace(go.Scatter(
+                x=forecast.index, y=forecast['Lower'],
+                name='Forecast 95% Band',
+                line=dict(width=0), fill='tonexty', fillcolor='rgba(230, 126, 34, 0.2)',
+                yaxis='y1'
+            ))
+            fig.add_trace(go.Scatter(
+                x=forecast.index, y=forecast['Forecast'],
+                name='ARIMA Forecast',
+                line=dict(color='#e67e22', width=2, dash='dash'),
+                yaxis='y1'
+            ))
+        else:
+            st.warning("Not enough data to forecast.")
+
+    # 5. Professional Layout (Without Zoom Selector)
+    fig.update_layout(
+        height=600,
+        xaxis=dict(
+            type="date",
+            # Zoom buttons removed as requested
+        ),
+        yaxis=dict(title="Asset Price ($)", side="left", showgrid=False),
+        yaxis2=dict(
+            title="Strategy Value (Base 100)", 
+            side="right", overlaying="y", 
+            showgrid=True, gridcolor='rgba(128,128,128,0.2)'
+        ),
+        legend=dict(orientation="h", y=1.02, x=0),
+        template="plotly_white",
+        hovermode="x unified"
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def display_quant_a(live_mode=True):
     """
     Main function to display the Univariate Analysis module (Quant A).
     Enhanced with Asset Universes selection.
+    live_mode: refresh the prices, KPIs and chart every LIVE_REFRESH_SECONDS (fragment).
     """
     st.markdown("## Univariate Analysis (Quant A)")
     
-    # --- DATA DEFINITIONS (Shared Universes) ---
-    asset_universes = {
-        "Manual Input": {
-            "tickers": [] 
-        },
-        "CAC 40 (France)": {
-            "tickers": [
-                "MC.PA", "TTE.PA", "SAN.PA", "AIR.PA", "OR.PA", "RMS.PA", "KER.PA", "AI.PA", 
-                "BNP.PA", "GLE.PA", "ACA.PA", "CS.PA", "STLA.PA", "RNO.PA", "ML.PA", "ORA.PA",
-                "CAP.PA", "DSY.PA", "STMPA.PA", "ENGI.PA", "EL.PA", "LR.PA", "SU.PA", "VIE.PA", "DG.PA"
-            ]
-        },
-        "S&P 500 (USA)": {
-            "tickers": [
-                "MMM", "AOS", "ABT", "ABBV", "ACN", "ADBE", "AMD", "AES", "AFL", "A", 
-                "APD", "ABNB", "AKAM", "ALB", "ARE", "ALGN", "ALLE", "LNT", "ALL", "GOOGL", 
-                "GOOG", "MO", "AMZN", "AMCR", "AEE", "AEP", "AXP", "AIG", "AMT", "AWK", 
-                "AMP", "AME", "AMGN", "APH", "ADI", "AON", "APA", "APO", "AAPL", "AMAT", 
-                "APP", "APTV", "ACGL", "ADM", "ANET", "AJG", "AIZ", "T", "ATO", "ADSK", 
-                "ADP", "AZO", "AVB", "AVY", "AXON", "BKR", "BALL", "BAC", "BAX", "BDX", 
-                "BRK.B", "BBY", "TECH", "BIIB", "BLK", "BX", "XYZ", "BK", "BA", "BKNG", 
-                "BSX", "BMY", "AVGO", "BR", "BRO", "BF.B", "BLDR", "BG", "BXP", "CHRW", 
-                "CDNS", "CPT", "CPB", "COF", "CAH", "CCL", "CARR", "CAT", "CBOE", "CBRE", 
-                "CDW", "COR", "CNC", "CNP", "CF", "CRL", "SCHW", "CHTR", "CVX", "CMG", 
-                "CB", "CHD", "CI", "CINF", "CTAS", "CSCO", "C", "CFG", "CLX", "CME", 
-                "CMS", "KO", "CTSH", "COIN", "CL", "CMCSA", "CAG", "COP", "ED", "STZ", 
-                "CEG", "COO", "CPRT", "GLW", "CPAY", "CTVA", "CSGP", "COST", "CTRA", "CRWD", 
-                "CCI", "CSX", "CMI", "CVS", "DHR", "DRI", "DDOG", "DVA", "DAY", "DECK", 
-                "DE", "DELL", "DAL", "DVN", "DXCM", "FANG", "DLR", "DG", "DLTR", "D", 
-                "DPZ", "DASH", "DOV", "DOW", "DHI", "DTE", "DUK", "DD", "ETN", "EBAY", 
-                "ECL", "EIX", "EW", "EA", "ELV", "EME", "EMR", "ETR", "EOG", "EPAM", 
-                "EQT", "EFX", "EQIX", "EQR", "ERIE", "ESS", "EL", "EG", "EVRG", "ES", 
-                "EXC", "EXE", "EXPE", "EXPD", "EXR", "XOM", "FFIV", "FDS", "FICO", "FAST", 
-                "FRT", "FDX", "FIS", "FITB", "FSLR", "FE", "FISV", "F", "FTNT", "FTV", 
-                "FOXA", "FOX", "BEN", "FCX", "GRMN", "IT", "GE", "GEHC", "GEV", "GEN", 
-                "GNRC", "GD", "GIS", "GM", "GPC", "GILD", "GPN", "GL", "GDDY", "GS", 
-                "HAL", "HIG", "HAS", "HCA", "DOC", "HSIC", "HSY", "HPE", "HLT", "HOLX", 
-                "HD", "HON", "HRL", "HST", "HWM", "HPQ", "HUBB", "HUM", "HBAN", "HII", 
-                "IBM", "IEX", "IDXX", "ITW", "INCY", "IR", "PODD", "INTC", "IBKR", "ICE", 
-                "IFF", "IP", "INTU", "ISRG", "IVZ", "INVH", "IQV", "IRM", "JBHT", "JBL", 
-                "JKHY", "J", "JNJ", "JCI", "JPM", "K", "KVUE", "KDP", "KEY", "KEYS", 
-                "KMB", "KIM", "KMI", "KKR", "KLAC", "KHC", "KR", "LHX", "LH", "LRCX", 
-                "LW", "LVS", "LDOS", "LEN", "LII", "LLY", "LIN", "LYV", "LKQ", "LMT", 
-                "L", "LOW", "LULU", "LYB", "MTB", "MPC", "MAR", "MMC", "MLM", "MAS", 
-                "MA", "MTCH", "MKC", "MCD", "MCK", "MDT", "MRK", "META", "MET", "MTD", 
-                "MGM", "MCHP", "MU", "MSFT", "MAA", "MRNA", "MHK", "MOH", "TAP", "MDLZ", 
-                "MPWR", "MNST", "MCO", "MS", "MOS", "MSI", "MSCI", "NDAQ", "NTAP", "NFLX", 
-                "NEM", "NWSA", "NWS", "NEE", "NKE", "NI", "NDSN", "NSC", "NTRS", "NOC", 
-                "NCLH", "NRG", "NUE", "NVDA", "NVR", "NXPI", "ORLY", "OXY", "ODFL", "OMC", 
-                "ON", "OKE", "ORCL", "OTIS", "PCAR", "PKG", "PLTR", "PANW", "PSKY", "PH", 
-                "PAYX", "PAYC", "PYPL", "PNR", "PEP", "PFE", "PCG", "PM", "PSX", "PNW", 
-                "PNC", "POOL", "PPG", "PPL", "PFG", "PG", "PGR", "PLD", "PRU", "PEG", 
-                "PTC", "PSA", "PHM", "PWR", "QCOM", "DGX", "Q", "RL", "RJF", "RTX", 
-                "O", "REG", "REGN", "RF", "RSG", "RMD", "RVTY", "HOOD", "ROK", "ROL", 
-                "ROP", "ROST", "RCL", "SPGI", "CRM", "SNDK", "SBAC", "SLB", "STX", "SRE", 
-                "NOW", "SHW", "SPG", "SWKS", "SJM", "SW", "SNA", "SOLS", "SOLV", "SO", 
-                "LUV", "SWK", "SBUX", "STT", "STLD", "STE", "SYK", "SMCI", "SYF", "SNPS", 
-                "SYY", "TMUS", "TROW", "TTWO", "TPR", "TRGP", "TGT", "TEL", "TDY", "TER", 
-                "TSLA", "TXN", "TPL", "TXT", "TMO", "TJX", "TKO", "TTD", "TSCO", "TT", 
-                "TDG", "TRV", "TRMB", "TFC", "TYL", "TSN", "USB", "UBER", "UDR", "ULTA", 
-                "UNP", "UAL", "UPS", "URI", "UNH", "UHS", "VLO", "VTR", "VLTO", "VRSN", 
-                "VRSK", "VZ", "VRTX", "VTRS", "VICI", "V", "VST", "VMC", "WRB", "GWW", 
-                "WAB", "WMT", "DIS", "WBD", "WM", "WAT", "WEC", "WFC", "WELL", "WST", 
-                "WDC", "WY", "WSM", "WMB", "WTW", "WDAY", "WYNN", "XEL", "XYL", "YUM", 
-                "ZBRA", "ZBH", "ZTS"
-            ]
-        },
-        "DAX 40 (Germany)": {
-            "tickers": [
-                "SAP.DE", "SIE.DE", "ALV.DE", "DTE.DE", "AIR.DE", "BMW.DE", "VOW3.DE", "BAS.DE",
-                "IFX.DE", "DHL.DE", "MBG.DE", "MUV2.DE", "ADS.DE", "DB1.DE", "EOAN.DE"
-            ]
-        },
-        "Crypto Top 10": {
-            "tickers": [
-                "BTC-USD", "ETH-USD", "BNB-USD", "SOL-USD", "XRP-USD", "ADA-USD", "DOGE-USD",
-                "AVAX-USD", "TRX-USD", "DOT-USD", "MATIC-USD", "LTC-USD", "LINK-USD"
-            ]
-        }
-    }
-
     # --- 1. SIDEBAR: SETTINGS ---
     with st.sidebar:
         st.header("Settings")
@@ -99,154 +288,149 @@ def display_quant_a():
         st.subheader("Asset Selection")
         
         # 1. Select Market/Universe
-        market = st.selectbox("Market", list(asset_universes.keys()), index=0)
+        market = st.selectbox("Market", list(ASSET_UNIVERSES.keys()), index=0)
         
         # 2. Select or Type Ticker
         if market == "Manual Input":
             ticker = st.text_input("Asset Symbol (Yahoo)", value="BTC-USD")
         else:
             # Dropdown for single selection
-            ticker = st.selectbox("Select Asset", asset_universes[market]["tickers"])
+            ticker = st.selectbox("Select Asset", ASSET_UNIVERSES[market]["tickers"])
         
         st.markdown("---")
         
         # --- Time & Strategy ---
         # Added '1mo' as requested
         period = st.selectbox("Time Period", ["1mo", "6mo", "1y", "2y", "5y", "max"], index=2)
-        strategy = st.radio("Strategy", ["Buy and Hold", "Momentum", "RSI Strategy"])
+        strategy = st.radio("Strategy", list(STRATEGIES.keys()))
         
         # --- Strategy Parameters ---
-        # Default values
-        short_w, long_w = 20, 50
-        rsi_w, rsi_buy, rsi_sell = 14, 30, 70
+        # Widgets are built from the parameters declared in the strategy registry
+        params = {}
+        strategy_params = STRATEGIES[strategy].params
         
-        if strategy == "Momentum":
+        if strategy_params:
             st.markdown("---")
-            st.write("Momentum Parameters")
-            short_w = st.number_input("Short Window (Days)", 5, 200, 20)
-            long_w = st.number_input("Long Window (Days)", 10, 365, 50)
-            
-        elif strategy == "RSI Strategy":
+            st.write(f"{strategy} Parameters")
+            for param in strategy_params:
+                params[param.name] = st.number_input(
+                    param.label, param.min_value, param.max_value, param.default
+                )
+
+        # --- Forecast ---
+        st.markdown("---")
+        show_forecast = st.checkbox("Show ARIMA Forecast")
+        forecast_steps = st.number_input("Forecast Horizon (Days)", 1, 30, 5)
+
+        # --- Universe Screener ---
+        screen_all = False
+        forecast_all = False
+        if market != "Manual Input":
             st.markdown("---")
-            st.write("RSI Parameters")
-            rsi_w = st.number_input("RSI Window", 5, 50, 14)
-            col1, col2 = st.columns(2)
-            with col1:
-                rsi_buy = st.number_input("Buy (Oversold)", 10, 40, 30)
-            with col2:
-                rsi_sell = st.number_input("Sell (Overbought)", 60, 90, 70)
+            screen_all = st.checkbox(f"Screen the whole {market} universe")
+            forecast_all = st.checkbox(f"Forecast the whole {market} universe")
 
     # --- 2. EXECUTION (BACKEND) ---
-    analyzer = AssetAnalyzer(ticker)
+    # The analyzer is kept in the session: later reruns (live ticks, widget changes)
+    # only pull the new bars and update the streaming metrics instead of recomputing them.
+    live = st.session_state.get("quant_a_live")
     
     with st.spinner(f'Analyzing {ticker}...'):
-        # Get Data & Run Strategy
-        analyzer.get_data(period=period)
-        df = analyzer.run_strategy(
-            strategy, 
-            short_window=short_w, long_window=long_w,
-            rsi_window=rsi_w, rsi_buy=rsi_buy, rsi_sell=rsi_sell
-        )
-        metrics = analyzer.get_metrics(df)
+        if live is None or live["ticker"] != ticker or live["period"] != period:
+            # Get Data & Run Strategy
+            analyzer = AssetAnalyzer(ticker)
+            analyzer.get_data(period=period)
+            if analyzer.start_live(strategy, **params) is not None:
+                st.session_state["quant_a_live"] = {
+                    "ticker": ticker, "period": period, "analyzer": analyzer, "refreshed": time.time()
+                }
+        else:
+            # New bars are pulled by the live panel; here only changed parameters are applied
+            analyzer = live["analyzer"]
+            analyzer.refresh_live(strategy, fetch=False, **params)
+        df = analyzer.live_df
 
     # --- 3. VISUALIZATION (FRONTEND) ---
     if df is not None:
-        # A. KPIs (5 Metrics Dashboard)
-        m1, m2, m3, m4, m5 = st.columns(5)
-        m1.metric("Total Return", f"{metrics.get('Total Return', 0):.2%}")
-        m2.metric("CAGR", f"{metrics.get('CAGR', 0):.2%}")
-        m3.metric("Sharpe Ratio", f"{metrics.get('Sharpe Ratio', 0):.2f}")
-        m4.metric("Max Drawdown", f"{metrics.get('Max Drawdown', 0):.2%}")
-        m5.metric("Win Rate", f"{metrics.get('Win Rate', 0):.2%}")
+        # A-B. Live panel (KPIs, last price, chart): re-executed alone on each live tick
+        panel = st.fragment(live_panel, run_every=LIVE_REFRESH_SECONDS if live_mode else None)
+        panel(strategy, params, show_forecast, forecast_steps)
+        df = analyzer.live_df
         
-        st.markdown("---")
-
-        # --- LAST PRICE DISPLAY ---
-        try:
-            # Using .values[-1] and float() to prevent TypeError with Series formatting
-            last_close = float(df['Close'].values[-1])
-            prev_close = float(df['Close'].values[-2])
-            delta_price = last_close - prev_close
-            delta_pct = (delta_price / prev_close) * 100
-
-            col_price, _ = st.columns([1, 3])
-            with col_price:
-                st.metric(
-                    label=f"Last Price ({ticker})",
-                    value=f"${last_close:,.2f}",
-                    delta=f"{delta_price:+.2f} ({delta_pct:+.2f}%)"
+        # C. TAIL RISK (VaR / CVaR)
+        with st.expander("Tail Risk (VaR / CVaR)"):
+            rolling_risk, risk_summary = analyzer.get_risk_metrics(df)
+            if risk_summary is not None:
+                var_fig = go.Figure()
+                var_fig.add_trace(go.Bar(
+                    x=df.index, y=df['Strategy_Returns'],
+                    name='Strategy Daily Return',
+                    marker_color='rgba(128,128,128,0.5)'
+                ))
+                for method in ["Historical", "Parametric", "EWMA"]:
+                    var_fig.add_trace(go.Scatter(
+                        x=rolling_risk.index, y=-rolling_risk[f"{method} VaR 99%"],
+                        name=f"{method} VaR 99%", line=dict(width=2)
+                    ))
+                var_fig.update_layout(
+                    height=350, template="plotly_white", hovermode="x unified",
+                    yaxis=dict(tickformat=".1%"), legend=dict(orientation="h", y=1.1, x=0)
                 )
-        except Exception:
-            st.warning("Could not calculate last price variation.")
+                st.plotly_chart(var_fig, use_container_width=True)
+                st.dataframe(risk_summary.style.format({
+                    "Confidence": "{:.1%}", "VaR": "{:.2%}", "CVaR": "{:.2%}", "Expected": "{:.1f}",
+                    "Exception Rate": "{:.2%}", "Kupiec LR": "{:.2f}", "p-value": "{:.3f}"
+                }))
 
-        # B. ADVANCED INTERACTIVE CHART
-        st.subheader(f"Performance: {ticker} vs Strategy")
-        
-        fig = go.Figure()
-
-        # 1. Asset Price (Grey Line)
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df['Close'], 
-            name='Asset Price',
-            line=dict(color='rgba(0,0,0,0.5)', width=1),
-            yaxis='y1'
-        ))
-
-        # 2. Strategy Curve (Blue Line)
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df['Cumulative_Strategy'], 
-            name='Strategy (Base 100)',
-            line=dict(color='#2980b9', width=2),
-            fill='tozeroy', 
-            fillcolor='rgba(41, 128, 185, 0.1)', 
-            yaxis='y2'
-        ))
-        
-        # 3. BUY / SELL MARKERS 
-        if 'Signal' in df.columns:
-            trades = df['Signal'].diff()
-            buys = df[trades == 1]
-            sells = df[trades == -1]
-            
-            if not buys.empty:
-                fig.add_trace(go.Scatter(
-                    x=buys.index, y=buys['Close'],
-                    mode='markers', name='Buy Signal',
-                    marker=dict(symbol='triangle-up', color='#2ecc71', size=12, line=dict(color='black', width=1)),
-                    yaxis='y1'
-                ))
-            
-            if not sells.empty:
-                fig.add_trace(go.Scatter(
-                    x=sells.index, y=sells['Close'],
-                    mode='markers', name='Sell Signal',
-                    marker=dict(symbol='triangle-down', color='#e74c3c', size=12, line=dict(color='black', width=1)),
-                    yaxis='y1'
-                ))
+        # D. STATISTICAL SIGNIFICANCE (Bootstrap / Deflated Sharpe)
+        with st.expander("Statistical Significance (Bootstrap)"):
+            returns = df['Strategy_Returns'].fillna(0)
+            trial_sharpes = record_trial(ticker, period, strategy, params, returns)
+            # Only the first and last dates are needed (annualization)
+            intervals, summary = backtest_significance(returns.to_numpy(dtype=float), tuple(df.index[[0, -1]]),
+                                                       len(trial_sharpes), trial_sharpes)
+            if intervals is not None:
+                s1, s2, s3 = st.columns(3)
+                s1.metric("Deflated Sharpe Ratio", f"{summary['Deflated Sharpe Ratio']:.1%}",
+                          help="Probability that the true Sharpe ratio is positive, given the parameter sets tried.")
+                s2.metric("P(Sharpe <= 0)", f"{summary['P(Sharpe <= 0)']:.1%}")
+                s3.metric("Parameter Sets Tried", summary["Trials"])
+                st.caption(f"{summary['Resamples']} stationary bootstrap resamples, "
+                           f"{summary['Confidence']:.0%} confidence intervals.")
+                st.dataframe(intervals.style.format({
+                    "Observed": "{:.2f}", "Lower": "{:.2f}", "Upper": "{:.2f}", "Bootstrap Std": "{:.2f}"
+                }).format("{:.2%}", subset=(["CAGR", "Max Drawdown"], slice(None))))
 
-        # 4. Professional Layout (Without Zoom Selector)
-        fig.update_layout(
-            height=600,
-            xaxis=dict(
-                type="date",
-                # Zoom buttons removed as requested
-            ),
-            yaxis=dict(title="Asset Price ($)", side="left", showgrid=False),
-            yaxis2=dict(
-                title="Strategy Value (Base 100)", 
-                side="right", overlaying="y", 
-                showgrid=True, gridcolor='rgba(128,128,128,0.2)'
-            ),
-            legend=dict(orientation="h", y=1.02, x=0),
-            template="plotly_white",
-            hovermode="x unified"
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
         # Raw Data
         with st.expander("View Historical Data & Signals"):
             st.dataframe(df.tail(20).style.format({"Close": "{:.2f}", "RSI": "{:.1f}"}))
 
     else:
-        st.error("Error: Could not retrieve data.")
\ No newline at end of file
+        st.error("Error: Could not retrieve data.")
+
+    # --- 4. UNIVERSE SCREENER ---
+    if screen_all:
+        st.markdown("---")
+        st.subheader(f"Universe Screener: {market} ({strategy})")
+        with st.spinner(f"Screening {len(ASSET_UNIVERSES[market]['tickers'])} assets..."):
+            ranking, failed = screen_universe(market, strategy, period, params)
+
+        st.caption("Ranked by Sharpe Ratio. Click a column header to sort.")
+        st.dataframe(ranking.style.format({
+            "Last Price": "{:,.2f}", "Total Return": "{:.2%}", "CAGR": "{:.2%}",
+            "Volatility": "{:.2%}", "Sharpe Ratio": "{:.2f}", "Max Drawdown": "{:.2%}", "Win Rate": "{:.2%}"
+        }), use_container_width=True)
+        if failed:
+            st.warning(f"No data for: {', '.join(failed)}")
+
+    if forecast_all:
+        st.markdown("---")
+        st.subheader(f"Universe Forecast: {market} ({forecast_steps} days, ARIMA)")
+        with st.spinner(f"Fitting {len(ASSET_UNIVERSES[market]['tickers'])} models..."):
+            forecasts = forecast_market(market, period, forecast_steps)
+
+        st.caption("Forecast, 95% band and expected return at the horizon. Click a column header to sort.")
+        st.dataframe(forecasts.sort_values("Expected Return", ascending=False).style.format({
+            "Last Price": "{:,.2f}", "Forecast": "{:,.2f}", "Lower": "{:,.2f}", "Upper": "{:,.2f}",
+            "Expected Return": "{:.2%}"
+        }, na_rep="-"), use_container_width=True)
@@ -0,0 +1,88 @@
+"""
+CALENDAR ALIGNMENT
+------------------
+Assets trade on different calendars (crypto every day, equities on exchange sessions).
+A raw download is the union of every calendar; these policies turn it into one clean panel:
+- "Union": every date of every asset, gaps filled (forward then backward). Legacy behavior,
+  annualized with 252 periods.
+- "Common Sessions": only the dates where every asset has a price (the panel starts when the
+  latest-starting asset starts).
+- "Native Calendars": portfolio and covariance on the common sessions, but each asset's own
+  statistics (volatility) use its native sessions and its own annualization.
+- "Business Days": Monday to Friday dates, each asset taking its last available price.
+"""
+
+import numpy as np
+import pandas as pd
+
+CALENDAR_POLICIES = ["Union", "Common Sessions", "Native Calendars", "Business Days"]
+
+
+def periods_per_year(index):
+    """
+    Observed number of rows per year of a date index (252 for exchange sessions, 365 for crypto).
+    """
+    if len(index) < 2:
+        return 252
+    years = (index[-1] - index[0]).days / 365.25
+    if years <= 0:
+        return 252
+    # The first row has no return: count the intervals, not the dates
+    return int(round((len(index) - 1) / years))
+
+
+def align_calendar(raw, policy="Union"):
+    """
+    Aligns a raw union-of-dates price panel (NaN where an asset did not trade).
+    Returns (prices, report). The report gives the row counts before and after alignment,
+    the raw dates dropped, the first date before and after alignment (with the asset starting
+    last when the start was truncated), the annualization of the panel and of each asset on
+    its native calendar.
+    """
+    if policy not in CALENDAR_POLICIES:
+        raise ValueError(f"Unknown calendar policy '{policy}'. Available: {CALENDAR_POLICIES}")
+
+    columns = raw.columns
+    raw = raw.sort_index()
+    native_periods = {t: periods_per_year(raw[t].dropna().index) for t in columns}
+
+    if policy == "Union":
+        prices = raw.ffill().bfill()
+        panel_periods = 252
+    elif policy in ("Common Sessions", "Native Calendars"):
+        # Tickers without any price do not restrict the common sessions
+        prices = raw.dropna(axis=1, how="all").dropna(how="any").reindex(columns=columns)
+        panel_periods = periods_per_year(prices.index)
+    else:
+        business_days = pd.bdate_range(raw.index[0].normalize(), raw.index[-1].normalize())
+        # Each business day takes the last price known at that date (weekend crypto rows are dropped)
+        prices = raw.reindex(raw.index.union(business_days)).ffill().reindex(business_days).bfill()
+        panel_periods = periods_per_year(prices.index)
+
+    first_before = raw.index[0] if len(raw) else None
+    first_after = prices.index[0] if len(prices) else None
+    truncated = first_before is not None and (first_after is None or first_after > first_before)
+    report = {
+        "Policy": policy,
+        "Rows Before": len(raw),
+        "Rows After": len(prices),
+        "Shrink": 1 - len(prices) / len(raw) if len(raw) else 0.0,
+        "Dropped Dates": len(raw.index.difference(prices.index)),
+        "First Date Before": first_before,
+        "First Date After": first_after,
+        "Latest Start": raw.apply(pd.Series.first_valid_index).dropna().idxmax() if truncated else None,
+        "Periods per Year": panel_periods,
+        "Asset Periods per Year": native_periods
+    }
+    return prices, report
+
+
+def native_volatility(raw, native_periods):
+    """
+    Annualized volatility of each asset on its own sessions (no filled days).
+    """
+    vols = {}
+    for ticker in raw.columns:
+        returns = raw[ticker].dropna().pct_change().dropna()
+        vols[ticker] = returns.std() * np.sqrt(native_periods[ticker])
+    return pd.Series(vols)
@@ -0,0 +1,109 @@
+"""
+DRIFT-BAND REBALANCING
+----------------------
+The portfolio is rebalanced to its target weights as soon as one weight drifts outside
+its band (target +/- band), at the close of the day of the breach, paying a proportional
+trading cost on the turnover.
+
+This is path-dependent (each rebalance moves the anchor of the next drift), but between two
+rebalances the weights only depend on the asset growth since the anchor:
+    w(t) = target * G(t) / (target . G(t)),  G(t) = growth(t) / growth(anchor)
+so the kernel scans the rows after each anchor by chunks of growing size with array
+operations and stops at the first breach, instead of stepping through every day.
+Costs scale the value but not the weights, so they never move the rebalance dates.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def band_label(band):
+    """Column label of a band width (0.05 -> 'Band 5%')."""
+    return f"Band {band * 100:g}%"
+
+
+def drift_band_path(growth, target, band, cost_rate=0.0, relative=False, chunk=64):
+    """
+    Value path (Base 100) of a drift-band strategy on a (dates x assets) growth array
+    (cumulative growth since the first day).
+    band: maximum absolute drift of a weight (0.05 = 5 points), or a fraction of each
+    target weight if relative. cost_rate: cost per unit of traded value (10 bps = 0.001).
+    Returns (values, rebalance rows, turnover of each rebalance as sum |w - target|).
+    """
+    n_days = len(growth)
+    target = np.asarray(target, dtype=float)
+    limit = band * target if relative else np.full(len(target), band)
+
+    values = np.empty(n_days)
+    values[0] = 100.0
+    rebalances, turnovers = [], []
+    anchor, anchor_value = 0, 100.0
+
+    start = anchor + 1
+    while start < n_days:
+        # Scan for the next breach by chunks of doubling size
+        size, breach = chunk, None
+        while start < n_days:
+            stop = min(start + size, n_days)
+            relative_growth = growth[start:stop] / growth[anchor]
+            factor = relative_growth @ target
+            weights = relative_growth * target / factor[:, None]
+            values[start:stop] = anchor_value * factor
+            hit = (np.abs(weights - target) > limit).any(axis=1)
+            if hit.any():
+                breach = start + int(hit.argmax())
+                drifted = weights[breach - start]
+                break
+            start, size = stop, size * 2
+
+        if breach is None:
+            break
+
+        # Rebalance at the close of the breach day, paying the trading cost
+        traded = float(np.abs(drifted - target).sum())
+        values[breach] *= 1 - cost_rate * traded
+        rebalances.append(breach)
+        turnovers.append(traded)
+        anchor, anchor_value = breach, values[breach]
+        start = anchor + 1
+
+    return values, np.array(rebalances, dtype=int), np.array(turnovers)
+
+
+def drift_band_sweep(growth, dates, target, bands, cost_rate=0.0, relative=False, periods_per_year=252):
+    """
+    Runs the kernel for every band width.
+    Returns (values DataFrame, one column per band; summary DataFrame, one row per band;
+    dict of rebalance dates per band).
+    """
+    years = max((dates[-1] - dates[0]).days / 365.25, 0.01)
+    values, rows, rebalance_dates = {}, {}, {}
+
+    for band in bands:
+        label = band_label(band)
+        path, rebalances, turnovers = drift_band_path(growth, target, band, cost_rate, relative)
+        # Same path without costs (costs do not move the rebalance dates)
+        cost_factor = np.ones(len(path))
+        cost_factor[rebalances] = 1 - cost_rate * turnovers
+        cost_factor = np.cumprod(cost_factor)
+        gross = path / cost_factor
+
+        net_return = path[-1] / path[0] - 1
+        gross_return = gross[-1] / gross[0] - 1
+        returns = path[1:] / path[:-1] - 1
+        values[label] = path
+        rebalance_dates[label] = dates[rebalances]
+        rows[label] = {
+            "Band": band,
+            "Rebalances": len(rebalances),
+            "Turnover (Total)": turnovers.sum(),
+            "Turnover (Ann.)": turnovers.sum() / years,
+            "Total Cost": 1 - cost_factor[-1],
+            "Cost Drag (Ann.)": (1 + gross_return) ** (1 / years) - (1 + net_return) ** (1 / years),
+            "Total Return": net_return,
+            "Volatility (Ann.)": returns.std(ddof=1) * np.sqrt(periods_per_year) if len(returns) > 1 else 0.0
+        }
+
+    summary = pd.DataFrame.from_dict(rows, orient="index")
+    summary.index.name = "Strategy"
+    return pd.DataFrame(values, index=dates), summary, rebalance_dates
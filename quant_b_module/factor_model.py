@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+
+def randomized_svd(matrix, n_components, n_oversamples=10, n_iter=4, seed=0):
+    """
+    Truncated SVD by random projection (Halko, Martinsson & Tropp).
+    Only a (rows x (n_components + n_oversamples)) sketch is factorized, so a
+    10-year x 500-asset panel never needs a full decomposition.
+    Falls back to the exact SVD when the sketch would be as large as the matrix.
+    """
+    n_rows, n_cols = matrix.shape
+    sketch_size = n_components + n_oversamples
+
+    if sketch_size >= min(n_rows, n_cols):
+        u, s, vt = np.linalg.svd(matrix, full_matrices=False)
+        return u[:, :n_components], s[:n_components], vt[:n_components]
+
+    rng = np.random.default_rng(seed)
+    sketch = matrix @ rng.standard_normal((n_cols, sketch_size))
+
+    # Power iterations sharpen the spectrum (re-orthonormalized to stay stable)
+    for _ in range(n_iter):
+        sketch, _ = np.linalg.qr(sketch)
+        projected, _ = np.linalg.qr(matrix.T @ sketch)
+        sketch = matrix @ projected
+
+    basis, _ = np.linalg.qr(sketch)
+    u_small, s, vt = np.linalg.svd(basis.T @ matrix, full_matrices=False)
+    u = basis @ u_small
+    return u[:, :n_components], s[:n_components], vt[:n_components]
+
+
+class FactorModel:
+    """
+    Statistical factor model: principal components of the (dates x assets) return panel.
+    Returns are approximated as X ~ F B', where F are the factor returns and B the loadings.
+    """
+    def __init__(self, n_factors=3, n_iter=4, seed=0):
+        self.n_factors = n_factors
+        self.n_iter = n_iter
+        self.seed = seed
+        self.loadings = None
+        self.factor_returns = None
+        self.factor_variance = None
+        self.explained_variance = None
+        self.asset_variance = None
+        self._demeaned = None
+
+    def fit(self, returns):
+        """
+        Decomposes a return panel (already cleaned of NaN) into principal components.
+        """
+        assets = returns.columns
+        x = returns.to_numpy(dtype=float)
+        x = x - x.mean(axis=0)
+        n_obs = len(x)
+        n_factors = min(self.n_factors, min(x.shape))
+
+        u, s, vt = randomized_svd(x, n_factors, n_iter=self.n_iter, seed=self.seed)
+
+        # Sign convention: each factor is oriented so that its loadings sum positive
+        signs = np.where(vt.sum(axis=1) < 0, -1.0, 1.0)
+        u = u * signs
+        vt = vt * signs[:, None]
+
+        names = [f"PC{i + 1}" for i in range(n_factors)]
+        self.loadings = pd.DataFrame(vt.T, index=assets, columns=names)
+        self.factor_returns = pd.DataFrame(u * s, index=returns.index, columns=names)
+        self.factor_variance = pd.Series(s ** 2 / (n_obs - 1), index=names)
+        self.asset_variance = pd.Series((x ** 2).sum(axis=0) / (n_obs - 1), index=assets)
+        self.explained_variance = self.factor_variance / self.asset_variance.sum()
+        self._demeaned = x
+        return self
+
+    def get_exposures(self):
+        """
+        Factor betas of each asset and the share of its variance explained by the factors.
+        """
+        exposures = self.loadings.copy()
+        factor_part = (self.loadings ** 2 * self.factor_variance).sum(axis=1)
+        exposures["R-Squared"] = (factor_part / self.asset_variance).clip(upper=1.0)
+        return exposures
+
+    def split_risk(self, weights, annualization=252):
+        """
+        Splits the variance of a weight vector into factor and idiosyncratic parts.
+        weights: dict {ticker: weight}; tickers not in the panel are ignored.
+        """
+        w = np.array([weights.get(t, 0.0) for t in self.loadings.index])
+        n_obs = len(self._demeaned)
+
+        # Total variance from the return panel itself (no N x N covariance needed)
+        port_returns = self._demeaned @ w
+        total_var = port_returns @ port_returns / (n_obs - 1)
+
+        exposure = self.loadings.to_numpy().T @ w
+        contributions = exposure ** 2 * self.factor_variance.to_numpy()
+        factor_var = contributions.sum()
+        idio_var = max(total_var - factor_var, 0.0)
+
+        result = {
+            "Total Volatility": np.sqrt(total_var * annualization),
+            "Factor Volatility": np.sqrt(factor_var * annualization),
+            "Idiosyncratic Volatility": np.sqrt(idio_var * annualization),
+            "Factor Share": factor_var / total_var if total_var > 0 else 0.0
+        }
+        for name, exp_value, contribution in zip(self.loadings.columns, exposure, contributions):
+            result[f"{name} Exposure"] = exp_value
+            result[f"{name} Variance Share"] = contribution / total_var if total_var > 0 else 0.0
+        return result
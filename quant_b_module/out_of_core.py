@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+from data_loader import block_rows_for_budget
+from streaming_metrics import StreamingMetrics
+from quant_b_module.portfolio_manager import rebalance_mask
+
+
+class ChunkedPortfolioEngine:
+    """
+    Out-of-core version of the Quant B computations.
+    Prices are processed by blocks of dates; only the state needed by the next block is
+    carried (last prices, positions, running moments, last and peak value), so peak memory
+    depends on the block size and the number of assets, not on the length of the history.
+    The portfolio value of each block is yielded by stream() and never kept.
+
+    Results match PortfolioManager on the same prices (ffill then bfill cleaning):
+    simulate_portfolio, get_covariance / get_correlation_matrix and get_portfolio_metrics.
+    """
+    def __init__(self, weights, rebalance_freq="None", memory_budget_mb=256, periods_per_year=252):
+        self.weights = dict(weights)
+        self.tickers = list(self.weights)
+        self.rebalance_freq = rebalance_freq
+        self.memory_budget_mb = memory_budget_mb
+        self.periods_per_year = periods_per_year
+
+        n = len(self.tickers)
+        self._target = np.array([self.weights[t] for t in self.tickers], dtype=float)
+        # Carried state
+        self.last_prices = np.full(n, np.nan)
+        self.positions = 100.0 * self._target
+        self.prev_date = None
+        # Running moments of asset returns (first date excluded, like get_returns)
+        self.count = 0
+        self.mean = np.zeros(n)
+        self.comoment = np.zeros((n, n))
+        self.portfolio_metrics = StreamingMetrics(periods_per_year=periods_per_year, count_initial_value=True)
+        self.first_value = None
+        self.last_value = None
+        self.blocks_processed = 0
+
+    @property
+    def block_rows(self):
+        """
+        Dates per block allowed by the memory budget (the co-moment matrix is the fixed state).
+        """
+        n = len(self.tickers)
+        return block_rows_for_budget(n, self.memory_budget_mb, fixed_bytes=n * n * 8)
+
+    def _block_returns(self, prices):
+        """
+        Simple returns of a block, continuing from the carried last prices.
+        Missing prices repeat the last known one (ffill) and a ticker is flat until its
+        first price (bfill), so gaps and late starts give zero returns.
+        """
+        filled = np.vstack([self.last_prices[None, :], prices])
+        filled = pd.DataFrame(filled).ffill().to_numpy()
+        with np.errstate(invalid="ignore"):
+            returns = filled[1:] / filled[:-1] - 1
+        self.last_prices = filled[-1]
+        return np.nan_to_num(returns, nan=0.0)
+
+    def _simulate_block(self, dates, returns):
+        """
+        Rebalancing simulation over one block, carrying the positions to the next block.
+        """
+        if self.prev_date is None:
+            mask = rebalance_mask(dates, self.rebalance_freq)
+        else:
+            mask = rebalance_mask(dates.insert(0, self.prev_date), self.rebalance_freq)[1:]
+
+        values = np.empty(len(dates))
+        bounds = np.concatenate(([0], np.flatnonzero(mask), [len(dates)]))
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            if start == stop:
+                continue
+            if mask[start]:
+                self.positions = self.positions.sum() * self._target
+            growth = np.cumprod(1 + returns[start:stop], axis=0)
+            values[start:stop] = growth @ self.positions
+            self.positions = self.positions * growth[-1]
+        return values
+
+    def _accumulate_moments(self, returns):
+        """
+        Merges the block mean and co-moment matrix into the running ones (Chan et al.).
+        """
+        n_block = len(returns)
+        if n_block == 0:
+            return
+        block_mean = returns.mean(axis=0)
+        centered = returns - block_mean
+        total = self.count + n_block
+        delta = block_mean - self.mean
+        self.comoment += centered.T @ centered + np.outer(delta, delta) * self.count * n_block / total
+        self.mean += delta * n_block / total
+        self.count = total
+
+    def process_block(self, block):
+        """
+        Processes one block of prices (dates x tickers), strictly after the previous block.
+        Returns the portfolio value (Base 100) over the block.
+        """
+        block = block.reindex(columns=self.tickers)
+        dates = pd.DatetimeIndex(block.index)
+        returns = self._block_returns(block.to_numpy(dtype=float))
+        values = self._simulate_block(dates, returns)
+
+        if self.prev_date is None:
+            # The first date has no return: it only sets the base of the series
+            self.first_value = values[0]
+            self._accumulate_moments(returns[1:])
+            self.portfolio_metrics.first_date = dates[0]
+            self.portfolio_metrics.update_array(values[1:] / values[:-1] - 1, dates[1:])
+        else:
+            self._accumulate_moments(returns)
+            self.portfolio_metrics.update_array(values / np.concatenate(([self.last_value], values[:-1])) - 1, dates)
+
+        self.last_value = values[-1]
+        self.prev_date = dates[-1]
+        self.blocks_processed += 1
+        return pd.Series(values, index=dates, name="Portfolio")
+
+    def stream(self, blocks):
+        """
+        Processes an iterable of blocks (e.g. PriceStore.iter_blocks) and yields the
+        portfolio value of each block, like simulate_portfolio(...)['Portfolio'] piece by piece.
+        """
+        for block in blocks:
+            if not block.empty:
+                yield self.process_block(block)
+
+    def run(self, blocks):
+        """
+        Processes an iterable of blocks, keeping only the aggregates.
+        """
+        for _ in self.stream(blocks):
+            pass
+        return self
+
+    def store_blocks(self, store, name):
+        """
+        Blocks of a PriceStore panel, with the block size given by the memory budget.
+        """
+        return store.iter_blocks(name, self.block_rows, tickers=self.tickers)
+
+    def run_store(self, store, name):
+        """
+        Streams a panel of a PriceStore.
+        """
+        return self.run(self.store_blocks(store, name))
+
+    # ----------------------------------- Results ---------------------------------------
+
+    def get_covariance(self):
+        """Covariance matrix of daily returns."""
+        cov = self.comoment / (self.count - 1) if self.count > 1 else np.full(self.comoment.shape, np.nan)
+        return pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+
+    def get_correlation_matrix(self):
+        cov = self.get_covariance()
+        std = np.sqrt(np.diag(cov))
+        return cov / np.outer(std, std)
+
+    def get_asset_volatility(self):
+        """Annualized volatility of each asset."""
+        return pd.Series(np.sqrt(np.diag(self.get_covariance())) * np.sqrt(self.periods_per_year), index=self.tickers)
+
+    def get_portfolio_metrics(self):
+        """
+        Same keys as PortfolioManager.get_portfolio_metrics, plus the streaming metrics.
+        """
+        vol_port = self.portfolio_metrics.volatility
+        weighted_vol_sum = float(self.get_asset_volatility() @ self._target)
+        metrics = self.portfolio_metrics.get_metrics()
+        return {
+            "Total Return": self.last_value / self.first_value - 1,
+            "Volatility (Ann.)": vol_port,
+            "Diversification Effect": weighted_vol_sum - vol_port,
+            "CAGR": metrics["CAGR"],
+            "Sharpe Ratio": metrics["Sharpe Ratio"],
+            "Max Drawdown": metrics["Max Drawdown"]
+        }
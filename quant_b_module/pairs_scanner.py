@@ -0,0 +1,259 @@
+"""
+PAIRS SCANNER
+-------------
+Finds cointegrated pairs in a universe (Engle-Granger two-step test):
+1. Prefilter: only the pairs whose daily returns are correlated above a threshold are tested
+   (on 500 assets, 124,750 pairs shrink to a few thousand).
+2. Batched regressions: for a batch of pairs, the hedge ratio (OLS of log prices) and the
+   ADF regression of the spread are solved together with array operations, one column
+   per pair. Both orientations (Y on X and X on Y) are tested and the stronger one is kept.
+3. Batches are split across a process pool when there are many of them (command line scans);
+   the price panel is sent once to each worker. Workers are spawned, not forked, and the
+   dashboard runs its scans in-process (max_workers=1).
+4. The best pairs get a backtest of their spread (z-score entry / exit rules).
+
+p-values are MacKinnon's for a cointegrating regression of 2 variables with a constant.
+"""
+
+import argparse
+import math
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.adfvalues import mackinnonp
+
+SPREAD_COLUMNS = ["Asset Y", "Asset X", "Correlation", "Hedge Ratio", "Intercept", "ADF Stat",
+                  "p-value", "Half-Life (Days)", "Spread Vol"]
+
+# Log price panel of the worker processes (sent once by the pool initializer)
+_WORKER_PRICES = None
+
+
+def candidate_pairs(returns, min_correlation=0.6):
+    """
+    Pairs (i, j), i < j, whose return correlation is at least min_correlation.
+    Returns the two index arrays and the correlations.
+    """
+    corr = np.corrcoef(np.asarray(returns, dtype=float), rowvar=False)
+    first, second = np.triu_indices(corr.shape[0], k=1)
+    corr = corr[first, second]
+    keep = corr >= min_correlation
+    return first[keep], second[keep], corr[keep]
+
+
+def adf_batch(spreads, lags=1):
+    """
+    ADF t-statistics (no constant: the spreads are demeaned) of every column of a
+    (dates x pairs) array, with `lags` lagged differences. The least squares of all
+    the columns are solved at once from their normal equations.
+    Degenerate spreads (constant, e.g. two identical or flat forward-filled prices) give
+    singular systems: their statistics are NaN.
+    Returns (t-statistics, gamma of the lag-free regression for the half-life).
+    """
+    diff = np.diff(spreads, axis=0)
+    target = diff[lags:]
+    # Regressors: lagged level, then the lagged differences
+    regressors = [spreads[lags:-1]] + [diff[lags - k:-k] for k in range(1, lags + 1)]
+    n_obs, k = target.shape[0], len(regressors)
+
+    xtx = np.empty((spreads.shape[1], k, k))
+    xty = np.empty((spreads.shape[1], k))
+    for a in range(k):
+        xty[:, a] = np.einsum("tp,tp->p", regressors[a], target)
+        for b in range(a, k):
+            xtx[:, a, b] = xtx[:, b, a] = np.einsum("tp,tp->p", regressors[a], regressors[b])
+
+    # Singular systems are solved on the identity instead, then masked
+    finite = np.isfinite(xtx).all(axis=(1, 2))
+    xtx[~finite] = np.eye(k)
+    singular = ~finite | (np.linalg.matrix_rank(xtx) < k)
+    xtx[singular] = np.eye(k)
+
+    inverse = np.linalg.inv(xtx)
+    coef = np.einsum("pab,pb->pa", inverse, xty)
+    fitted = sum(coef[:, a] * regressors[a] for a in range(k))
+    sigma2 = ((target - fitted) ** 2).sum(axis=0) / (n_obs - k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stat = np.where(singular, np.nan, coef[:, 0] / np.sqrt(sigma2 * inverse[:, 0, 0]))
+
+        # Speed of mean reversion: delta spread = gamma * previous spread
+        gamma = np.einsum("tp,tp->p", spreads[:-1], diff) / np.einsum("tp,tp->p", spreads[:-1], spreads[:-1])
+    return t_stat, np.where(singular, np.nan, gamma)
+
+
+def engle_granger_batch(log_prices, y_idx, x_idx, lags=1):
+    """
+    Cointegrating regression log(Y) = alpha + beta * log(X) + spread for a batch of pairs
+    (column indices of a dates x assets array), then the ADF test of each spread.
+    Returns a dict of arrays (one value per pair).
+    """
+    y = log_prices[:, y_idx]
+    x = log_prices[:, x_idx]
+    y_mean, x_mean = y.mean(axis=0), x.mean(axis=0)
+    yc, xc = y - y_mean, x - x_mean
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = np.einsum("tp,tp->p", xc, yc) / np.einsum("tp,tp->p", xc, xc)
+    spreads = yc - beta * xc
+
+    t_stat, gamma = adf_batch(spreads, lags)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        half_life = np.where((gamma < 0) & (gamma > -1), -math.log(2) / np.log1p(gamma), np.inf)
+    return {
+        "Hedge Ratio": beta,
+        "Intercept": y_mean - beta * x_mean,
+        "ADF Stat": t_stat,
+        "Half-Life (Days)": half_life,
+        "Spread Vol": spreads.std(axis=0, ddof=1)
+    }
+
+
+def _test_batch(log_prices, first, second, lags):
+    """
+    Tests both orientations of a batch of pairs and keeps the one with the lowest ADF statistic
+    (then its p-value, computed in the worker too).
+    """
+    forward = engle_granger_batch(log_prices, first, second, lags)
+    backward = engle_granger_batch(log_prices, second, first, lags)
+    swap = backward["ADF Stat"] < forward["ADF Stat"]
+    best = {key: np.where(swap, backward[key], forward[key]) for key in forward}
+    best["y"] = np.where(swap, second, first)
+    best["x"] = np.where(swap, first, second)
+    best["p-value"] = np.array([mackinnonp(t, regression="c", N=2) for t in best["ADF Stat"]])
+    return best
+
+
+def _init_worker(log_prices):
+    global _WORKER_PRICES
+    _WORKER_PRICES = log_prices
+
+
+def _worker_batch(first, second, lags):
+    return _test_batch(_WORKER_PRICES, first, second, lags)
+
+
+def scan_pairs(prices, min_correlation=0.6, lags=1, batch_size=2000, max_workers=4, max_pvalue=None):
+    """
+    Engle-Granger test of every prefiltered pair of a (dates x tickers) price panel
+    (assets with missing prices are skipped: align or fill the panel first).
+    Up to one batch is run in this process; more batches are spread over a process pool of
+    spawned workers (a fork of a threaded process, such as the dashboard server, can deadlock).
+    Returns a DataFrame ranked by p-value (then half-life), one row per tested pair.
+    """
+    prices = prices.dropna(axis=1, how="any")
+    log_prices = np.log(prices.to_numpy(dtype=float))
+    first, second, corr = candidate_pairs(np.diff(log_prices, axis=0), min_correlation)
+    if len(first) == 0:
+        return pd.DataFrame(columns=SPREAD_COLUMNS)
+
+    bounds = list(range(0, len(first), batch_size))
+    if len(bounds) == 1 or max_workers <= 1:
+        results = [_test_batch(log_prices, first[i:i + batch_size], second[i:i + batch_size], lags)
+                   for i in bounds]
+    else:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes=max_workers, initializer=_init_worker, initargs=(log_prices,)) as pool:
+            tasks = [pool.apply_async(_worker_batch, (first[i:i + batch_size], second[i:i + batch_size], lags))
+                     for i in bounds]
+            results = [task.get() for task in tasks]
+
+    merged = {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+    columns = prices.columns
+    table = pd.DataFrame({
+        "Asset Y": columns[merged["y"]],
+        "Asset X": columns[merged["x"]],
+        "Correlation": corr,
+        "Hedge Ratio": merged["Hedge Ratio"],
+        "Intercept": merged["Intercept"],
+        "ADF Stat": merged["ADF Stat"],
+        "p-value": merged["p-value"],
+        "Half-Life (Days)": merged["Half-Life (Days)"],
+        "Spread Vol": merged["Spread Vol"]
+    })
+    if max_pvalue is not None:
+        table = table[table["p-value"] <= max_pvalue]
+    return table.sort_values(["p-value", "Half-Life (Days)"]).reset_index(drop=True)
+
+
+def backtest_spread(y, x, hedge_ratio, intercept=0.0, window=60, entry_z=2.0, exit_z=0.5):
+    """
+    Mean-reversion backtest of a pair: long the spread (long Y, short hedge_ratio X) when its
+    rolling z-score falls below -entry_z, short it above entry_z, flat once |z| < exit_z.
+    Positions are taken the next day; returns are per unit of gross exposure (1 + |hedge_ratio|).
+    The hedge ratio comes from the full sample, so the backtest is in-sample.
+    Returns a DataFrame with 'Spread', 'Z-Score', 'Position', 'Returns' and 'Cumulative' (Base 100).
+    """
+    spread = np.log(y) - hedge_ratio * np.log(x) - intercept
+    rolling = spread.rolling(window)
+    z_score = (spread - rolling.mean()) / rolling.std()
+
+    # Entry / exit levels set the position, which is held in between (hysteresis)
+    position = pd.Series(np.nan, index=spread.index)
+    position[z_score.abs() < exit_z] = 0.0
+    position[z_score < -entry_z] = 1.0
+    position[z_score > entry_z] = -1.0
+    position = position.ffill().fillna(0.0)
+
+    pair_returns = (y.pct_change() - hedge_ratio * x.pct_change()) / (1 + abs(hedge_ratio))
+    returns = (position.shift(1) * pair_returns).fillna(0.0)
+    return pd.DataFrame({
+        "Spread": spread,
+        "Z-Score": z_score,
+        "Position": position,
+        "Returns": returns,
+        "Cumulative": 100 * (1 + returns).cumprod()
+    })
+
+
+def backtest_metrics(backtest):
+    """
+    Total return, CAGR, Sharpe ratio (CAGR / volatility), max drawdown and number of trades.
+    """
+    cumulative = backtest["Cumulative"]
+    total_return = cumulative.iloc[-1] / 100 - 1
+    years = max((cumulative.index[-1] - cumulative.index[0]).days / 365.25, 0.01)
+    cagr = (1 + total_return) ** (1 / years) - 1
+    volatility = backtest["Returns"].std() * np.sqrt(252)
+    position = backtest["Position"]
+    return {
+        "Backtest Return": total_return,
+        "Backtest Sharpe": cagr / volatility if volatility > 0 else 0.0,
+        "Backtest Max Drawdown": (cumulative / cumulative.cummax() - 1).min(),
+        "Trades": int(((position != 0) & (position != position.shift(1))).sum())
+    }
+
+
+def rank_pairs(prices, top=20, window=60, entry_z=2.0, exit_z=0.5, **scan_kwargs):
+    """
+    Scans the panel and backtests the spread of the `top` best pairs.
+    Returns the ranked table of those pairs with their backtest metrics.
+    """
+    table = scan_pairs(prices, **scan_kwargs).head(top)
+    rows = []
+    for _, pair in table.iterrows():
+        backtest = backtest_spread(prices[pair["Asset Y"]], prices[pair["Asset X"]], pair["Hedge Ratio"],
+                                   pair["Intercept"], window=window, entry_z=entry_z, exit_z=exit_z)
+        rows.append(backtest_metrics(backtest))
+    metrics = pd.DataFrame(rows, index=table.index,
+                           columns=["Backtest Return", "Backtest Sharpe", "Backtest Max Drawdown", "Trades"])
+    return pd.concat([table, metrics], axis=1)
+
+
+if __name__ == "__main__":
+    # Overnight scan of a PriceStore panel: python -m quant_b_module.pairs_scanner --panel sp500
+    from data_loader import PriceStore
+
+    parser = argparse.ArgumentParser(description="All-pairs cointegration scan of a price panel.")
+    parser.add_argument("--store", default="price_store", help="PriceStore directory")
+    parser.add_argument("--panel", default="prices", help="PriceStore panel name")
+    parser.add_argument("--min-correlation", type=float, default=0.6, help="Return correlation prefilter")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--top", type=int, default=50, help="Number of pairs to backtest and report")
+    parser.add_argument("--output", default="pairs_scan.csv", help="CSV file for the ranked pairs")
+    args = parser.parse_args()
+
+    store = PriceStore(args.store)
+    panel = pd.concat(store.iter_blocks(args.panel, 100_000)).ffill()
+    ranked = rank_pairs(panel, top=args.top, min_correlation=args.min_correlation, max_workers=args.workers)
+    ranked.to_csv(args.output, index=False)
+    print(ranked.to_string())
@@ -1,38 +1,354 @@
+import functools
+import threading
+
 import yfinance as yf
 import pandas as pd
 import numpy as np
 
+from data_loader import DOWNLOADS, download_key
+from risk_engine import RiskEngine
+from quant_b_module.factor_model import FactorModel
+from quant_b_module.calendar_alignment import align_calendar, native_volatility
+from quant_b_module.pairs_scanner import rank_pairs, backtest_spread
+from quant_b_module.drift_bands import drift_band_sweep
+
+
+def rebalance_mask(dates, rebalance_freq):
+    """
+    True on the dates where a calendar rebalance happens (first day of a new month/quarter/year).
+    """
+    mask = np.zeros(len(dates), dtype=bool)
+    if rebalance_freq == "Monthly":
+        key = dates.year * 12 + dates.month
+    elif rebalance_freq == "Quarterly":
+        key = dates.year * 4 + dates.quarter
+    elif rebalance_freq == "Yearly":
+        key = dates.year
+    else:
+        return mask
+    key = np.asarray(key)
+    mask[1:] = key[1:] != key[:-1]
+    return mask
+
+
+def merge_moments(moments, block):
+    """
+    Merges a block of return rows (n x assets) into running (count, mean, co-moment matrix)
+    moments (Chan et al.). The covariance is co-moment / (count - 1).
+    """
+    count, mean, comoment = moments
+    n_block = len(block)
+    if n_block == 0:
+        return moments
+    block_mean = block.mean(axis=0)
+    centered = block - block_mean
+    total = count + n_block
+    delta = block_mean - mean
+    comoment = comoment + centered.T @ centered + np.outer(delta, delta) * count * n_block / total
+    return total, mean + delta * n_block / total, comoment
+
+
+def synchronized(method):
+    """
+    Runs a method under the manager lock: a manager shared by several sessions never has
+    its data swapped (live update) in the middle of a calculation.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class PortfolioManager:
     """
     Handles data fetching and portfolio calculations.
+    A manager can be shared by several sessions: calculations and data swaps hold its lock.
     """
     def __init__(self):
+        self._lock = threading.RLock()
+        self._cache = {}
+        self.data_version = 0
+        self.cache_stats = {"hits": 0, "misses": 0, "computed": {}, "extended": {}}
+        # Last fetch request (used by update_latest)
+        self.tickers = None
+        self.calendar_policy = "Union"
         self.data = pd.DataFrame()
 
-    def fetch_data(self, tickers, period="1y"):
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, df):
+        """
+        Replacing the price panel starts a new data version and drops every derived array.
+        (In-place edits of the DataFrame are not detected: assign a new frame instead.)
+        """
+        self._set_data(df)
+
+    def _set_data(self, df, periods_per_year=252, calendar_report=None, native_volatility=None, cache=None):
+        """
+        Swaps the panel and its calendar (252 sessions per year by default) in one step.
+        cache: derived arrays already extended to the new panel (live updates), empty otherwise.
+        """
+        with self._lock:
+            self._data = df
+            self.data_version += 1
+            self._cache = cache if cache is not None else {}
+            self.periods_per_year = periods_per_year
+            self.calendar_report = calendar_report
+            self._native_volatility = native_volatility
+
+    # ----------------------------------- Derived Arrays (cached per data version) ---------------------------------------
+
+    @synchronized
+    def _cached(self, key, compute):
+        """
+        Returns a derived array, computing it only once per data version.
+        Cached objects are shared: callers must not modify them in place.
+        """
+        if key in self._cache:
+            self.cache_stats["hits"] += 1
+            return self._cache[key]
+
+        self.cache_stats["misses"] += 1
+        self.cache_stats["computed"][key] = self.cache_stats["computed"].get(key, 0) + 1
+        value = compute()
+        self._cache[key] = value
+        return value
+
+    def _get_raw_returns(self):
+        return self._cached("raw_returns", lambda: self.data.pct_change())
+
+    def get_returns(self):
+        """Daily simple returns (first row dropped)."""
+        return self._cached("returns", lambda: self._get_raw_returns().dropna())
+
+    def get_filled_returns(self):
+        """Daily simple returns with missing values set to 0 (used by the simulation)."""
+        return self._cached("filled_returns", lambda: self._get_raw_returns().fillna(0))
+
+    def get_log_returns(self):
+        """Daily log returns (first row dropped)."""
+        return self._cached("log_returns", lambda: np.log1p(self.get_returns()))
+
+    def get_asset_volatility(self):
+        """Annualized volatility of each asset."""
+        def compute():
+            # Native calendars: each asset annualized on its own sessions
+            if self._native_volatility is not None:
+                return self._native_volatility.reindex(self.data.columns)
+            return pd.Series(np.sqrt(np.diag(self.get_covariance())) * np.sqrt(self.periods_per_year),
+                             index=self.data.columns)
+
+        return self._cached("asset_volatility", compute)
+
+    def get_normalized_prices(self):
+        """Prices rebased to 100 on the first day."""
+        return self._cached("normalized", lambda: self.data / self.data.iloc[0] * 100)
+
+    def _get_moments(self):
+        """
+        Running (count, mean, co-moment) of the daily returns before the last date: the last
+        bar may still be restated, the settled ones are only extended by live updates.
+        """
+        def compute():
+            returns = self.get_returns()
+            settled = returns[returns.index < self.data.index[-1]].to_numpy(dtype=float)
+            n = returns.shape[1]
+            return merge_moments((0, np.zeros(n), np.zeros((n, n))), settled)
+
+        return self._cached("moments", compute)
+
+    def get_covariance(self):
+        """Covariance matrix of daily returns."""
+        def compute():
+            returns = self.get_returns()
+            last = returns[returns.index >= self.data.index[-1]].to_numpy(dtype=float)
+            count, _, comoment = merge_moments(self._get_moments(), last)
+            cov = comoment / (count - 1) if count > 1 else np.full(comoment.shape, np.nan)
+            return pd.DataFrame(cov, index=returns.columns, columns=returns.columns)
+
+        return self._cached("covariance", compute)
+
+    def _get_growth(self):
+        """Growth of each asset since the first day (missing returns are flat days)."""
+        return self._cached("growth", lambda: np.cumprod(1 + self.get_filled_returns().to_numpy(dtype=float), axis=0))
+
+    def _get_segments(self, rebalance_freq):
+        """
+        Rebalancing segments of a schedule: segment of each row, anchor row of each segment
+        (the day before the rebalance) and the growth of each asset since its segment anchor.
+        Without rebalancing there is one segment and the growth is the normalized asset path.
+        """
+        def compute():
+            growth = self._get_growth()
+            # Rows where a new segment starts (rebalancing happens before that day's return)
+            rebalance_days = np.flatnonzero(rebalance_mask(self.data.index, rebalance_freq))
+            anchors = np.concatenate(([0], rebalance_days - 1))
+            segment = np.searchsorted(rebalance_days, np.arange(len(growth)), side="right")
+            return segment, anchors, growth / growth[anchors[segment]]
+
+        return self._cached(f"segments_{rebalance_freq}", compute)
+
+    def _extend_cache(self, updated, start):
+        """
+        Derived arrays of `updated`, whose rows from `start` on replace the last known bar and
+        follow it, extended from the cached ones in O(new rows): the rows before `start` are
+        unchanged. Arrays that depend on the whole history (volatility, correlation, pairs...)
+        are dropped and rebuilt on demand from the extended ones (O(assets^2) for the moments).
+        """
+        old = self._cache
+        cache = {}
+        if start < 2:
+            return cache
+
+        # The row before `start` seeds the returns of the new rows
+        raw = updated.iloc[start - 1:].pct_change().iloc[1:]
+        first_new = updated.index[start]
+        if "raw_returns" in old:
+            cache["raw_returns"] = pd.concat([old["raw_returns"].iloc[:start], raw])
+        if "filled_returns" in old:
+            cache["filled_returns"] = pd.concat([old["filled_returns"].iloc[:start], raw.fillna(0)])
+        if "returns" in old:
+            returns = old["returns"]
+            cache["returns"] = pd.concat([returns[returns.index < first_new], raw.dropna()])
+        if "log_returns" in old:
+            log_returns = old["log_returns"]
+            cache["log_returns"] = pd.concat([log_returns[log_returns.index < first_new], np.log1p(raw.dropna())])
+        if "moments" in old:
+            # The restated bar is settled now, the newest one is not
+            settled = raw.dropna()
+            settled = settled[settled.index < updated.index[-1]]
+            cache["moments"] = merge_moments(old["moments"], settled.to_numpy(dtype=float))
+        if "normalized" in old:
+            cache["normalized"] = pd.concat([old["normalized"].iloc[:start],
+                                             updated.iloc[start:] / updated.iloc[0] * 100])
+        if "growth" in old:
+            growth = old["growth"][start - 1] * np.cumprod(1 + raw.fillna(0).to_numpy(dtype=float), axis=0)
+            cache["growth"] = np.vstack([old["growth"][:start], growth])
+
+        for key in old:
+            if key.startswith("segments_") and "growth" in cache:
+                cache[key] = self._extend_segments(old[key], cache["growth"], updated.index, start,
+                                                   key[len("segments_"):])
+        for key in cache:
+            self.cache_stats["extended"][key] = self.cache_stats["extended"].get(key, 0) + 1
+        return cache
+
+    @staticmethod
+    def _extend_segments(segments, growth, dates, start, rebalance_freq):
+        """
+        Rebalancing segments (see _get_segments) extended to the rows from `start` on.
+        """
+        segment, anchors, relative_growth = segments
+        # Rebalances of the replaced rows are dropped, then found again on the new dates
+        anchors = np.concatenate((anchors[:1], anchors[1:][anchors[1:] + 1 < start]))
+        new_days = start + np.flatnonzero(rebalance_mask(dates[start - 1:], rebalance_freq)[1:])
+        new_segment = len(anchors) - 1 + np.searchsorted(new_days, np.arange(start, len(dates)), side="right")
+        anchors = np.concatenate((anchors, new_days - 1))
+        new_growth = growth[start:] / growth[anchors[new_segment]]
+        return (np.concatenate((segment[:start], new_segment)), anchors,
+                np.vstack((relative_growth[:start], new_growth)))
+
+    @synchronized
+    def get_cache_stats(self):
+        """
+        Cache hits/misses and how many times each derived array was computed or extended
+        (live updates). Every key should be computed once per data version.
+        """
+        return {
+            "data_version": self.data_version,
+            "hits": self.cache_stats["hits"],
+            "misses": self.cache_stats["misses"],
+            "computed": dict(self.cache_stats["computed"]),
+            "extended": dict(self.cache_stats["extended"]),
+            "cached_keys": sorted(self._cache.keys())
+        }
+
+    def fetch_data(self, tickers, period="1y", start=None, calendar="Union"):
         """
         Fetches historical data for the given tickers using yfinance.
+        start: optional first date (overrides period), used to rebuild from a fixed anchor.
+        calendar: alignment policy of mixed calendars (see calendar_alignment.CALENDAR_POLICIES).
         """
         if not tickers:
             return None
         
         try:
             # Download adjusted close prices
-            df = yf.download(tickers, period=period, auto_adjust=True)['Close']
+            if start is not None:
+                kwargs = dict(start=start, auto_adjust=True)
+            else:
+                kwargs = dict(period=period, auto_adjust=True)
+            # Identical downloads from concurrent sessions are made once (shared result, hence the copy)
+            df = DOWNLOADS.run(download_key(tickers, **kwargs), lambda: yf.download(tickers, **kwargs))['Close'].copy()
         except Exception as e:
             print(f"Error fetching data: {e}")
             return None
         
-        # Handle single ticker case
-        if len(tickers) == 1:
+        # Handle single ticker case (older yfinance versions return a Series)
+        if isinstance(df, pd.Series):
             df = df.to_frame(name=tickers[0])
             
-        # Clean data (Forward fill then Backward fill)
-        df = df.ffill().bfill()
-        
-        self.data = df
-        return self.data
+        # Align calendars and clean data ("Union": Forward fill then Backward fill)
+        raw = df
+        df, report = align_calendar(raw, calendar)
+        native = native_volatility(raw, report["Asset Periods per Year"]) if calendar == "Native Calendars" else None
+
+        with self._lock:
+            self._set_data(df, report["Periods per Year"], report, native)
+            self.tickers = list(tickers)
+            self.calendar_policy = calendar
+        return df
+
+    def update_latest(self):
+        """
+        Pulls only the bars since the last known date and appends them to the panel
+        (the last known bar is replaced, since its close may have changed).
+        The new panel is built aside, then swapped in with its calendar and the derived arrays
+        extended over the new rows, in one step. Nothing changes (same data version) when the
+        download only repeats the last known bar. Returns the number of new dates.
+        """
+        data = self.data
+        if data.empty or not self.tickers:
+            return 0
+
+        last_date = data.index[-1]
+        try:
+            kwargs = dict(start=last_date, auto_adjust=True)
+            latest = DOWNLOADS.run(download_key(self.tickers, **kwargs),
+                                   lambda: yf.download(self.tickers, **kwargs))['Close'].copy()
+        except Exception as e:
+            print(f"Error fetching latest data: {e}")
+            return 0
+
+        if isinstance(latest, pd.Series):
+            latest = latest.to_frame(name=self.tickers[0])
+        latest = latest[latest.index >= last_date]
+        if latest.empty:
+            return 0
+
+        # The previous row seeds the gap filling of the new ones
+        base = data[data.index < last_date]
+        aligned, _ = align_calendar(pd.concat([base.iloc[-1:], latest]), self.calendar_policy)
+        aligned = aligned[aligned.index >= last_date].reindex(columns=data.columns)
+        if aligned.index.equals(data.index[-1:]) and np.array_equal(
+                aligned.to_numpy(dtype=float), data.iloc[-1:].to_numpy(dtype=float), equal_nan=True):
+            return 0
+        updated = pd.concat([base, aligned])
 
+        with self._lock:
+            # Another session updated the shared panel meanwhile
+            if self.data is not data:
+                return 0
+            # Keep the calendar of the panel across the new data version
+            self._set_data(updated, self.periods_per_year, self.calendar_report, self._native_volatility,
+                           cache=self._extend_cache(updated, len(base)))
+        return len(updated) - len(data)
+
+    @synchronized
     def get_correlation_matrix(self):
         """
         Returns the correlation matrix of daily returns.
@@ -40,70 +356,76 @@ class PortfolioManager:
         if self.data.empty:
             return pd.DataFrame()
         
-        returns = self.data.pct_change().dropna()
-        return returns.corr()
+        def compute():
+            # Derived from the cached covariance: no extra pass over the return panel
+            cov = self.get_covariance()
+            std = np.sqrt(np.diag(cov))
+            return cov / np.outer(std, std)
+
+        return self._cached("correlation", compute)
 
+    @synchronized
     def simulate_portfolio(self, weights, rebalance_freq="None"):
         """
         Calculates portfolio performance with advanced rebalancing options.
         rebalance_freq: "None", "Monthly", "Quarterly", "Yearly"
+
+        Several portfolios can be simulated at once: weights can also be a DataFrame of
+        weight vectors (one row per portfolio, one column per ticker) and rebalance_freq
+        a list of schedules. The result then holds the value of every (portfolio, schedule)
+        variant, with ("Portfolio", "Rebalancing") MultiIndex columns.
         """
         if self.data.empty:
             return None
 
+        batch = isinstance(weights, pd.DataFrame) or isinstance(rebalance_freq, (list, tuple))
+        weights_matrix = weights if isinstance(weights, pd.DataFrame) else pd.DataFrame([weights], index=["Portfolio"])
+        schedules = list(rebalance_freq) if isinstance(rebalance_freq, (list, tuple)) else [rebalance_freq]
+
+        # Tickers without data are ignored
+        weights_matrix = weights_matrix.reindex(columns=self.data.columns).fillna(0.0)
+        values = self._simulate_batch(weights_matrix.to_numpy(dtype=float), schedules)
+
+        columns = pd.MultiIndex.from_product([weights_matrix.index, schedules], names=["Portfolio", "Rebalancing"])
+        values = pd.DataFrame(values, index=self.data.index, columns=columns)
+        if batch:
+            return values
+
         # Normalize data to start at 100
-        normalized_data = self.data / self.data.iloc[0] * 100
-        
-        # --- STRATEGY: BUY AND HOLD (No Rebalancing) ---
-        if rebalance_freq == "None" or rebalance_freq is None or rebalance_freq is False:
-            portfolio_value = pd.Series(0.0, index=normalized_data.index)
-            for ticker, weight in weights.items():
-                if ticker in normalized_data.columns:
-                    portfolio_value += normalized_data[ticker] * weight
-            
-            result_df = normalized_data.copy()
-            result_df['Portfolio'] = portfolio_value
-            return result_df
+        result_df = self.get_normalized_prices().copy()
+        result_df['Portfolio'] = values.iloc[:, 0]
+        return result_df
 
-        # --- STRATEGY: PERIODIC REBALANCING ---
-        else:
-            daily_returns = self.data.pct_change().fillna(0)
-            portfolio_value = pd.Series(100.0, index=daily_returns.index)
-            current_positions = {t: 100.0 * w for t, w in weights.items()}
-            
-            dates = daily_returns.index
-            for i in range(1, len(dates)):
-                current_date = dates[i]
-                prev_date = dates[i-1]
-                
-                # Check Rebalancing Trigger
-                should_rebalance = False
-                if rebalance_freq == "Monthly" and current_date.month != prev_date.month:
-                    should_rebalance = True
-                elif rebalance_freq == "Quarterly" and current_date.quarter != prev_date.quarter:
-                    should_rebalance = True
-                elif rebalance_freq == "Yearly" and current_date.year != prev_date.year:
-                    should_rebalance = True
-                
-                # Apply Rebalancing
-                if should_rebalance:
-                    total_value = sum(current_positions.values())
-                    current_positions = {t: total_value * w for t, w in weights.items()}
-                
-                # Apply Daily Performance
-                daily_total = 0
-                for ticker in weights.keys():
-                    if ticker in daily_returns.columns:
-                        ret = daily_returns.at[current_date, ticker]
-                        current_positions[ticker] *= (1 + ret)
-                        daily_total += current_positions[ticker]
-                
-                portfolio_value.at[current_date] = daily_total
-
-            result_df = normalized_data.copy()
-            result_df['Portfolio'] = portfolio_value
-            return result_df
+    def _simulate_batch(self, weights_matrix, schedules):
+        """
+        Values (dates x portfolios*schedules) of K weight vectors under each schedule, base 100.
+        Between two rebalancing dates each position grows with its asset, so the value is
+        V(anchor) * (growth since anchor) @ w, where the anchor is the day before the rebalance.
+        """
+        n_days = len(self.data.index)
+
+        blocks = []
+        for rebalance_freq in schedules:
+            # Segments are precomputed once per data version: a new weight vector only
+            # costs one matrix product and the recombination of the segment values
+            segment, anchors, relative_growth = self._get_segments(rebalance_freq)
+            factor = relative_growth @ weights_matrix.T
 
+            # Portfolio value at each anchor: product of the factors of the previous segments
+            segment_end = factor[anchors[1:]]
+            start_value = 100.0 * np.vstack((np.ones((1, len(weights_matrix))), np.cumprod(segment_end, axis=0)))
+            values = start_value[segment] * factor
+
+            # The rebalanced simulation starts at exactly 100
+            if rebalance_freq not in ("None", None, False):
+                values[0] = 100.0
+            blocks.append(values)
+
+        # Columns ordered portfolio-major, as in MultiIndex.from_product(portfolios, schedules)
+        stacked = np.stack(blocks, axis=2)
+        return stacked.reshape(n_days, -1)
+
+    @synchronized
     def get_portfolio_metrics(self, weights, portfolio_series):
         """
         Calculates risk/return metrics AND Diversification Effect.
@@ -115,11 +437,10 @@ class PortfolioManager:
         else:
             total_return = 0
             
-        vol_port = ret_port.std() * np.sqrt(252)
+        vol_port = ret_port.std() * np.sqrt(self.periods_per_year)
         
         # 2. Diversification Effect
-        individual_rets = self.data.pct_change().dropna()
-        individual_vols = individual_rets.std() * np.sqrt(252)
+        individual_vols = self.get_asset_volatility()
         
         weighted_vol_sum = 0
         for ticker, weight in weights.items():
@@ -132,4 +453,163 @@ class PortfolioManager:
             "Total Return": total_return,
             "Volatility (Ann.)": vol_port,
             "Diversification Effect": diversification_benefit
-        }
\ No newline at end of file
+        }
+
+    @synchronized
+    def preview_portfolio(self, weights, rebalance_freq="None"):
+        """
+        Fast path for interactive weight changes: the portfolio value (Base 100) and its
+        metrics from the precomputed segments, without building the simulation frame.
+        Volatility is the ex-ante volatility of the target weights, sqrt(w' Cov w), from the
+        cached covariance matrix. Returns (value Series named 'Portfolio', metrics dict).
+        """
+        if self.data.empty:
+            return None, {}
+
+        w = pd.Series(weights, dtype=float).reindex(self.data.columns).fillna(0.0).to_numpy()
+        values = pd.Series(self._simulate_batch(w[None, :], [rebalance_freq])[:, 0],
+                           index=self.data.index, name="Portfolio")
+
+        cov = self.get_covariance().to_numpy()
+        vol_port = float(np.sqrt(max(w @ cov @ w, 0.0) * self.periods_per_year))
+        weighted_vol_sum = float(self.get_asset_volatility().fillna(0.0).to_numpy() @ w)
+
+        return values, {
+            "Total Return": values.iloc[-1] / values.iloc[0] - 1,
+            "Volatility (Ann.)": vol_port,
+            "Diversification Effect": weighted_vol_sum - vol_port
+        }
+
+    @synchronized
+    def simulate_drift_bands(self, weights, bands, cost_bps=10.0, relative=False):
+        """
+        Drift-band rebalancing: back to the target weights whenever one weight leaves its band,
+        paying cost_bps on the traded value. Several band widths are simulated at once
+        (0.05 = 5 weight points, or 5% of each target weight if relative).
+        Returns (values DataFrame, one column per band; summary DataFrame with rebalances,
+        turnover, costs and cost drag; dict of rebalance dates per band).
+        """
+        if self.data.empty:
+            return None
+
+        target = pd.Series(weights, dtype=float).reindex(self.data.columns).fillna(0.0).to_numpy()
+        return drift_band_sweep(self._get_growth(), self.data.index, target, bands,
+                                cost_rate=cost_bps / 10_000, relative=relative,
+                                periods_per_year=self.periods_per_year)
+
+    @synchronized
+    def get_batch_metrics(self, weights_matrix, values):
+        """
+        Risk/return metrics of every variant returned by a batched simulate_portfolio,
+        one row per (portfolio, schedule), computed on the whole value matrix at once.
+        """
+        prices = values.to_numpy(dtype=float)
+        returns = prices[1:] / prices[:-1] - 1
+
+        total_return = prices[-1] / prices[0] - 1
+        years = max((values.index[-1] - values.index[0]).days / 365.25, 0.01)
+        cagr = (1 + total_return) ** (1 / years) - 1
+        vol_port = returns.std(axis=0, ddof=1) * np.sqrt(self.periods_per_year)
+        running_max = np.maximum.accumulate(prices, axis=0)
+        max_drawdown = ((prices - running_max) / running_max).min(axis=0)
+
+        # Diversification Effect: weighted sum of the asset volatilities minus the portfolio volatility
+        individual_vols = self.get_asset_volatility().reindex(weights_matrix.columns).fillna(0.0)
+        weighted_vol_sum = (weights_matrix.fillna(0.0) @ individual_vols).reindex(values.columns.get_level_values(0))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe = np.where(vol_port > 0, cagr / vol_port, 0.0)
+
+        return pd.DataFrame({
+            "Total Return": total_return,
+            "CAGR": cagr,
+            "Volatility (Ann.)": vol_port,
+            "Sharpe Ratio": sharpe,
+            "Max Drawdown": max_drawdown,
+            "Diversification Effect": weighted_vol_sum.to_numpy() - vol_port
+        }, index=values.columns)
+
+    @synchronized
+    def get_portfolio_risk(self, portfolio_series, window=250, levels=(0.95, 0.99)):
+        """
+        Rolling VaR/CVaR (Historical, Parametric, EWMA) of the simulated portfolio
+        and the backtest of VaR exceptions. Returns (rolling DataFrame, summary DataFrame).
+        """
+        ret_port = portfolio_series.pct_change().dropna()
+        if ret_port.empty:
+            return pd.DataFrame(), pd.DataFrame()
+
+        engine = RiskEngine(window=window, levels=levels)
+        rolling = engine.rolling_risk(ret_port)
+        return rolling, engine.summary(ret_port, rolling)
+
+    @synchronized
+    def get_asset_risk_table(self, window=250, levels=(0.95, 0.99)):
+        """
+        Latest VaR/CVaR of each asset on the most recent window.
+        """
+        if self.data.empty:
+            return pd.DataFrame()
+
+        return RiskEngine(window=window, levels=levels).latest_table(self.get_returns())
+
+    def get_pairs(self, min_correlation=0.6, top=20, max_workers=1):
+        """
+        Cointegrated pairs of the panel (Engle-Granger), ranked by p-value, with a backtest
+        of the spread of the `top` best ones (see pairs_scanner.py). Cached per data version.
+        The scan runs on a snapshot of the panel without holding the manager lock, so other
+        sessions sharing the manager are not blocked meanwhile.
+        Batches run in this process by default: the dashboard universes are small, and the
+        server should not start worker processes (max_workers > 1 spawns a pool).
+        """
+        key = f"pairs_{min_correlation}_{top}"
+        with self._lock:
+            data, version = self.data, self.data_version
+            if data.empty:
+                return None
+            if key in self._cache:
+                self.cache_stats["hits"] += 1
+                return self._cache[key]
+
+        pairs = rank_pairs(data, top=top, min_correlation=min_correlation, max_workers=max_workers)
+        with self._lock:
+            self.cache_stats["misses"] += 1
+            self.cache_stats["computed"][key] = self.cache_stats["computed"].get(key, 0) + 1
+            # The panel may have been updated during the scan
+            if self.data_version == version:
+                self._cache[key] = pairs
+        return pairs
+
+    @synchronized
+    def get_pair_backtest(self, asset_y, asset_x, hedge_ratio, intercept=0.0, window=60, entry_z=2.0, exit_z=0.5):
+        """
+        Z-score backtest of the spread log(Y) - hedge_ratio * log(X) - intercept.
+        """
+        return backtest_spread(self.data[asset_y], self.data[asset_x], hedge_ratio, intercept,
+                               window=window, entry_z=entry_z, exit_z=exit_z)
+
+    @synchronized
+    def get_factor_decomposition(self, n_factors=3, weights=None):
+        """
+        Principal component (statistical factor) decomposition of the return panel.
+        Returns explained variance, loadings, asset exposures, factor returns and,
+        when weights are given, the factor / idiosyncratic split of portfolio risk.
+        The fitted model is cached per data version: new weights only cost the risk split.
+        """
+        if self.data.empty:
+            return None
+
+        def compute():
+            model = FactorModel(n_factors=n_factors).fit(self.get_returns())
+            return model, model.get_exposures()
+
+        model, exposures = self._cached(f"factors_{n_factors}", compute)
+
+        return {
+            "Explained Variance": model.explained_variance,
+            "Loadings": model.loadings,
+            "Exposures": exposures,
+            "Factor Returns": model.factor_returns,
+            "Risk Split": model.split_risk(weights, annualization=self.periods_per_year) if weights else None
+        }
+
@@ -0,0 +1,351 @@
+import hashlib
+import json
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from streaming_metrics import StreamingMetrics, SlidingAggregate
+
+STATE_VERSION = 4
+
+
+def should_rebalance(rebalance_freq, current_date, prev_date):
+    """
+    Calendar rebalancing trigger (same rule as PortfolioManager.simulate_portfolio).
+    """
+    if rebalance_freq == "Monthly":
+        return current_date.month != prev_date.month
+    if rebalance_freq == "Quarterly":
+        return current_date.quarter != prev_date.quarter
+    if rebalance_freq == "Yearly":
+        return current_date.year != prev_date.year
+    return False
+
+
+def combine_returns(older, newer):
+    """
+    Merges two [count, mean, m2] summaries of returns (Chan et al.).
+    Mean and m2 are floats, or lists with one value per asset.
+    """
+    count = older[0] + newer[0]
+    if older[0] == 0 or newer[0] == 0:
+        return list(newer[:3] if older[0] == 0 else older[:3])
+    mean_old, mean_new = np.asarray(older[1], dtype=float), np.asarray(newer[1], dtype=float)
+    delta = mean_new - mean_old
+    mean = mean_old + delta * newer[0] / count
+    m2 = np.asarray(older[2], dtype=float) + np.asarray(newer[2], dtype=float) + delta ** 2 * older[0] * newer[0] / count
+    return [count, mean.tolist(), m2.tolist()]
+
+
+def combine_path(older, newer):
+    """
+    Merges the summaries of two consecutive stretches of a value path:
+    [count, mean, m2] of the returns, then the max, min and max drawdown of the values.
+    """
+    return combine_returns(older, newer) + [max(older[3], newer[3]), min(older[4], newer[4]),
+                                            min(older[5], newer[5], newer[4] / older[3] - 1)]
+
+
+class PortfolioState:
+    """
+    End-of-run state of a simulated portfolio.
+    Carries positions and streaming metrics (running peak, Welford volatility), so that
+    a new run only processes the bars it has not seen yet (O(new bars)).
+
+    With window_years, it reports the trailing window instead, Base 100 at its first bar, like
+    a full recompute over the last window_years. From the first rebalance of the window on,
+    the window portfolio is the carried one scaled by a constant, so the summaries of those
+    bars (SlidingAggregate) only change when bars enter or expire. Only the head of the window,
+    before that rebalance, is simulated again at each report (the whole window without
+    rebalancing). The window prices are kept for that head and for the restatement check.
+    """
+    def __init__(self, weights, rebalance_freq="None", window_years=None):
+        self.weights = dict(weights)
+        self.rebalance_freq = rebalance_freq
+        self.window_years = window_years
+        self.start_date = None
+        self.last_date = None
+        self.last_prices = {}
+        self.positions = {}
+        self.value = 100.0
+        self.prev_value = 100.0
+        if window_years:
+            # Prices and carried value of every bar of the window
+            self.window_dates = []
+            self.window_prices = []
+            self.window_values = []
+            # First rebalance of the window, and the path summaries of the bars from it on
+            self.tail_start = None
+            self.tail = SlidingAggregate(combine_path)
+            # Asset return summaries of the window
+            self.asset_window = SlidingAggregate(combine_returns)
+        else:
+            # Streaming metrics of the portfolio and of each asset
+            self.metrics = StreamingMetrics(count_initial_value=True)
+            self.asset_metrics = {}
+
+    @staticmethod
+    def config_fingerprint(weights, rebalance_freq, window_years=None):
+        """
+        Identifies the configuration a state was built for (tickers, weights, rebalancing, window).
+        """
+        payload = json.dumps({"weights": weights, "rebalance_freq": rebalance_freq, "window_years": window_years,
+                              "version": STATE_VERSION}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @classmethod
+    def build(cls, prices, weights, rebalance_freq="None", window_years=None):
+        """
+        Full rebuild from a cleaned price panel (dates x tickers).
+        """
+        state = cls(weights, rebalance_freq, window_years)
+        tickers = [t for t in state.weights if t in prices.columns]
+        first_date = prices.index[0]
+        first_row = prices.iloc[0]
+
+        state.start_date = first_date
+        state.last_date = first_date
+        state.last_prices = {t: float(first_row[t]) for t in tickers}
+        state.positions = {t: 100.0 * state.weights[t] for t in tickers}
+        state.value = state.prev_value = sum(state.positions.values())
+        if window_years:
+            state._record_bar(first_date)
+        else:
+            state.asset_metrics = {t: StreamingMetrics() for t in tickers}
+
+        state.update(prices.iloc[1:])
+        return state
+
+    @property
+    def window_start(self):
+        """First date of the reported period (the trailing window, or start_date)."""
+        return self.window_dates[0] if self.window_years and self.window_dates else self.start_date
+
+    def history_matches(self, prices, rtol=1e-6):
+        """
+        Checks that the stored prices are still the prices reported for their dates: every bar
+        of the trailing window (download from window_start), or the last bar without a window.
+        Restated history (dividend adjustment, vendor corrections) requires a full rebuild.
+        Missing downloaded prices are skipped (the state carries the last known price).
+        """
+        tickers = list(self.positions)
+        if self.last_date not in prices.index or any(t not in prices.columns for t in tickers):
+            return False
+        if self.window_years:
+            stored = pd.DataFrame(self.window_prices, index=pd.DatetimeIndex(self.window_dates), columns=tickers)
+        else:
+            stored = pd.DataFrame([self.last_prices], index=[self.last_date], columns=tickers)
+
+        fetched = prices.reindex(index=stored.index, columns=tickers).to_numpy(dtype=float)
+        known = ~np.isnan(fetched)
+        return bool(np.isclose(fetched[known], stored.to_numpy(dtype=float)[known], rtol=rtol).all())
+
+    def update(self, prices):
+        """
+        Applies every bar strictly after the last processed date.
+        Missing prices carry the last known price (flat day), like ffill in fetch_data.
+        """
+        new_bars = prices[prices.index > self.last_date]
+        for date, row in new_bars.iterrows():
+            self._step(date, row)
+        self._trim_window()
+        return len(new_bars)
+
+    def _record_bar(self, date):
+        self.window_dates.append(pd.Timestamp(date))
+        self.window_prices.append([self.last_prices[t] for t in self.positions])
+        self.window_values.append(self.value)
+
+    def _advance_window(self, date, rebalanced, asset_returns):
+        """
+        Adds the bar just processed to the window summaries.
+        """
+        self._record_bar(date)
+        self.asset_window.push([1, asset_returns, [0.0] * len(asset_returns)])
+        if rebalanced and self.tail_start is None:
+            self.tail_start = pd.Timestamp(date)
+        if self.tail_start is not None:
+            self.tail.push([1, self.value / self.prev_value - 1, 0.0, self.value, self.value, 0.0])
+
+    def _trim_window(self):
+        """
+        Drops the bars older than window_years before the last date, with their summaries.
+        """
+        if not self.window_years or not self.window_dates:
+            return
+        cutoff = self.last_date - pd.DateOffset(years=self.window_years)
+        keep_from = bisect_left(self.window_dates, cutoff)
+        if keep_from == 0:
+            return
+
+        # Returns of the dropped bars (the new first bar's return is now before the window)
+        for _ in range(keep_from):
+            self.asset_window.pop()
+
+        # The first rebalance must come after the new first bar
+        if self.tail_start is not None and self.tail_start <= self.window_dates[keep_from]:
+            first = bisect_left(self.window_dates, self.tail_start)
+            stop = first + 1
+            while stop < len(self.window_dates) and (
+                    stop <= keep_from or
+                    not should_rebalance(self.rebalance_freq, self.window_dates[stop], self.window_dates[stop - 1])):
+                stop += 1
+            for _ in range(stop - first):
+                self.tail.pop()
+            self.tail_start = self.window_dates[stop] if stop < len(self.window_dates) else None
+
+        del self.window_dates[:keep_from]
+        del self.window_prices[:keep_from]
+        del self.window_values[:keep_from]
+
+    def _step(self, date, row):
+        """
+        One bar of the rebalancing loop of PortfolioManager.simulate_portfolio.
+        """
+        # Check Rebalancing Trigger
+        rebalanced = should_rebalance(self.rebalance_freq, date, self.last_date)
+        if rebalanced:
+            total_value = sum(self.positions.values())
+            self.positions = {t: total_value * self.weights[t] for t in self.positions}
+
+        # Apply Daily Performance
+        asset_returns = []
+        for ticker in self.positions:
+            price = row.get(ticker, np.nan)
+            if pd.isna(price):
+                price = self.last_prices[ticker]
+            ret = price / self.last_prices[ticker] - 1
+            self.positions[ticker] *= (1 + ret)
+            self.last_prices[ticker] = float(price)
+            asset_returns.append(ret)
+
+        value = sum(self.positions.values())
+        self.prev_value = self.value
+        self.value = value
+        self.last_date = date
+
+        # Window summaries, or streaming metrics since the start (volatility, drawdown)
+        if self.window_years:
+            self._advance_window(date, rebalanced, asset_returns)
+        else:
+            self.metrics.update(value / self.prev_value - 1, date)
+            for ticker, ret in zip(self.positions, asset_returns):
+                self.asset_metrics[ticker].update(ret, date)
+
+    def _window_metrics(self):
+        """
+        Value, previous value, path summary and asset volatilities of the trailing window.
+        The head (bars before the first rebalance of the window) starts from the target weights
+        at Base 100 and is simulated again; the tail is the carried path, scaled to the head.
+        """
+        head_end = len(self.window_dates) if self.tail_start is None else bisect_left(self.window_dates, self.tail_start)
+        head_prices = np.array(self.window_prices[:head_end], dtype=float)
+        target = np.array([self.weights[t] for t in self.positions])
+        values = head_prices @ (100.0 * target / head_prices[0])
+
+        returns = values[1:] / values[:-1] - 1
+        mean = float(returns.mean()) if len(returns) else 0.0
+        peaks = np.maximum.accumulate(values)
+        summary = [len(returns), mean, float(((returns - mean) ** 2).sum()),
+                   float(values.max()), float(values.min()), min(float(((values - peaks) / peaks).min()), 0.0)]
+
+        if self.tail_start is None:
+            value, prev_value = values[-1], values[-2] if len(values) > 1 else values[-1]
+        else:
+            scale = values[-1] / self.window_values[head_end - 1]
+            tail = self.tail.aggregate()
+            summary = combine_path(summary, tail[:3] + [tail[3] * scale, tail[4] * scale, tail[5]])
+            value = self.value * scale
+            prev_value = self.prev_value * scale if len(self.tail) > 1 else values[-1]
+
+        count, _, m2 = self.asset_window.aggregate() or [0, [], []]
+        asset_volatility = np.sqrt(np.asarray(m2) / (count - 1) * 252) if count > 1 else np.zeros(len(target))
+        return value, prev_value, summary, dict(zip(self.positions, asset_volatility))
+
+    def get_metrics(self):
+        """
+        Report metrics from the carried state (no full history needed): over the trailing
+        window if the state has one, since start_date otherwise.
+        """
+        if self.window_years:
+            value, prev_value, summary, asset_volatility = self._window_metrics()
+            count, _, m2 = summary[:3]
+            volatility = float(np.sqrt(m2 / (count - 1) * 252)) if count > 1 else 0.0
+            max_drawdown = summary[5]
+        else:
+            value, prev_value = self.value, self.prev_value
+            volatility = self.metrics.volatility
+            max_drawdown = self.metrics.max_drawdown
+            asset_volatility = {t: m.volatility for t, m in self.asset_metrics.items()}
+
+        total_return = value / 100.0 - 1
+        days = (self.last_date - self.window_start).days
+        years = max(days / 365.25, 0.01)
+        cagr = (1 + total_return) ** (1 / years) - 1
+
+        weighted_vol_sum = 0
+        for ticker, ticker_volatility in asset_volatility.items():
+            weighted_vol_sum += ticker_volatility * self.weights[ticker]
+
+        return {
+            "Portfolio Value": value,
+            "Daily Return": value / prev_value - 1,
+            "Total Return": total_return,
+            "CAGR": cagr,
+            "Volatility (Ann.)": volatility,
+            "Sharpe Ratio": cagr / volatility if volatility > 0 else 0,
+            "Max Drawdown": max_drawdown,
+            "Diversification Effect": weighted_vol_sum - volatility
+        }
+
+    def to_dict(self):
+        data = {
+            "version": STATE_VERSION,
+            "fingerprint": self.config_fingerprint(self.weights, self.rebalance_freq, self.window_years),
+            "weights": self.weights,
+            "rebalance_freq": self.rebalance_freq,
+            "window_years": self.window_years,
+            "start_date": self.start_date.isoformat(),
+            "last_date": self.last_date.isoformat(),
+            "last_prices": self.last_prices,
+            "positions": self.positions,
+            "value": self.value,
+            "prev_value": self.prev_value
+        }
+        if self.window_years:
+            data.update({
+                "window_dates": [d.isoformat() for d in self.window_dates],
+                "window_prices": self.window_prices,
+                "window_values": self.window_values,
+                "tail_start": self.tail_start.isoformat() if self.tail_start is not None else None,
+                "tail": self.tail.snapshot(),
+                "asset_window": self.asset_window.snapshot()
+            })
+        else:
+            data.update({
+                "metrics": self.metrics.snapshot(),
+                "asset_metrics": {t: m.snapshot() for t, m in self.asset_metrics.items()}
+            })
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data["weights"], data["rebalance_freq"], data.get("window_years"))
+        state.start_date = pd.Timestamp(data["start_date"])
+        state.last_date = pd.Timestamp(data["last_date"])
+        state.last_prices = data["last_prices"]
+        state.positions = data["positions"]
+        state.value = data["value"]
+        state.prev_value = data["prev_value"]
+        if state.window_years:
+            state.window_dates = [pd.Timestamp(d) for d in data["window_dates"]]
+            state.window_prices = data["window_prices"]
+            state.window_values = data["window_values"]
+            state.tail_start = pd.Timestamp(data["tail_start"]) if data["tail_start"] else None
+            state.tail = SlidingAggregate.from_snapshot(combine_path, data["tail"])
+            state.asset_window = SlidingAggregate.from_snapshot(combine_returns, data["asset_window"])
+        else:
+            state.metrics = StreamingMetrics.from_snapshot(data["metrics"])
+            state.asset_metrics = {t: StreamingMetrics.from_snapshot(m) for t, m in data["asset_metrics"].items()}
+        return state
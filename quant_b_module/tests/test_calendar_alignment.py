@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the alignment layer and the manager using it
+from quant_b_module.calendar_alignment import align_calendar, periods_per_year
+from quant_b_module.portfolio_manager import PortfolioManager
+
+class TestCalendarAlignment(unittest.TestCase):
+
+    def setUp(self):
+        """We mix one crypto (every day) with two equities (business days, one holiday)."""
+        rng = np.random.default_rng(8)
+        days = pd.date_range(start="2023-01-02", periods=730, freq="D")
+        raw = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (730, 3)), axis=0)),
+                           index=days, columns=['BTC-USD', 'MC.PA', 'AAPL'])
+        weekend = days.dayofweek >= 5
+        raw.loc[weekend, ['MC.PA', 'AAPL']] = np.nan
+        raw.loc[pd.Timestamp("2023-07-04"), 'AAPL'] = np.nan
+        self.raw = raw
+
+    def test_union_is_legacy_cleaning(self):
+        prices, report = align_calendar(self.raw, "Union")
+        pd.testing.assert_frame_equal(prices, self.raw.ffill().bfill())
+        self.assertEqual(report["Periods per Year"], 252)
+        self.assertEqual(report["Shrink"], 0)
+
+    def test_compact_policies(self):
+        """Weekend rows are removed and each calendar gets its own annualization."""
+        common, report = align_calendar(self.raw, "Common Sessions")
+        self.assertFalse(common.isna().any().any())
+        self.assertEqual(len(common), 521)
+        self.assertAlmostEqual(report["Shrink"], 1 - 521 / 730)
+        self.assertEqual(report["Asset Periods per Year"]["BTC-USD"], 365)
+        self.assertIn(report["Asset Periods per Year"]["MC.PA"], range(258, 263))
+
+        business, report = align_calendar(self.raw, "Business Days")
+        self.assertTrue((business.index.dayofweek < 5).all())
+        self.assertEqual(len(business), 522)
+        # The holiday repeats the last AAPL price, crypto keeps its own business-day closes
+        self.assertEqual(business.loc["2023-07-04", 'AAPL'], self.raw.loc["2023-07-03", 'AAPL'])
+        self.assertEqual(business.loc["2023-07-10", 'BTC-USD'], self.raw.loc["2023-07-10", 'BTC-USD'])
+
+        with self.assertRaises(ValueError):
+            align_calendar(self.raw, "Lunar")
+
+    def test_report_dropped_dates_and_truncated_start(self):
+        """The report tells which dates were removed and which asset truncates the start."""
+        raw = self.raw.copy()
+        raw.loc[:"2023-03-31", 'AAPL'] = np.nan
+        common, report = align_calendar(raw, "Common Sessions")
+        self.assertEqual(report["Dropped Dates"], len(raw) - len(common))
+        self.assertEqual(report["First Date Before"], pd.Timestamp("2023-01-02"))
+        self.assertEqual(report["First Date After"], pd.Timestamp("2023-04-03"))
+        self.assertEqual(report["Latest Start"], 'AAPL')
+
+        _, report = align_calendar(raw, "Union")
+        self.assertEqual(report["Dropped Dates"], 0)
+        self.assertIsNone(report["Latest Start"])
+
+    def test_manager_annualizes_per_calendar(self):
+        """fetch_data applies the policy; native calendars annualize each asset on its own sessions."""
+        pm = PortfolioManager()
+        with patch("quant_b_module.portfolio_manager.yf.download", return_value={'Close': self.raw}):
+            pm.fetch_data(list(self.raw.columns), calendar="Native Calendars")
+        self.assertEqual(pm.calendar_report["Rows After"], 521)
+        self.assertEqual(pm.periods_per_year, periods_per_year(pm.data.index))
+
+        btc = self.raw['BTC-USD'].pct_change().dropna()
+        self.assertAlmostEqual(pm.get_asset_volatility()['BTC-USD'], btc.std() * np.sqrt(365))
+
+        # Assigning a new panel resets the calendar
+        pm.data = pm.data.copy()
+        self.assertEqual(pm.periods_per_year, 252)
+        self.assertIsNone(pm.calendar_report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+import unittest
+import threading
+import time
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the coalescer and the manager using it for downloads
+from data_loader import DOWNLOADS, RequestCoalescer
+from quant_b_module.portfolio_manager import PortfolioManager
+
+class TestRequestCoalescing(unittest.TestCase):
+
+    def _concurrently(self, n, target):
+        threads = [threading.Thread(target=target) for _ in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_identical_requests_computed_once(self):
+        """Concurrent identical requests share one computation; distinct keys do not."""
+        coalescer = RequestCoalescer(ttl=60)
+        calls = []
+
+        def slow(key):
+            calls.append(key)
+            time.sleep(0.2)
+            return key * 2
+
+        results = []
+        self._concurrently(10, lambda: results.append(coalescer.run("a", lambda: slow(1))))
+        self.assertEqual(results, [2] * 10)
+        self.assertEqual(coalescer.run("b", lambda: slow(3)), 6)
+        self.assertEqual(calls, [1, 3])
+        self.assertEqual(coalescer.stats["computed"], 2)
+
+    def test_failures_are_not_cached(self):
+        coalescer = RequestCoalescer(ttl=60)
+        with self.assertRaises(RuntimeError):
+            coalescer.run("a", lambda: (_ for _ in ()).throw(RuntimeError("network down")))
+        self.assertEqual(coalescer.run("a", lambda: 1), 1)
+
+    def test_interrupted_owner_releases_waiters(self):
+        """An interrupt (not an Exception) in the computation neither blocks the waiters nor stays in flight."""
+        class Interrupt(BaseException):
+            pass
+
+        coalescer = RequestCoalescer(ttl=60)
+        started = threading.Event()
+        outcomes = []
+
+        def interrupted():
+            started.set()
+            time.sleep(0.2)
+            raise Interrupt()
+
+        def owner():
+            try:
+                coalescer.run("a", interrupted)
+            except Interrupt:
+                outcomes.append("interrupted")
+
+        def waiter():
+            started.wait()
+            outcomes.append(coalescer.run("a", lambda: 5))
+
+        threads = [threading.Thread(target=owner, daemon=True), threading.Thread(target=waiter, daemon=True)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(sorted(outcomes, key=str), [5, "interrupted"])
+        self.assertEqual(coalescer._in_flight, {})
+        self.assertEqual(coalescer.run("a", lambda: 6), 5)
+
+    def test_expired_results_are_recomputed(self):
+        coalescer = RequestCoalescer(ttl=0)
+        self.assertEqual(coalescer.run("a", lambda: 1), 1)
+        self.assertEqual(coalescer.run("a", lambda: 2), 2)
+
+    def test_sessions_share_downloads(self):
+        """Several users fetching the same portfolio trigger a single download and get private copies."""
+        dates = pd.bdate_range(start="2024-01-01", periods=50)
+        closes = pd.DataFrame(np.linspace(100, 120, 150).reshape(50, 3), index=dates, columns=['X1', 'X2', 'X3'])
+
+        def download(*args, **kwargs):
+            time.sleep(0.2)
+            return {'Close': closes}
+
+        DOWNLOADS.clear()
+        managers = []
+        with patch("quant_b_module.portfolio_manager.yf.download", side_effect=download) as mocked:
+            def session():
+                pm = PortfolioManager()
+                pm.fetch_data(['X1', 'X2', 'X3'], period="3mo")
+                managers.append(pm)
+            self._concurrently(6, session)
+        self.assertEqual(mocked.call_count, 1)
+        self.assertEqual(len(managers), 6)
+        self.assertIsNot(managers[0].data, managers[1].data)
+        pd.testing.assert_frame_equal(managers[0].data, managers[1].data)
+
+    def test_live_update_appends_latest_bars(self):
+        """A live update downloads only the recent bars and matches a full fetch of the history."""
+        dates = pd.bdate_range(start="2024-01-01", periods=60)
+        closes = pd.DataFrame(100 + np.cumsum(np.ones((60, 2)), axis=0), index=dates, columns=['X1', 'X2'])
+        # The last known bar was still forming: its close changes in the new download
+        history = closes.iloc[:50].copy()
+        history.iloc[-1] -= 0.5
+
+        def download(tickers, start=None, **kwargs):
+            frame = history if start is None else closes[closes.index >= start]
+            return {'Close': frame}
+
+        DOWNLOADS.clear()
+        with patch("quant_b_module.portfolio_manager.yf.download", side_effect=download) as mocked:
+            pm = PortfolioManager()
+            pm.fetch_data(['X1', 'X2'], period="3mo", calendar="Business Days")
+            version = pm.data_version
+            self.assertEqual(pm.update_latest(), 10)
+        self.assertEqual(mocked.call_args.kwargs["start"], dates[49])
+        self.assertGreater(pm.data_version, version)
+        self.assertEqual(pm.calendar_policy, "Business Days")
+        pd.testing.assert_frame_equal(pm.data, closes, check_freq=False, check_names=False)
+
+    def test_live_update_extends_cached_arrays(self):
+        """A live update extends the derived arrays over the new bars, and a repeated last bar changes nothing."""
+        rng = np.random.default_rng(8)
+        dates = pd.bdate_range(start="2024-01-15", periods=60)
+        closes = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (60, 3)), axis=0)),
+                              index=dates, columns=['X1', 'X2', 'X3'])
+        history = closes.iloc[:50].copy()
+        history.iloc[-1] *= 1.01
+        weights = {'X1': 0.5, 'X2': 0.3, 'X3': 0.2}
+
+        def download(tickers, start=None, **kwargs):
+            return {'Close': history if start is None else closes[closes.index >= start]}
+
+        DOWNLOADS.clear()
+        with patch("quant_b_module.portfolio_manager.yf.download", side_effect=download):
+            pm = PortfolioManager()
+            pm.fetch_data(['X1', 'X2', 'X3'], period="3mo", calendar="Business Days")
+            pm.preview_portfolio(weights, rebalance_freq="Monthly")
+            pm.get_log_returns()
+            self.assertEqual(pm.update_latest(), 10)
+
+            stats = pm.get_cache_stats()
+            for key in ["returns", "log_returns", "moments", "growth", "segments_Monthly"]:
+                self.assertEqual(stats["computed"][key], 1, key)
+                self.assertEqual(stats["extended"][key], 1, key)
+
+            # Same results as a manager computing everything on the updated panel
+            fresh = PortfolioManager()
+            fresh._set_data(closes.copy(), pm.periods_per_year)
+            values, metrics = pm.preview_portfolio(weights, rebalance_freq="Monthly")
+            expected_values, expected_metrics = fresh.preview_portfolio(weights, rebalance_freq="Monthly")
+            np.testing.assert_allclose(values.to_numpy(), expected_values.to_numpy(), rtol=1e-12)
+            for key, value in expected_metrics.items():
+                self.assertAlmostEqual(metrics[key], value, places=12, msg=key)
+            pd.testing.assert_frame_equal(pm.get_log_returns(), fresh.get_log_returns(), check_freq=False)
+            pd.testing.assert_frame_equal(pm.get_covariance(), fresh.get_covariance(), rtol=1e-10)
+
+            # The next download only repeats the last bar: same data version and arrays
+            version, returns = pm.data_version, pm.get_returns()
+            self.assertEqual(pm.update_latest(), 0)
+            self.assertEqual(pm.data_version, version)
+            self.assertIs(pm.get_returns(), returns)
+
+    def test_shared_manager_live_updates_wait_for_calculations(self):
+        """A live update of a shared manager waits for running calculations, then swaps data and calendar at once."""
+        dates = pd.bdate_range(start="2024-01-01", periods=60)
+        closes = pd.DataFrame(100 + np.cumsum(np.ones((60, 2)), axis=0), index=dates, columns=['X1', 'X2'])
+
+        def download(tickers, start=None, **kwargs):
+            return {'Close': closes.iloc[:50] if start is None else closes[closes.index >= start]}
+
+        DOWNLOADS.clear()
+        with patch("quant_b_module.portfolio_manager.yf.download", side_effect=download):
+            pm = PortfolioManager()
+            pm.fetch_data(['X1', 'X2'], period="3mo", calendar="Business Days")
+            version, calendar = pm.data_version, (pm.periods_per_year, pm.calendar_report)
+
+            # Another session is in the middle of a calculation on the shared manager
+            with pm._lock:
+                updater = threading.Thread(target=pm.update_latest)
+                updater.start()
+                updater.join(timeout=0.5)
+                self.assertTrue(updater.is_alive())
+                self.assertEqual(pm.data_version, version)
+                self.assertEqual(len(pm.data), 50)
+            updater.join()
+
+        self.assertEqual(pm.data_version, version + 1)
+        self.assertEqual(len(pm.data), 60)
+        self.assertEqual((pm.periods_per_year, pm.calendar_report), calendar)
+
+    def test_pairs_scan_runs_outside_the_manager_lock(self):
+        """Other sessions keep using a shared manager while it scans for pairs, and the scan is cached once."""
+        dates = pd.bdate_range(start="2024-01-01", periods=120)
+        rng = np.random.default_rng(3)
+        closes = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (120, 3)), axis=0)),
+                              index=dates, columns=['X1', 'X2', 'X3'])
+        pm = PortfolioManager()
+        pm._set_data(closes, 252)
+
+        scanning, release = threading.Event(), threading.Event()
+
+        def slow_scan(*args, **kwargs):
+            scanning.set()
+            release.wait(timeout=5)
+            return pd.DataFrame({"Pair": ["X2/X1"]})
+
+        with patch("quant_b_module.portfolio_manager.rank_pairs", side_effect=slow_scan) as mocked:
+            scanner = threading.Thread(target=pm.get_pairs)
+            scanner.start()
+            self.assertTrue(scanning.wait(timeout=5))
+            # Another session is not blocked by the running scan
+            reader = threading.Thread(target=pm.get_returns)
+            reader.start()
+            reader.join(timeout=1)
+            self.assertFalse(reader.is_alive())
+            release.set()
+            scanner.join()
+            pm.get_pairs()
+        self.assertEqual(mocked.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
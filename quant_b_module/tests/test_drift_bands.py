@@ -0,0 +1,77 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the drift-band kernel and the manager exposing it
+from quant_b_module.drift_bands import drift_band_path
+from quant_b_module.portfolio_manager import PortfolioManager
+
+def reference_path(prices, target, band, cost_rate):
+    """Day by day loop: drift the holdings, rebalance at the close when a weight leaves its band."""
+    values = [100.0]
+    holdings = 100.0 * target / prices.iloc[0].to_numpy()
+    rebalances = []
+    for t in range(1, len(prices)):
+        row = prices.iloc[t].to_numpy()
+        value = holdings @ row
+        weights = holdings * row / value
+        if (np.abs(weights - target) > band).any():
+            value *= 1 - cost_rate * np.abs(weights - target).sum()
+            holdings = value * target / row
+            rebalances.append(t)
+        values.append(value)
+    return np.array(values), rebalances
+
+class TestDriftBands(unittest.TestCase):
+
+    def setUp(self):
+        """We build 4 assets over 500 days with different drifts and volatilities."""
+        rng = np.random.default_rng(11)
+        dates = pd.bdate_range(start="2021-01-04", periods=500)
+        returns = rng.normal([0.0008, 0.0002, -0.0003, 0.0005], [0.02, 0.01, 0.015, 0.008], (500, 4))
+        self.pm = PortfolioManager()
+        self.pm.data = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=dates, columns=['A', 'B', 'C', 'D'])
+        self.weights = {'A': 0.4, 'B': 0.3, 'C': 0.2, 'D': 0.1}
+
+    def test_kernel_matches_daily_loop(self):
+        """Same rebalance days and values as stepping through every day, with trading costs."""
+        target = np.array(list(self.weights.values()))
+        growth = (self.pm.data / self.pm.data.iloc[0]).to_numpy()
+        for band in [0.01, 0.03]:
+            values, rebalances, turnovers = drift_band_path(growth, target, band, cost_rate=0.001, chunk=8)
+            expected, expected_rebalances = reference_path(self.pm.data, target, band, 0.001)
+            self.assertEqual(list(rebalances), expected_rebalances)
+            np.testing.assert_allclose(values, expected)
+            self.assertTrue((turnovers > 0).all())
+
+    def test_wide_band_is_buy_and_hold(self):
+        """A band no weight can leave never rebalances: the path is the unrebalanced portfolio."""
+        values, summary, rebalance_dates = self.pm.simulate_drift_bands(self.weights, [1.0], cost_bps=10)
+        expected = self.pm.simulate_portfolio(self.weights, rebalance_freq="None")['Portfolio']
+        np.testing.assert_allclose(values['Band 100%'], expected)
+        self.assertEqual(summary.loc['Band 100%', 'Rebalances'], 0)
+        self.assertEqual(len(rebalance_dates['Band 100%']), 0)
+
+    def test_sweep_turnover_and_costs(self):
+        """Wider bands trade less; the cost drag comes from the costs only."""
+        bands = [0.01, 0.02, 0.05, 0.10]
+        _, summary, rebalance_dates = self.pm.simulate_drift_bands(self.weights, bands, cost_bps=20)
+        self.assertEqual(list(summary.index), ['Band 1%', 'Band 2%', 'Band 5%', 'Band 10%'])
+        self.assertTrue(summary['Rebalances'].is_monotonic_decreasing)
+        self.assertTrue(summary['Turnover (Total)'].is_monotonic_decreasing)
+        self.assertTrue((summary['Cost Drag (Ann.)'] >= 0).all())
+        self.assertTrue(rebalance_dates['Band 1%'].isin(self.pm.data.index).all())
+
+        _, free, _ = self.pm.simulate_drift_bands(self.weights, bands, cost_bps=0)
+        pd.testing.assert_series_equal(free['Rebalances'], summary['Rebalances'])
+        np.testing.assert_allclose(free['Cost Drag (Ann.)'], 0, atol=1e-12)
+        self.assertTrue((free['Total Return'] > summary['Total Return']).all())
+
+if __name__ == '__main__':
+    unittest.main()
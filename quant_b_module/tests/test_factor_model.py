@@ -0,0 +1,63 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the factor model and the manager to test them
+from quant_b_module.factor_model import randomized_svd
+from quant_b_module.portfolio_manager import PortfolioManager
+
+class TestFactorModel(unittest.TestCase):
+
+    def setUp(self):
+        """We build 40 fake assets driven by 2 hidden factors plus noise."""
+        rng = np.random.default_rng(3)
+        dates = pd.bdate_range(start="2020-01-01", periods=300)
+        factors = rng.normal(0, 0.01, (300, 2))
+        betas = rng.normal(1, 0.5, (40, 2))
+        returns = factors @ betas.T + rng.normal(0, 0.005, (300, 40))
+        self.tickers = [f"A{i}" for i in range(40)]
+        self.pm = PortfolioManager()
+        self.pm.data = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates, columns=self.tickers)
+
+    def test_randomized_matches_exact_svd(self):
+        """The factor singular values must match the exact decomposition."""
+        x = self.pm.data.pct_change().dropna().to_numpy()
+        x = x - x.mean(axis=0)
+        _, s, _ = randomized_svd(x, 2)
+        exact = np.linalg.svd(x, compute_uv=False)[:2]
+        np.testing.assert_allclose(s, exact, rtol=1e-6)
+
+    def test_two_factors_explain_most_variance(self):
+        """With 2 hidden factors, PC1 + PC2 carry most of the variance and exposures are R² <= 1."""
+        result = self.pm.get_factor_decomposition(n_factors=3)
+        self.assertGreater(result["Explained Variance"].iloc[:2].sum(), 0.8)
+        self.assertTrue((result["Exposures"]["R-Squared"] <= 1.0).all())
+        self.assertEqual(result["Loadings"].shape, (40, 3))
+
+    def test_risk_split_adds_up(self):
+        """Factor variance + idiosyncratic variance = total portfolio variance."""
+        weights = {t: 1 / 40 for t in self.tickers}
+        split = self.pm.get_factor_decomposition(n_factors=2, weights=weights)["Risk Split"]
+        total = split["Factor Volatility"] ** 2 + split["Idiosyncratic Volatility"] ** 2
+        self.assertAlmostEqual(total, split["Total Volatility"] ** 2)
+        port_rets = self.pm.data.pct_change().dropna().mean(axis=1)
+        self.assertAlmostEqual(split["Total Volatility"], port_rets.std() * np.sqrt(252))
+
+    def test_model_fitted_once_per_data_version(self):
+        """New weights reuse the fitted model; only a new number of factors fits again."""
+        for i in range(3):
+            weights = {t: (j + i + 1) / 1000 for j, t in enumerate(self.tickers)}
+            self.pm.get_factor_decomposition(n_factors=2, weights=weights)
+        self.pm.get_factor_decomposition(n_factors=3)
+        computed = self.pm.get_cache_stats()["computed"]
+        self.assertEqual(computed["factors_2"], 1)
+        self.assertEqual(computed["factors_3"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
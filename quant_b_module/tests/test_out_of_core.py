@@ -0,0 +1,88 @@
+import unittest
+import tempfile
+import pickle
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the chunked engine and the in-memory manager to compare them
+from data_loader import PriceStore, block_rows_for_budget
+from quant_b_module.out_of_core import ChunkedPortfolioEngine
+from quant_b_module.portfolio_manager import PortfolioManager
+from streaming_metrics import StreamingMetrics
+
+class TestOutOfCore(unittest.TestCase):
+
+    def setUp(self):
+        """We store 3 years of prices for 6 assets; C starts late and D has a gap."""
+        rng = np.random.default_rng(21)
+        dates = pd.bdate_range(start="2021-01-04", periods=760)
+        tickers = ['A', 'B', 'C', 'D', 'E', 'F']
+        self.prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.012, (760, 6)), axis=0)),
+                                   index=dates, columns=tickers)
+        self.prices.iloc[:120, 2] = np.nan
+        self.prices.iloc[400:410, 3] = np.nan
+        self.weights = dict(zip(tickers, [0.1, 0.2, 0.3, 0.15, 0.15, 0.1]))
+
+        self.store = PriceStore(tempfile.mkdtemp())
+        self.store.write("panel", self.prices)
+        self.pm = PortfolioManager()
+        self.pm.data = self.prices.ffill().bfill()
+
+    def test_blocks_match_in_memory(self):
+        """Streaming by small blocks gives the in-memory simulation, covariance and metrics."""
+        for schedule in ["None", "Monthly", "Quarterly"]:
+            engine = ChunkedPortfolioEngine(self.weights, schedule)
+            values = pd.concat(engine.stream(self.store.iter_blocks("panel", block_rows=50)))
+            self.assertEqual(engine.blocks_processed, 16)
+
+            expected = self.pm.simulate_portfolio(self.weights, rebalance_freq=schedule)['Portfolio']
+            np.testing.assert_allclose(values.to_numpy(), expected.to_numpy())
+            np.testing.assert_allclose(engine.get_covariance().to_numpy(), self.pm.get_covariance().to_numpy(),
+                                       atol=1e-15)
+
+            metrics = engine.get_portfolio_metrics()
+            for key, value in self.pm.get_portfolio_metrics(self.weights, expected).items():
+                self.assertAlmostEqual(metrics[key], value, places=10, msg=key)
+
+    def test_state_does_not_grow_with_history(self):
+        """Only aggregates are kept: the engine state has the same size after 100 or 760 dates."""
+        self.store.write("short", self.prices.iloc[:100])
+        short = ChunkedPortfolioEngine(self.weights, "Monthly").run_store(self.store, "short")
+        full = ChunkedPortfolioEngine(self.weights, "Monthly").run_store(self.store, "panel")
+        self.assertLessEqual(len(pickle.dumps(full)), len(pickle.dumps(short)) + 16)
+        self.assertEqual(self.store.panels(), ["panel", "short"])
+
+    def test_block_size_follows_budget(self):
+        """The block size is bounded by the memory budget, and too small a budget is refused."""
+        engine = ChunkedPortfolioEngine(self.weights, memory_budget_mb=0.05)
+        self.assertEqual(engine.block_rows, block_rows_for_budget(6, 0.05, fixed_bytes=6 * 6 * 8))
+        engine.run_store(self.store, "panel")
+        self.assertGreater(engine.blocks_processed, 1)
+        with self.assertRaises(ValueError):
+            block_rows_for_budget(10_000, 0.01)
+
+    def test_append_only_adds_new_dates(self):
+        """Appending an overlapping download only writes the dates after the stored ones."""
+        self.store.write("partial", self.prices.iloc[:500])
+        added = self.store.append("partial", self.prices.iloc[450:])
+        self.assertEqual(added, 260)
+        self.assertEqual(self.store.last_date("partial"), self.prices.index[-1])
+
+    def test_update_array_matches_update(self):
+        """A vectorized block update gives the same metrics as one update per return."""
+        returns = self.prices['A'].pct_change().dropna()
+        one_by_one = StreamingMetrics().update_many(returns).get_metrics()
+        blocks = StreamingMetrics()
+        for start in range(0, len(returns), 100):
+            blocks.update_array(returns.iloc[start:start + 100].to_numpy(), returns.index[start:start + 100])
+        for key, value in blocks.get_metrics().items():
+            self.assertAlmostEqual(value, one_by_one[key], places=12, msg=key)
+
+if __name__ == '__main__':
+    unittest.main()
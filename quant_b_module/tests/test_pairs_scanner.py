@@ -0,0 +1,86 @@
+import unittest
+import warnings
+import pandas as pd
+import numpy as np
+from statsmodels.tsa.stattools import adfuller
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the scanner and the manager exposing it
+from quant_b_module.pairs_scanner import engle_granger_batch, scan_pairs, backtest_spread
+from quant_b_module.portfolio_manager import PortfolioManager
+
+class TestPairsScanner(unittest.TestCase):
+
+    def setUp(self):
+        """We build 6 assets over 600 days: B is cointegrated with A (hedge ratio 0.8), the others are random walks."""
+        rng = np.random.default_rng(8)
+        n = 600
+        dates = pd.bdate_range(start="2022-01-03", periods=n)
+        common = np.cumsum(rng.normal(0, 0.01, n))
+        spread = np.zeros(n)
+        for t in range(1, n):
+            spread[t] = 0.9 * spread[t - 1] + rng.normal(0, 0.004)
+        prices = {'A': np.exp(4 + common), 'B': np.exp(3 + 0.8 * common + spread)}
+        for name in ['C', 'D', 'E', 'F']:
+            prices[name] = np.exp(3 + 0.5 * common + np.cumsum(rng.normal(0, 0.01, n)))
+        self.prices = pd.DataFrame(prices, index=dates)
+
+    def test_batched_adf_matches_statsmodels(self):
+        """Each column of the batched regressions gives the ADF statistic of statsmodels."""
+        log_prices = np.log(self.prices.to_numpy())
+        result = engle_granger_batch(log_prices, np.array([1, 2]), np.array([0, 3]), lags=2)
+        for k, (y, x) in enumerate([(1, 0), (2, 3)]):
+            spread = log_prices[:, y] - result["Hedge Ratio"][k] * log_prices[:, x] - result["Intercept"][k]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                expected = adfuller(spread, maxlag=2, autolag=None, regression="n")[0]
+            self.assertAlmostEqual(result["ADF Stat"][k], expected)
+
+    def test_scan_ranks_cointegrated_pair_first(self):
+        """The planted pair comes first with its hedge ratio; the pool gives the same table."""
+        table = scan_pairs(self.prices, min_correlation=0.0, max_workers=1)
+        best = table.iloc[0]
+        self.assertEqual((best["Asset Y"], best["Asset X"]), ('B', 'A'))
+        self.assertAlmostEqual(best["Hedge Ratio"], 0.8, delta=0.05)
+        self.assertLess(best["p-value"], 0.01)
+        self.assertLess(best["Half-Life (Days)"], 20)
+
+        pooled = scan_pairs(self.prices, min_correlation=0.0, batch_size=4, max_workers=2)
+        pd.testing.assert_frame_equal(table, pooled)
+
+        # The prefilter drops the weakly correlated pairs before any regression
+        self.assertLess(len(scan_pairs(self.prices, min_correlation=0.6)), len(table))
+
+    def test_degenerate_pair_reported_as_nan(self):
+        """A pair with a constant spread (duplicated series) gets NaN statistics instead of stopping the scan."""
+        prices = self.prices.assign(G=self.prices['C'])
+        table = scan_pairs(prices, min_correlation=0.0, max_workers=1)
+        self.assertEqual(len(table), 21)
+        degenerate = table[table[["Asset Y", "Asset X"]].apply(set, axis=1) == {'C', 'G'}].iloc[0]
+        self.assertTrue(np.isnan(degenerate["ADF Stat"]))
+        self.assertTrue(np.isnan(degenerate["p-value"]))
+        self.assertEqual((table.iloc[0]["Asset Y"], table.iloc[0]["Asset X"]), ('B', 'A'))
+
+    def test_spread_backtest_rules(self):
+        """Positions follow the entry / exit bands and are applied the next day."""
+        pm = PortfolioManager()
+        pm.data = self.prices
+        backtest = pm.get_pair_backtest('B', 'A', 0.8, window=40)
+        z = backtest['Z-Score']
+        position = backtest['Position']
+        self.assertTrue((position[z < -2] == 1).all())
+        self.assertTrue((position[z > 2] == -1).all())
+        self.assertTrue((position[z.abs() < 0.5] == 0).all())
+        self.assertEqual(backtest['Returns'].iloc[:40].abs().sum(), 0)
+
+        pair_returns = (self.prices['B'].pct_change() - 0.8 * self.prices['A'].pct_change()) / 1.8
+        expected = (position.shift(1) * pair_returns).fillna(0)
+        np.testing.assert_allclose(backtest['Returns'], expected)
+
+if __name__ == '__main__':
+    unittest.main()
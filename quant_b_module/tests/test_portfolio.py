@@ -52,5 +52,75 @@ class TestPortfolioManager(unittest.TestCase):
         self.assertIsNotNone(res)
         self.assertIn('Portfolio', res.columns)
 
+    def test_derived_arrays_computed_once(self):
+        """Returns, volatility and covariance are computed once and reused by every metric."""
+        weights = {'AssetA': 0.5, 'AssetB': 0.5}
+        for _ in range(3):
+            res = self.pm.simulate_portfolio(weights, rebalance_freq="Monthly")
+            self.pm.get_portfolio_metrics(weights, res['Portfolio'])
+            self.pm.get_correlation_matrix()
+        stats = self.pm.get_cache_stats()
+        self.assertTrue(all(count == 1 for count in stats['computed'].values()))
+        self.assertGreater(stats['hits'], 0)
+
+    def test_cache_invalidated_on_new_data(self):
+        """Assigning new data (as fetch_data does) drops the cached returns."""
+        first = self.pm.get_returns()
+        version = self.pm.data_version
+        self.pm.data = self.pm.data * 2
+        self.assertEqual(self.pm.data_version, version + 1)
+        self.assertEqual(self.pm.get_cache_stats()['cached_keys'], [])
+        # Same returns (prices doubled) but a new object computed from the new data
+        self.assertIsNot(self.pm.get_returns(), first)
+        pd.testing.assert_frame_equal(self.pm.get_returns(), first)
+
+    def test_batched_simulation_matches_single(self):
+        """Each column of a batched simulation equals the single-portfolio simulation."""
+        rng = np.random.default_rng(3)
+        dates = pd.bdate_range(start="2022-01-03", periods=300)
+        self.pm.data = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, 3)), axis=0)),
+                                    index=dates, columns=['A', 'B', 'C'])
+        weights_matrix = pd.DataFrame([[0.2, 0.3, 0.5], [1/3, 1/3, 1/3]], columns=['A', 'B', 'C'], index=['P1', 'P2'])
+        schedules = ["None", "Monthly", "Quarterly"]
+        values = self.pm.simulate_portfolio(weights_matrix, rebalance_freq=schedules)
+        self.assertEqual(values.shape, (300, 6))
+        for name, row in weights_matrix.iterrows():
+            for schedule in schedules:
+                single = self.pm.simulate_portfolio(row.to_dict(), rebalance_freq=schedule)['Portfolio']
+                np.testing.assert_allclose(values[(name, schedule)].to_numpy(), single.to_numpy())
+
+        metrics = self.pm.get_batch_metrics(weights_matrix, values)
+        single = self.pm.simulate_portfolio(weights_matrix.loc['P1'].to_dict(), rebalance_freq="Monthly")
+        expected = self.pm.get_portfolio_metrics(weights_matrix.loc['P1'].to_dict(), single['Portfolio'])
+        for key, value in expected.items():
+            self.assertAlmostEqual(metrics.loc[('P1', 'Monthly'), key], value)
+
+    def test_monthly_rebalancing_values(self):
+        """Rebalancing on the first day of a month resets the positions to the target weights."""
+        dates = pd.to_datetime(["2024-01-30", "2024-01-31", "2024-02-01"])
+        self.pm.data = pd.DataFrame({'A': [100.0, 200.0, 400.0], 'B': [100.0, 100.0, 100.0]}, index=dates)
+        res = self.pm.simulate_portfolio({'A': 0.5, 'B': 0.5}, rebalance_freq="Monthly")
+        # Day 2: 100 + 50 = 150. Day 3: rebalanced to 75/75, then A doubles -> 150 + 75 = 225
+        np.testing.assert_allclose(res['Portfolio'].to_numpy(), [100.0, 150.0, 225.0])
+
+    def test_weight_preview(self):
+        """The preview path gives the simulated values, ex-ante volatility from the covariance, and reuses the segments."""
+        rng = np.random.default_rng(5)
+        dates = pd.bdate_range(start="2022-01-03", periods=300)
+        self.pm.data = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, 3)), axis=0)),
+                                    index=dates, columns=['A', 'B', 'C'])
+        for weights in [{'A': 0.2, 'B': 0.3, 'C': 0.5}, {'A': 0.6, 'B': 0.4}]:
+            for schedule in ["None", "Monthly"]:
+                values, metrics = self.pm.preview_portfolio(weights, rebalance_freq=schedule)
+                expected = self.pm.simulate_portfolio(weights, rebalance_freq=schedule)['Portfolio']
+                pd.testing.assert_series_equal(values, expected)
+                self.assertAlmostEqual(metrics['Total Return'], expected.iloc[-1] / expected.iloc[0] - 1)
+
+        w = pd.Series({'A': 0.6, 'B': 0.4, 'C': 0.0})
+        vol = np.sqrt(w @ self.pm.get_covariance() @ w * 252)
+        self.assertAlmostEqual(metrics['Volatility (Ann.)'], vol)
+        self.assertAlmostEqual(metrics['Diversification Effect'], self.pm.get_asset_volatility() @ w - vol)
+        self.assertEqual(self.pm.get_cache_stats()['computed']['segments_Monthly'], 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
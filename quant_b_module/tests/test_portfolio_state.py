@@ -0,0 +1,102 @@
+import unittest
+import json
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the state and the manager to compare them
+from quant_b_module.portfolio_state import PortfolioState
+from quant_b_module.portfolio_manager import PortfolioManager
+
+class TestPortfolioState(unittest.TestCase):
+
+    def setUp(self):
+        """We create 3 fake assets over 300 business days (several quarters)."""
+        rng = np.random.default_rng(21)
+        dates = pd.bdate_range(start="2023-01-01", periods=300)
+        returns = rng.normal(0.0003, 0.012, (300, 3))
+        self.prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates, columns=['A', 'B', 'C'])
+        self.weights = {'A': 0.5, 'B': 0.3, 'C': 0.2}
+
+    def test_incremental_equals_full_rebuild(self):
+        """Processing new bars on a saved state gives exactly the full rebuild."""
+        state = PortfolioState.build(self.prices.iloc[:200], self.weights, "Quarterly")
+        # Simulate a save / reload between two runs
+        state = PortfolioState.from_dict(state.to_dict())
+        n_new = state.update(self.prices.iloc[195:])
+        self.assertEqual(n_new, 100)
+
+        full = PortfolioState.build(self.prices, self.weights, "Quarterly")
+        self.assertEqual(state.get_metrics(), full.get_metrics())
+
+    def test_state_matches_simulation(self):
+        """The carried state gives the same value, volatility and diversification as the simulation."""
+        pm = PortfolioManager()
+        pm.data = self.prices
+        sim = pm.simulate_portfolio(self.weights, rebalance_freq="Quarterly")
+        expected = pm.get_portfolio_metrics(self.weights, sim['Portfolio'])
+
+        metrics = PortfolioState.build(self.prices, self.weights, "Quarterly").get_metrics()
+        self.assertAlmostEqual(metrics['Portfolio Value'], sim['Portfolio'].iloc[-1])
+        self.assertAlmostEqual(metrics['Volatility (Ann.)'], expected['Volatility (Ann.)'])
+        self.assertAlmostEqual(metrics['Diversification Effect'], expected['Diversification Effect'])
+
+    def test_trailing_window_incremental_equals_full_recompute(self):
+        """With a window, the saved state reports the trailing year exactly like a recompute over that year."""
+        state = PortfolioState.build(self.prices.iloc[:200], self.weights, "Quarterly", window_years=1)
+        state = PortfolioState.from_dict(json.loads(json.dumps(state.to_dict())))
+        state.update(self.prices.iloc[195:])
+        full = PortfolioState.build(self.prices, self.weights, "Quarterly", window_years=1)
+        self.assertEqual(state.window_dates, full.window_dates)
+        self.assertEqual(state.get_metrics(), full.get_metrics())
+
+        # Full recompute of the last year (Base 100 on its first day), as the report used to do
+        last_year = self.prices[self.prices.index >= self.prices.index[-1] - pd.DateOffset(years=1)]
+        self.assertEqual(state.window_start, last_year.index[0])
+        pm = PortfolioManager()
+        pm.data = last_year
+        sim = pm.simulate_portfolio(self.weights, rebalance_freq="Quarterly")['Portfolio']
+        expected = pm.get_portfolio_metrics(self.weights, sim)
+        metrics = state.get_metrics()
+        self.assertAlmostEqual(metrics['Portfolio Value'], sim.iloc[-1])
+        self.assertAlmostEqual(metrics['Total Return'], expected['Total Return'])
+        self.assertAlmostEqual(metrics['Volatility (Ann.)'], expected['Volatility (Ann.)'])
+        self.assertAlmostEqual(metrics['Diversification Effect'], expected['Diversification Effect'])
+        self.assertAlmostEqual(metrics['Max Drawdown'], (sim / sim.cummax() - 1).min())
+        self.assertNotAlmostEqual(metrics['Portfolio Value'], PortfolioState.build(self.prices, self.weights, "Quarterly").value)
+
+    def test_restated_history_detected(self):
+        """A change in the last stored price means the history was restated."""
+        state = PortfolioState.build(self.prices.iloc[:200], self.weights, "Quarterly")
+        self.assertTrue(state.history_matches(self.prices))
+        self.assertFalse(state.history_matches(self.prices * 0.98))
+        # A different configuration has a different fingerprint
+        self.assertNotEqual(PortfolioState.config_fingerprint(self.weights, "Quarterly"),
+                            PortfolioState.config_fingerprint(self.weights, "Monthly"))
+
+    def test_restated_window_price_detected(self):
+        """With a window, a restated price anywhere in the trailing year forces a rebuild."""
+        state = PortfolioState.build(self.prices.iloc[:200], self.weights, "Quarterly", window_years=1)
+        window = self.prices.iloc[:200][self.prices.index[:200] >= state.window_start]
+        self.assertTrue(state.history_matches(window))
+        restated = window.copy()
+        restated.iloc[10, 0] *= 0.99
+        self.assertFalse(state.history_matches(restated))
+
+    def test_window_report_only_reads_head_prices(self):
+        """Bars after the first rebalance of the window come from the running summaries, not the prices."""
+        state = PortfolioState.build(self.prices, self.weights, "Quarterly", window_years=1)
+        expected = state.get_metrics()
+        head_end = state.window_dates.index(state.tail_start)
+        self.assertLess(head_end, 70)
+        for row in state.window_prices[head_end:]:
+            row[:] = [np.nan] * len(row)
+        self.assertEqual(state.get_metrics(), expected)
+
+if __name__ == '__main__':
+    unittest.main()
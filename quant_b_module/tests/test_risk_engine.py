@@ -0,0 +1,60 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the engine and the manager to test them
+from risk_engine import RiskEngine, sliding_tail
+from quant_b_module.portfolio_manager import PortfolioManager
+
+class TestRiskEngine(unittest.TestCase):
+
+    def setUp(self):
+        """We create fat-tailed fake returns (Student t) for 3 assets over 2 years."""
+        rng = np.random.default_rng(7)
+        dates = pd.bdate_range(start="2022-01-01", periods=504)
+        self.returns = pd.DataFrame(rng.standard_t(4, (504, 3)) * 0.01, index=dates, columns=['A', 'B', 'C'])
+        self.pm = PortfolioManager()
+        self.pm.data = 100 * (1 + self.returns).cumprod()
+
+    def test_sliding_tail_matches_full_sort(self):
+        """The sorted sliding window must give the same VaR/CVaR as sorting every window."""
+        values = self.returns['A'].to_numpy()
+        var, cvar = sliding_tail(values, 100, (0.95, 0.99))
+        for t in range(99, len(values)):
+            window = np.sort(values[t - 99:t + 1])
+            self.assertAlmostEqual(var[t, 0], -window[4])
+            self.assertAlmostEqual(cvar[t, 0], -window[:5].mean())
+            self.assertAlmostEqual(var[t, 1], -window[0])
+        self.assertTrue(np.isnan(var[98]).all())
+
+    def test_cvar_beyond_var(self):
+        """CVaR is the average loss beyond VaR, so it can never be smaller."""
+        rolling = RiskEngine(window=100).rolling_risk(self.returns['B']).dropna()
+        for method in ["Historical", "Parametric", "EWMA"]:
+            self.assertTrue((rolling[f"{method} CVaR 99%"] >= rolling[f"{method} VaR 99%"] - 1e-12).all())
+
+    def test_backtest_counts_exceptions(self):
+        """An exception is a next-day loss larger than today's VaR."""
+        returns = pd.Series([0.0, -0.05, 0.01, -0.02, 0.0])
+        var = pd.Series([0.03, 0.03, 0.03, 0.03, 0.03])
+        result = RiskEngine.backtest(returns, var, 0.95)
+        # Only the -5% return (day 2) breaches the 3% VaR
+        self.assertEqual(result["Observations"], 4)
+        self.assertEqual(result["Exceptions"], 1)
+
+    def test_portfolio_risk(self):
+        """The portfolio risk summary has one row per method and confidence level."""
+        sim = self.pm.simulate_portfolio({'A': 0.4, 'B': 0.3, 'C': 0.3})
+        rolling, summary = self.pm.get_portfolio_risk(sim['Portfolio'], window=100)
+        self.assertEqual(len(summary), 6)
+        self.assertTrue((summary['VaR'] > 0).all())
+        self.assertEqual(list(self.pm.get_asset_risk_table().index), ['A', 'B', 'C'])
+
+if __name__ == '__main__':
+    unittest.main()
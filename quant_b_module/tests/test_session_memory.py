@@ -0,0 +1,80 @@
+import unittest
+import pandas as pd
+import numpy as np
+
+# This allows running the test file directly from anywhere
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+# We import the memory manager used by the dashboard sessions
+from session_memory import SessionMemoryManager, object_size, MB
+
+class TestSessionMemory(unittest.TestCase):
+
+    def setUp(self):
+        """Plain dictionaries stand for the session states (1 MB frame per 'analyzer')."""
+        self.frame = pd.DataFrame(np.zeros((MB // 8 // 2, 2)))
+        self.manager = SessionMemoryManager(session_budget_mb=2.5, global_budget_mb=4)
+
+    def test_object_size(self):
+        """Frames, arrays, containers and object attributes are measured deeply; shared objects once."""
+        class Holder:
+            def __init__(self, data):
+                self.data = data
+                self.alias = data
+
+        self.assertEqual(object_size(self.frame), self.frame.memory_usage(deep=True).sum())
+        self.assertGreaterEqual(object_size({'a': np.zeros(1000)}), 8000)
+        self.assertLess(object_size(Holder(self.frame)), 2 * self.frame.memory_usage(deep=True).sum())
+
+    def test_session_budget_evicts_least_recently_used(self):
+        """Over its budget, a session loses its oldest unused entries, never the ones used by the run."""
+        state = {'old': self.frame.copy(), 'slider_X': 0.5}
+        self.manager.track('s1', state, used_keys={'old', 'slider_X'})
+        state['middle'] = self.frame.copy()
+        self.manager.track('s1', state, used_keys={'middle', 'slider_X'})
+        state['current'] = self.frame.copy()
+        evicted = self.manager.track('s1', state, used_keys={'current'})
+
+        self.assertEqual([key for _, key, _ in evicted], ['old'])
+        self.assertEqual(set(state), {'middle', 'current', 'slider_X'})
+        self.assertEqual(self.manager.stats['evictions'], 1)
+
+    def test_global_budget_and_closed_sessions(self):
+        """Over the global budget, the oldest entries of any session go first; closed sessions are forgotten."""
+        states = {sid: {'data': self.frame.copy(), 'weights': {'A': 1.0}} for sid in ['s1', 's2', 's3', 's4']}
+        for sid, state in states.items():
+            self.manager.track(sid, state, used_keys={'data', 'weights'})
+
+        # 4 MB of frames plus small entries: the oldest frame (s1) is evicted. s1 may be running
+        # in another thread, so the entry is only marked; s1 deletes it at the end of its next run
+        self.assertIn('data', states['s1'])
+        self.assertEqual(self.manager.session_report().loc['s1', 'Pending Evictions'], 1)
+        self.assertLessEqual(self.manager.total_bytes(), 4 * MB)
+        self.manager.track('s1', states['s1'], used_keys={'weights'})
+        self.assertNotIn('data', states['s1'])
+        self.assertIn('weights', states['s1'])
+        self.assertEqual(self.manager.total_bytes(), sum(self.manager.session_report()['Size (MB)']) * MB)
+
+        self.manager.track('s4', states['s4'], used_keys={'data'}, is_active=lambda sid: sid != 's2')
+        report = self.manager.session_report()
+        self.assertEqual(sorted(report.index), ['s1', 's3', 's4'])
+        self.assertIn('data', states['s2'])
+        self.assertEqual(len(self.manager.entry_report()), 5)
+
+    def test_marked_entry_used_again_is_kept(self):
+        """An entry marked by another session's run survives if its own next run uses it."""
+        states = {sid: {'data': self.frame.copy()} for sid in ['s1', 's2', 's3', 's4', 's5']}
+        for sid, state in states.items():
+            self.manager.track(sid, state, used_keys={'data'})
+        self.assertEqual(self.manager.session_report().loc['s1', 'Pending Evictions'], 1)
+
+        self.manager.track('s1', states['s1'], used_keys={'data'})
+        self.assertIn('data', states['s1'])
+        self.assertEqual(self.manager.session_report().loc['s1', 'Pending Evictions'], 0)
+        self.assertLessEqual(self.manager.total_bytes(), 4 * MB)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -43,4 +43,134 @@ class Visualizer:
             color_continuous_scale="RdBu_r", # Red to Blue (diverging)
             title="Asset Correlation Matrix"
         )
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        st.plotly_chart(fig, use_container_width=True)
+
+    @staticmethod
+    def plot_var(returns, rolling_risk, level=0.99):
+        """
+        Plots daily returns against the rolling VaR of each method (losses below zero).
+        """
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=returns.index, y=returns,
+            name="Daily Return",
+            marker_color="rgba(128,128,128,0.5)"
+        ))
+        for method in ["Historical", "Parametric", "EWMA"]:
+            column = f"{method} VaR {level:.0%}"
+            if column in rolling_risk.columns:
+                fig.add_trace(go.Scatter(
+                    x=rolling_risk.index, y=-rolling_risk[column],
+                    name=f"{method} VaR", line=dict(width=2)
+                ))
+        fig.update_layout(
+            title=f"Daily Returns vs Rolling VaR ({level:.0%})",
+            yaxis_tickformat=".1%",
+            hovermode="x unified"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    @staticmethod
+    def plot_explained_variance(explained_variance):
+        """
+        Plots the variance explained by each principal component and the cumulative total.
+        """
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=explained_variance.index, y=explained_variance,
+            name="Explained Variance"
+        ))
+        fig.add_trace(go.Scatter(
+            x=explained_variance.index, y=explained_variance.cumsum(),
+            name="Cumulative", mode="lines+markers"
+        ))
+        fig.update_layout(title="Variance Explained by Statistical Factors", yaxis_tickformat=".0%")
+        st.plotly_chart(fig, use_container_width=True)
+
+    @staticmethod
+    def plot_factor_loadings(loadings):
+        """
+        Plots the factor loadings (assets x components) as a heatmap.
+        """
+        fig = px.imshow(
+            loadings,
+            aspect="auto",
+            color_continuous_scale="RdBu_r",
+            color_continuous_midpoint=0,
+            title="Factor Loadings"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+
+    @staticmethod
+    def plot_portfolio_comparison(values):
+        """
+        Plots the value of every simulated portfolio variant (Base 100).
+        """
+        fig = go.Figure()
+        for portfolio, schedule in values.columns:
+            fig.add_trace(go.Scatter(
+                x=values.index, y=values[(portfolio, schedule)],
+                name=f"{portfolio} ({schedule})", line=dict(width=2)
+            ))
+        fig.update_layout(
+            title="Portfolio Variants (Rebased to 100)",
+            yaxis_title="Value (Base 100)",
+            hovermode="x unified"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    @staticmethod
+    def plot_spread_backtest(backtest, pair_name, entry_z=2.0):
+        """
+        Plots the z-score of a pair spread with its entry bands, and the backtest value (Base 100).
+        """
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=backtest.index, y=backtest['Z-Score'],
+            name="Spread Z-Score", line=dict(color='rgba(128,128,128,0.8)', width=1)
+        ))
+        for level in (entry_z, -entry_z):
+            fig.add_hline(y=level, line=dict(color='#e74c3c', width=1, dash='dash'))
+        fig.add_trace(go.Scatter(
+            x=backtest.index, y=backtest['Cumulative'],
+            name="Pair Strategy (Base 100)", line=dict(color='#2980b9', width=2), yaxis='y2'
+        ))
+        fig.update_layout(
+            title=f"Spread Backtest: {pair_name}",
+            yaxis=dict(title="Z-Score", showgrid=False),
+            yaxis2=dict(title="Value (Base 100)", side="right", overlaying="y"),
+            legend=dict(orientation="h", y=1.1, x=0),
+            hovermode="x unified"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    @staticmethod
+    def plot_drift_bands(values, rebalance_dates, baseline=None, baseline_name="Calendar"):
+        """
+        Plots the value of each drift-band strategy (Base 100), the rebalance dates of the
+        tightest band, and optionally the calendar-rebalanced portfolio for comparison.
+        """
+        fig = go.Figure()
+        for label in values.columns:
+            fig.add_trace(go.Scatter(x=values.index, y=values[label], name=label, line=dict(width=2)))
+        if baseline is not None:
+            fig.add_trace(go.Scatter(
+                x=baseline.index, y=baseline, name=baseline_name,
+                line=dict(color='rgba(0,0,0,0.6)', width=2, dash='dash')
+            ))
+
+        first = values.columns[0]
+        dates = rebalance_dates[first]
+        if len(dates):
+            fig.add_trace(go.Scatter(
+                x=dates, y=values.loc[dates, first],
+                mode='markers', name=f"Rebalances ({first})",
+                marker=dict(symbol='diamond', size=7, color='#e67e22')
+            ))
+        fig.update_layout(
+            title="Drift-Band Rebalancing (Rebased to 100)",
+            yaxis_title="Value (Base 100)",
+            hovermode="x unified"
+        )
+        st.plotly_chart(fig, use_container_width=True)
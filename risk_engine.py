@@ -0,0 +1,235 @@
+"""
+ROLLING RISK ENGINE
+-------------------
+Tail-risk measures shared by Quant A (single asset) and Quant B (portfolio):
+1. Historical VaR/CVaR on a sliding window kept sorted between steps.
+2. Parametric (Gaussian) VaR/CVaR from rolling mean and volatility.
+3. EWMA (RiskMetrics) VaR/CVaR with a zero-mean exponentially weighted volatility.
+4. Backtest of VaR exceptions (Kupiec proportion-of-failures test).
+
+VaR and CVaR are reported as positive fractions of the position value (0.03 = 3% loss).
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+METHODS = ["Historical", "Parametric", "EWMA"]
+
+
+def _tail_size(level, window):
+    """Number of worst observations making the (1 - level) tail of a window."""
+    return max(1, int(math.floor((1 - level) * window)))
+
+
+def sliding_tail(values, window, levels):
+    """
+    Historical VaR and CVaR over a sliding window.
+    The window is kept sorted: each step removes the oldest return and inserts the newest
+    with a binary search, and the sum of each tail is updated in O(1) instead of
+    re-sorting the whole window.
+    Returns two arrays of shape (len(values), len(levels)), NaN until the window is full.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    var = np.full((n, len(levels)), np.nan)
+    cvar = np.full((n, len(levels)), np.nan)
+    if window < 2 or n < window:
+        return var, cvar
+
+    tails = [_tail_size(level, window) for level in levels]
+    window_sorted = sorted(values[:window].tolist())
+    sums = [math.fsum(window_sorted[:k]) for k in tails]
+
+    for t in range(window - 1, n):
+        if t >= window:
+            old = values[t - window]
+            new = values[t]
+
+            # Remove the oldest return; the next value up enters the tail if needed
+            pos = bisect_left(window_sorted, old)
+            del window_sorted[pos]
+            for j, k in enumerate(tails):
+                if pos < k:
+                    sums[j] += window_sorted[k - 1] - old
+
+            # Insert the newest return; the largest tail value leaves if needed
+            pos = bisect_right(window_sorted, new)
+            window_sorted.insert(pos, new)
+            for j, k in enumerate(tails):
+                if pos < k:
+                    sums[j] += new - window_sorted[k]
+
+            # Resynchronize the running sums once per window to cancel rounding drift
+            if t % window == 0:
+                sums = [math.fsum(window_sorted[:k]) for k in tails]
+
+        for j, k in enumerate(tails):
+            var[t, j] = -window_sorted[k - 1]
+            cvar[t, j] = -sums[j] / k
+
+    return var, cvar
+
+
+class RiskEngine:
+    """
+    Computes rolling VaR / CVaR at several confidence levels and backtests them.
+    """
+    def __init__(self, window=250, levels=(0.95, 0.99), ewma_lambda=0.94, min_periods=20):
+        self.window = window
+        self.levels = tuple(levels)
+        self.ewma_lambda = ewma_lambda
+        self.min_periods = min_periods
+
+    @staticmethod
+    def _label(measure, method, level):
+        return f"{method} {measure} {level:.0%}"
+
+    def _effective_window(self, n_obs):
+        """Shrinks the window for short histories (e.g. a 6-month Quant A backtest)."""
+        return max(self.min_periods, min(self.window, n_obs // 2))
+
+    def historical(self, returns):
+        """
+        Rolling historical VaR/CVaR of a return series.
+        """
+        returns = returns.dropna()
+        window = self._effective_window(len(returns))
+        var, cvar = sliding_tail(returns.to_numpy(), window, self.levels)
+
+        result = pd.DataFrame(index=returns.index)
+        for j, level in enumerate(self.levels):
+            result[self._label("VaR", "Historical", level)] = var[:, j]
+            result[self._label("CVaR", "Historical", level)] = cvar[:, j]
+        return result
+
+    def parametric(self, returns):
+        """
+        Rolling Gaussian VaR/CVaR using the rolling mean and standard deviation.
+        """
+        returns = returns.dropna()
+        window = self._effective_window(len(returns))
+        mu = returns.rolling(window).mean()
+        sigma = returns.rolling(window).std()
+
+        result = pd.DataFrame(index=returns.index)
+        for level in self.levels:
+            z = NormalDist().inv_cdf(1 - level)
+            tail_density = NormalDist().pdf(z) / (1 - level)
+            result[self._label("VaR", "Parametric", level)] = -(mu + z * sigma)
+            result[self._label("CVaR", "Parametric", level)] = -(mu - sigma * tail_density)
+        return result
+
+    def ewma(self, returns):
+        """
+        Rolling RiskMetrics VaR/CVaR: sigma_t^2 = lambda * sigma_{t-1}^2 + (1 - lambda) * r_t^2.
+        """
+        returns = returns.dropna()
+        variance = (returns ** 2).ewm(alpha=1 - self.ewma_lambda, adjust=False).mean()
+        sigma = np.sqrt(variance)
+        # The first observations only hold a handful of returns
+        sigma.iloc[:self.min_periods - 1] = np.nan
+
+        result = pd.DataFrame(index=returns.index)
+        for level in self.levels:
+            z = NormalDist().inv_cdf(1 - level)
+            tail_density = NormalDist().pdf(z) / (1 - level)
+            result[self._label("VaR", "EWMA", level)] = -z * sigma
+            result[self._label("CVaR", "EWMA", level)] = sigma * tail_density
+        return result
+
+    def rolling_risk(self, returns):
+        """
+        All three methods side by side (one column per method, measure and level).
+        """
+        return pd.concat([self.historical(returns), self.parametric(returns), self.ewma(returns)], axis=1)
+
+    @staticmethod
+    def backtest(returns, var_series, level):
+        """
+        Counts VaR exceptions: the VaR estimated at the close of day t is compared with
+        the return of day t+1. Includes the Kupiec proportion-of-failures test.
+        """
+        aligned = pd.concat([returns.shift(-1), var_series], axis=1, keys=["Next", "VaR"]).dropna()
+        n_obs = len(aligned)
+        if n_obs == 0:
+            return {"Observations": 0, "Exceptions": 0, "Expected": 0.0,
+                    "Exception Rate": 0.0, "Kupiec LR": 0.0, "p-value": 1.0}
+
+        exceptions = int((aligned["Next"] < -aligned["VaR"]).sum())
+        p = 1 - level
+        rate = exceptions / n_obs
+
+        def log_likelihood(prob):
+            # Convention 0 * log(0) = 0 when there are no (or only) exceptions
+            ll = 0.0
+            if n_obs - exceptions > 0:
+                ll += (n_obs - exceptions) * math.log(1 - prob)
+            if exceptions > 0:
+                ll += exceptions * math.log(prob)
+            return ll
+
+        if 0 < rate < 1:
+            lr = -2 * (log_likelihood(p) - log_likelihood(rate))
+        elif rate == 0:
+            lr = -2 * log_likelihood(p)
+        else:
+            lr = float("inf")
+        # Chi-squared with 1 degree of freedom
+        p_value = math.erfc(math.sqrt(max(lr, 0) / 2))
+
+        return {
+            "Observations": n_obs,
+            "Exceptions": exceptions,
+            "Expected": n_obs * p,
+            "Exception Rate": rate,
+            "Kupiec LR": lr,
+            "p-value": p_value
+        }
+
+    def summary(self, returns, rolling=None):
+        """
+        Latest VaR/CVaR of each method and level with its backtest results.
+        """
+        returns = returns.dropna()
+        if rolling is None:
+            rolling = self.rolling_risk(returns)
+
+        rows = []
+        for method in METHODS:
+            for level in self.levels:
+                var_series = rolling[self._label("VaR", method, level)]
+                cvar_series = rolling[self._label("CVaR", method, level)]
+                last_var = var_series.dropna()
+                last_cvar = cvar_series.dropna()
+                row = {
+                    "Method": method,
+                    "Confidence": level,
+                    "VaR": last_var.iloc[-1] if not last_var.empty else np.nan,
+                    "CVaR": last_cvar.iloc[-1] if not last_cvar.empty else np.nan,
+                }
+                row.update(self.backtest(returns, var_series, level))
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+    def latest_table(self, returns_df):
+        """
+        Latest historical and parametric VaR/CVaR for every column of a return panel,
+        computed on the last window only (used for per-asset tables).
+        """
+        returns_df = returns_df.dropna(how="all")
+        window = self._effective_window(len(returns_df))
+        tail = returns_df.iloc[-window:]
+        table = pd.DataFrame(index=returns_df.columns)
+
+        for level in self.levels:
+            k = _tail_size(level, window)
+            values = np.sort(tail.to_numpy(dtype=float), axis=0)
+            z = NormalDist().inv_cdf(1 - level)
+            table[self._label("VaR", "Historical", level)] = -values[k - 1]
+            table[self._label("CVaR", "Historical", level)] = -values[:k].mean(axis=0)
+            table[self._label("VaR", "Parametric", level)] = -(tail.mean() + z * tail.std())
+        return table
@@ -0,0 +1,301 @@
+"""
+SESSION MEMORY ACCOUNTING
+-------------------------
+Every Streamlit session keeps its own session_state (weights, one slider key per ticker,
+analyzers holding price frames...) for as long as its tab is open. This module:
+1. Measures the bytes held by each session_state entry (deep size: frames, arrays, containers
+   and object attributes), and the shared caches registered with register_cache.
+2. Enforces a per-session and a global budget: when a budget is exceeded, the least recently
+   used entries are evicted first. Entries used by the last run of their session are never
+   evicted, so a page only loses state it is not displaying (e.g. the sliders of a previous
+   universe). Entries of another session are only marked: that session may be running in
+   another thread, so it deletes them itself at the end of its next run.
+3. Optionally samples allocations with tracemalloc: every `sample_every` runs, the allocation
+   sites that grew the most since the previous sample are recorded.
+
+All sessions run in threads of one process, so one manager sees them all.
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+import types
+import weakref
+
+import numpy as np
+import pandas as pd
+
+MB = 1024 ** 2
+
+
+def object_size(obj, seen=None):
+    """
+    Approximate deep size in bytes. Shared objects are counted once per call (seen ids).
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+        return 0
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(object_size(k, seen) + object_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(object_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += object_size(vars(obj), seen)
+    return size
+
+
+def _delete(state, key):
+    try:
+        del state[key]
+    except KeyError:
+        pass
+
+
+def _state_items(state):
+    """
+    User entries of a session state (Streamlit's SafeSessionState or any mapping).
+    """
+    if hasattr(state, "filtered_state"):
+        return dict(state.filtered_state)
+    return dict(state)
+
+
+class SessionMemoryManager:
+    """
+    Per-session and global memory accounting of session_state, with LRU eviction.
+    Call track() at the end of every run of a session with the keys that run used.
+    """
+    def __init__(self, session_budget_mb=64, global_budget_mb=512, idle_timeout=6 * 3600, sample_every=20):
+        self.session_budget_mb = session_budget_mb
+        self.global_budget_mb = global_budget_mb
+        self.idle_timeout = idle_timeout
+        self.sample_every = sample_every
+        self._lock = threading.Lock()
+        # session_id -> {"state", "last_seen", "runs", "bytes", "pending" (keys marked for eviction),
+        #                "entries": {key: {"bytes", "type", "last_used"}}}
+        self._sessions = {}
+        # Running totals (bytes of the accounted entries), updated on every change
+        self._total_bytes = 0
+        self._caches = {}
+        self.stats = {"runs": 0, "evictions": 0, "evicted_bytes": 0, "sessions_dropped": 0}
+        self.samples = []
+        self._last_snapshot = None
+
+    # ----------------------------------- Accounting ---------------------------------------
+
+    def register_cache(self, name, obj):
+        """
+        Shared cache to report in the admin view (measured, never evicted by this manager).
+        Only a weak reference is kept: an expired cache entry is not kept alive by the report.
+        """
+        with self._lock:
+            self._caches[name] = weakref.ref(obj)
+
+    def track(self, session_id, state, used_keys=(), is_active=None):
+        """
+        Measures the entries of a session at the end of its run, marks used_keys as just used
+        and enforces the budgets. is_active(session_id) tells whether another session still exists.
+        Returns the list of (session_id, key, bytes) evicted, or marked for eviction in other sessions.
+        """
+        now = time.monotonic()
+        used_keys = set(used_keys)
+        with self._lock:
+            self.stats["runs"] += 1
+            session = self._sessions.setdefault(session_id, {"entries": {}, "runs": 0, "bytes": 0, "pending": set()})
+            session.update(state=state, last_seen=now)
+            session["runs"] += 1
+
+            # Evictions decided by the runs of other sessions (unless this run used the entry again)
+            for key in session["pending"] - used_keys:
+                _delete(state, key)
+            session["pending"] = set()
+
+            entries = {}
+            for key, value in _state_items(state).items():
+                previous = session["entries"].get(key)
+                entries[key] = {
+                    "bytes": object_size(value),
+                    "type": type(value).__name__,
+                    "last_used": now if key in used_keys or previous is None else previous["last_used"]
+                }
+            session_bytes = sum(e["bytes"] for e in entries.values())
+            self._total_bytes += session_bytes - session["bytes"]
+            session.update(entries=entries, bytes=session_bytes)
+
+            self._drop_idle_sessions(now, session_id, is_active)
+            protected = {(session_id, key) for key in used_keys}
+            evicted = self._enforce(session_id, protected)
+
+        if tracemalloc.is_tracing() and self.stats["runs"] % self.sample_every == 0:
+            self.sample()
+        return evicted
+
+    def _drop_idle_sessions(self, now, current_id, is_active):
+        """Forgets closed sessions, and sessions idle for longer than idle_timeout (after freeing their entries)."""
+        for session_id in list(self._sessions):
+            if session_id == current_id:
+                continue
+            session = self._sessions[session_id]
+            closed = is_active is not None and not is_active(session_id)
+            if closed or now - session["last_seen"] > self.idle_timeout:
+                if not closed:
+                    # No run for hours: its state can be freed from here
+                    for key in list(session["entries"]) + list(session["pending"]):
+                        _delete(session["state"], key)
+                self._total_bytes -= session["bytes"]
+                del self._sessions[session_id]
+                self.stats["sessions_dropped"] += 1
+
+    def _evict(self, session_id, key, deferred=False):
+        """
+        Releases an entry from the accounting. The entry is deleted now, or, if deferred (another
+        session, maybe running), marked for deletion at the end of that session's next run.
+        """
+        session = self._sessions[session_id]
+        entry = session["entries"].pop(key)
+        session["bytes"] -= entry["bytes"]
+        self._total_bytes -= entry["bytes"]
+        if deferred:
+            session["pending"].add(key)
+        else:
+            _delete(session["state"], key)
+        self.stats["evictions"] += 1
+        self.stats["evicted_bytes"] += entry["bytes"]
+        return session_id, key, entry["bytes"]
+
+    def _enforce(self, session_id, protected):
+        """
+        Evicts least recently used entries: first within the session over its budget,
+        then across every session while the total is over the global budget.
+        """
+        evicted = []
+        session = self._sessions[session_id]
+        if session["bytes"] > self.session_budget_mb * MB:
+            candidates = sorted((e["last_used"], k) for k, e in session["entries"].items()
+                                if (session_id, k) not in protected)
+            for _, key in candidates:
+                if session["bytes"] <= self.session_budget_mb * MB:
+                    break
+                evicted.append(self._evict(session_id, key))
+
+        if self._total_bytes > self.global_budget_mb * MB:
+            candidates = sorted((e["last_used"], sid, k) for sid, s in self._sessions.items()
+                                for k, e in s["entries"].items() if (sid, k) not in protected)
+            for _, sid, key in candidates:
+                if self._total_bytes <= self.global_budget_mb * MB:
+                    break
+                evicted.append(self._evict(sid, key, deferred=sid != session_id))
+        return evicted
+
+    def total_bytes(self):
+        return self._total_bytes
+
+    # ----------------------------------- Sampling ---------------------------------------
+
+    def start_sampling(self, frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._last_snapshot = tracemalloc.take_snapshot()
+
+    def stop_sampling(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._last_snapshot = None
+
+    def sample(self, top=10):
+        """
+        Allocation sites that grew the most since the previous sample (tracemalloc must be on).
+        """
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        growth = []
+        if self._last_snapshot is not None:
+            for stat in snapshot.compare_to(self._last_snapshot, "lineno")[:top]:
+                frame = stat.traceback[0]
+                growth.append({"Site": f"{frame.filename}:{frame.lineno}",
+                               "Growth (MB)": stat.size_diff / MB, "Size (MB)": stat.size / MB})
+        self._last_snapshot = snapshot
+        self.samples.append({"time": time.time(), "traced_mb": current / MB, "peak_mb": peak / MB, "top": growth})
+        del self.samples[:-20]
+        return self.samples[-1]
+
+    # ----------------------------------- Reports ---------------------------------------
+
+    def session_report(self):
+        """One row per session: entries, size, entries marked for eviction and idle time."""
+        now = time.monotonic()
+        with self._lock:
+            rows = {sid: {"Entries": len(s["entries"]),
+                          "Size (MB)": s["bytes"] / MB,
+                          "Pending Evictions": len(s["pending"]),
+                          "Runs": s["runs"],
+                          "Idle (s)": now - s["last_seen"]}
+                    for sid, s in self._sessions.items()}
+        report = pd.DataFrame.from_dict(rows, orient="index",
+                                        columns=["Entries", "Size (MB)", "Pending Evictions", "Runs", "Idle (s)"])
+        report.index.name = "Session"
+        return report.sort_values("Size (MB)", ascending=False)
+
+    def entry_report(self):
+        """One row per session_state entry, largest first."""
+        now = time.monotonic()
+        with self._lock:
+            rows = [{"Session": sid, "Key": key, "Type": e["type"], "Size (MB)": e["bytes"] / MB,
+                     "Idle (s)": now - e["last_used"]}
+                    for sid, s in self._sessions.items() for key, e in s["entries"].items()]
+        return pd.DataFrame(rows, columns=["Session", "Key", "Type", "Size (MB)", "Idle (s)"]).sort_values(
+            "Size (MB)", ascending=False).reset_index(drop=True)
+
+    def cache_report(self):
+        """Size of every registered shared cache."""
+        with self._lock:
+            for name in [n for n, ref in self._caches.items() if ref() is None]:
+                del self._caches[name]
+            caches = {name: ref() for name, ref in self._caches.items()}
+        return pd.Series({name: object_size(obj) / MB for name, obj in caches.items() if obj is not None},
+                         name="Size (MB)", dtype=float)
+
+    def summary(self):
+        with self._lock:
+            return {
+                "Sessions": len(self._sessions),
+                "Session State (MB)": self._total_bytes / MB,
+                "Session Budget (MB)": self.session_budget_mb,
+                "Global Budget (MB)": self.global_budget_mb,
+                "Evictions": self.stats["evictions"],
+                "Evicted (MB)": self.stats["evicted_bytes"] / MB,
+                "Sessions Dropped": self.stats["sessions_dropped"],
+                "Sampling": tracemalloc.is_tracing()
+            }
+
+
+# Accounting shared by every session of the process
+SESSION_MEMORY = SessionMemoryManager()
+
+
+def track_current_session(used_keys=()):
+    """
+    Accounts the session of the running Streamlit script (no-op outside a Streamlit run).
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return []
+    is_active = Runtime.instance().is_active_session if Runtime.exists() else None
+    return SESSION_MEMORY.track(ctx.session_id, ctx.session_state, used_keys, is_active)
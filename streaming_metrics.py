@@ -0,0 +1,227 @@
+"""
+STREAMING METRICS ENGINE
+------------------------
+Online version of the Quant A / Quant B performance metrics.
+Each new return updates the metrics in O(1):
+- Total Return and CAGR from the running wealth and the first/last dates.
+- Volatility and Sharpe Ratio from Welford's running mean and variance.
+- Max Drawdown from the running peak.
+- Win Rate from positive / non-zero day counters.
+Blocks of returns can also be added at once with update_array (out-of-core runs).
+
+The state can be saved with snapshot() and resumed with from_snapshot(), e.g. to
+re-apply a bar that is still forming (live intraday data) without replaying history.
+
+SlidingAggregate keeps the same kind of running summaries over a trailing window:
+bars enter at the back and expire at the front in amortized O(1).
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class StreamingMetrics:
+    """
+    Running performance metrics over a stream of periodic returns.
+    """
+    def __init__(self, periods_per_year=252, count_initial_value=False):
+        # count_initial_value: the starting value (before the first return) counts as a peak
+        # (daily report convention); otherwise the peak starts after the first return (get_metrics).
+        self.periods_per_year = periods_per_year
+        self.count_initial_value = count_initial_value
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.wealth = 1.0
+        self.prev_wealth = 1.0
+        self.peak = 1.0 if count_initial_value else None
+        self.max_drawdown = 0.0
+        self.positive_days = 0
+        self.active_days = 0
+        self.first_date = None
+        self.last_date = None
+
+    def update(self, ret, date=None):
+        """
+        Adds one return (NaN counts as a flat day, like fillna(0)).
+        """
+        if ret is None or ret != ret:
+            ret = 0.0
+
+        # Welford update of mean and sum of squared deviations
+        self.count += 1
+        delta = ret - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (ret - self.mean)
+
+        # Wealth, running peak and drawdown
+        self.prev_wealth = self.wealth
+        self.wealth *= (1 + ret)
+        if self.peak is None or self.wealth > self.peak:
+            self.peak = self.wealth
+        self.max_drawdown = min(self.max_drawdown, (self.wealth - self.peak) / self.peak)
+
+        # Win rate counters
+        if ret > 0:
+            self.positive_days += 1
+        if ret != 0:
+            self.active_days += 1
+
+        if date is not None:
+            if self.first_date is None:
+                self.first_date = pd.Timestamp(date)
+            self.last_date = pd.Timestamp(date)
+        return self
+
+    def update_many(self, returns):
+        """
+        Adds a Series of returns indexed by date.
+        """
+        for date, ret in returns.items():
+            self.update(ret, date)
+        return self
+
+    def update_array(self, returns, dates=None):
+        """
+        Adds a block of returns at once (vectorized; same result as update() on each value
+        up to rounding). Mean and variance are merged with the block's own (Chan et al.).
+        """
+        returns = np.nan_to_num(np.asarray(returns, dtype=float), nan=0.0)
+        n = len(returns)
+        if n == 0:
+            return self
+
+        block_mean = returns.mean()
+        block_m2 = ((returns - block_mean) ** 2).sum()
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += block_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        wealth = self.wealth * np.cumprod(1 + returns)
+        peaks = np.maximum.accumulate(wealth)
+        if self.peak is not None:
+            peaks = np.maximum(peaks, self.peak)
+        self.max_drawdown = min(self.max_drawdown, float(((wealth - peaks) / peaks).min()))
+        self.peak = float(peaks[-1])
+        self.prev_wealth = float(wealth[-2]) if n > 1 else self.wealth
+        self.wealth = float(wealth[-1])
+
+        self.positive_days += int((returns > 0).sum())
+        self.active_days += int((returns != 0).sum())
+
+        if dates is not None and len(dates) > 0:
+            if self.first_date is None:
+                self.first_date = pd.Timestamp(dates[0])
+            self.last_date = pd.Timestamp(dates[-1])
+        return self
+
+    @property
+    def volatility(self):
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self.m2 / (self.count - 1)) * math.sqrt(self.periods_per_year)
+
+    def get_metrics(self):
+        """
+        Same keys and definitions as AssetAnalyzer.get_metrics.
+        """
+        total_return = self.wealth - 1
+        if self.first_date is not None:
+            days = (self.last_date - self.first_date).days
+        else:
+            days = self.count * 365.25 / self.periods_per_year
+        years = max(days / 365.25, 0.01)
+        cagr = (1 + total_return) ** (1 / years) - 1
+
+        volatility = self.volatility
+        sharpe = cagr / volatility if volatility != 0 else 0
+        win_rate = self.positive_days / self.active_days if self.active_days > 0 else 0
+
+        return {
+            "Total Return": total_return,
+            "CAGR": cagr,
+            "Volatility": volatility,
+            "Sharpe Ratio": sharpe,
+            "Max Drawdown": self.max_drawdown,
+            "Win Rate": win_rate
+        }
+
+    def snapshot(self):
+        """
+        JSON-serializable copy of the state.
+        """
+        state = dict(self.__dict__)
+        state["first_date"] = self.first_date.isoformat() if self.first_date is not None else None
+        state["last_date"] = self.last_date.isoformat() if self.last_date is not None else None
+        return state
+
+    @classmethod
+    def from_snapshot(cls, state):
+        """
+        Resumes from a snapshot() (the snapshot itself is not modified).
+        """
+        metrics = cls(state["periods_per_year"], state["count_initial_value"])
+        metrics.__dict__.update(state)
+        metrics.first_date = pd.Timestamp(state["first_date"]) if state["first_date"] else None
+        metrics.last_date = pd.Timestamp(state["last_date"]) if state["last_date"] else None
+        return metrics
+
+
+class SlidingAggregate:
+    """
+    FIFO window of mergeable summaries (two-stack queue): push() adds the newest summary,
+    pop() removes the oldest and aggregate() merges the whole window, each in amortized O(1).
+    combine(older, newer) must be associative. Summaries must be JSON-serializable.
+    """
+    def __init__(self, combine):
+        self.combine = combine
+        # Front: (summary, merge of it and every newer front summary), oldest on top
+        self.front = []
+        # Back: summaries in arrival order and their running merge
+        self.back = []
+        self.back_total = None
+
+    def __len__(self):
+        return len(self.front) + len(self.back)
+
+    def push(self, summary):
+        self.back.append(summary)
+        self.back_total = summary if self.back_total is None else self.combine(self.back_total, summary)
+
+    def pop(self):
+        """
+        Removes and returns the oldest summary.
+        """
+        if not self.front:
+            total = None
+            for summary in reversed(self.back):
+                total = summary if total is None else self.combine(summary, total)
+                self.front.append((summary, total))
+            self.back, self.back_total = [], None
+        return self.front.pop()[0]
+
+    def aggregate(self):
+        """
+        Merge of every summary in the window (None if empty).
+        """
+        front_total = self.front[-1][1] if self.front else None
+        if front_total is None:
+            return self.back_total
+        if self.back_total is None:
+            return front_total
+        return self.combine(front_total, self.back_total)
+
+    def snapshot(self):
+        return {"front": [list(entry) for entry in self.front], "back": self.back, "back_total": self.back_total}
+
+    @classmethod
+    def from_snapshot(cls, combine, state):
+        window = cls(combine)
+        window.front = [tuple(entry) for entry in state["front"]]
+        window.back = list(state["back"])
+        window.back_total = state["back_total"]
+        return window